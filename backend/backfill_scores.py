@@ -1,71 +1,164 @@
-import sqlite3
+import argparse
 import json
 import os
 import sys
 
+import numpy as np
+
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from backend.scoring import calculate_score
+from backend import database
+from backend.scoring import (
+    FEATURE_COLUMNS,
+    extract_features,
+    get_active_scoring_config,
+    publish_scoring_config,
+    score_feature_arrays,
+)
+from backend.utils import load_json_field
 
-DB_NAME = "internship.db"
+DEFAULT_CHUNK_SIZE = 2000
 
-def backfill_scores():
-    if not os.path.exists(DB_NAME):
-        print(f"Dataset {DB_NAME} not found!")
-        return
 
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
+def backfill_features(conn, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Fills the scoring feature columns for rows enriched before they existed.
+    This is the only step that decodes the JSON blobs, and only once per row.
+    """
     cursor = conn.cursor()
+    updated = 0
+    last_id = 0
+    assignments = ", ".join(f"{column} = ?" for column in FEATURE_COLUMNS)
 
-    try:
-        # Fetch all applicants with NULL overall_score
-        cursor.execute("SELECT * FROM applicants WHERE overall_score IS NULL")
-        applicants = cursor.fetchall()
-        
-        print(f"Found {len(applicants)} applicants with missing scores.")
-
-        for app in applicants:
-            app_id = app["application_id"]
-            
-            # Helper to safely load JSON
-            def load_json(json_str):
-                try:
-                    return json.loads(json_str) if json_str else {}
-                except json.JSONDecodeError:
-                    return {}
-
-            self_ratings = load_json(app["self_rating_json"])
-            resume_data = load_json(app["parsed_resume_json"])
-            github_data = load_json(app["github_json"])
-            
-            # Recalculate Score
-            score_result = calculate_score(self_ratings, resume_data, github_data)
-            overall = score_result.get("overall_score", 0)
-            breakdown = score_result.get("breakdown", {})
-            
-            print(f"Updating {app_id}: Score {overall}")
-
-            # Update DB
-            cursor.execute("""
-                UPDATE applicants 
-                SET overall_score = ?, score_breakdown_json = ?
-                WHERE application_id = ?
-            """, (overall, json.dumps(breakdown), app_id))
-        
+    while True:
+        cursor.execute("""
+            SELECT id, self_rating_json, parsed_resume_json, github_json FROM applicants
+            WHERE skill_count IS NULL AND id > ? AND COALESCE(enrichment_status, 'done') NOT IN ('pending', 'running')
+            ORDER BY id
+            LIMIT ?
+        """, (last_id, chunk_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            features = extract_features(
+                load_json_field(row["self_rating_json"]),
+                load_json_field(row["parsed_resume_json"]),
+                load_json_field(row["github_json"])
+            )
+            params.append([features[column] for column in FEATURE_COLUMNS] + [row["id"]])
+
+        cursor.executemany(f"UPDATE applicants SET {assignments} WHERE id = ?", params)
+        conn.commit()
+        updated += len(rows)
+        last_id = rows[-1]["id"]
+
+    return updated
+
+
+def rescore_stale(conn, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Rescores every row whose score_version is not the active scoring_config version.
+    Works in id-ordered chunks: feature columns are pulled into NumPy arrays, scored
+    in one vectorized pass and written back with executemany, one transaction per
+    chunk. Finished chunks are no longer stale, so an interrupted run just resumes.
+    """
+    version, weights = get_active_scoring_config(conn)
+    cursor = conn.cursor()
+    rescored = 0
+    last_id = 0
+    columns = ", ".join(FEATURE_COLUMNS)
+
+    while True:
+        cursor.execute(f"""
+            SELECT id, {columns} FROM applicants
+            WHERE (score_version IS NULL OR score_version != ?) AND id > ?
+              AND COALESCE(enrichment_status, 'done') NOT IN ('pending', 'running')
+            ORDER BY id
+            LIMIT ?
+        """, (version, last_id, chunk_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+
+        ids = [row["id"] for row in rows]
+        features = {}
+        for index, column in enumerate(FEATURE_COLUMNS, start=1):
+            values = [row[index] for row in rows]
+            features[column] = values if column == "gh_last_activity" else np.array(values, dtype=float)
+        scores = score_feature_arrays(features, weights)
+
+        params = [
+            (
+                int(scores["overall_score"][i]),
+                json.dumps({
+                    "skills": int(scores["skills"][i]),
+                    "resume": int(scores["resume"][i]),
+                    "github": int(scores["github"][i]),
+                }),
+                version,
+                ids[i],
+            )
+            for i in range(len(ids))
+        ]
+        # The stored hover summary (see summaries.py) carries the score too; patch it in place
+        cursor.executemany("""
+            UPDATE applicants SET
+                overall_score = ?1, score_breakdown_json = ?2, score_version = ?3,
+                summary_json = CASE WHEN json_valid(summary_json)
+                    THEN json_set(summary_json, '$.overall_score', ?1, '$.score_breakdown', json(?2)) END
+            WHERE id = ?4
+        """, params)
         conn.commit()
-        print("✅ Backfill Complete.")
+        rescored += len(ids)
+        last_id = ids[-1]
+        print(f"Rescored {rescored} applicants (up to id {last_id})")
 
-        # Verify
-        cursor.execute("SELECT count(*) FROM applicants WHERE overall_score IS NULL")
-        count = cursor.fetchone()[0]
-        print(f"Remaining NULL scores: {count}")
+    return rescored
 
+
+def _backfill(conn, chunk_size: int, weights_path: str = None):
+    if weights_path:
+        with open(weights_path, encoding="utf-8") as f:
+            version = publish_scoring_config(conn, json.load(f))
+        print(f"Published scoring config version {version}.")
+
+    filled = backfill_features(conn, chunk_size)
+    print(f"Backfilled scoring features for {filled} applicants.")
+
+    rescored = rescore_stale(conn, chunk_size)
+    print(f"✅ Rescore Complete. {rescored} applicants updated.")
+
+    # Verify
+    cursor = conn.cursor()
+    cursor.execute("SELECT count(*) FROM applicants WHERE overall_score IS NULL")
+    count = cursor.fetchone()[0]
+    print(f"Remaining NULL scores: {count}")
+
+
+def backfill_scores(chunk_size: int = DEFAULT_CHUNK_SIZE, weights_path: str = None):
+    if not os.path.exists(database.DB_NAME):
+        print(f"Dataset {database.DB_NAME} not found!")
+        return
+
+    database.init_db()
+
+    # The batches below commit chunk by chunk, so the writer is taken without an outer transaction
+    try:
+        with database.get_pool().writer(transaction=False) as conn:
+            _backfill(conn, chunk_size, weights_path)
     except Exception as e:
         print(f"Backfill failed: {e}")
     finally:
-        conn.close()
+        database.close_pool()
+
 
 if __name__ == "__main__":
-    backfill_scores()
+    parser = argparse.ArgumentParser(description="Rescore applicants scored with an outdated scoring config.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per batch/transaction")
+    parser.add_argument("--weights", help="JSON file of weights to publish as a new scoring config version first")
+    args = parser.parse_args()
+    backfill_scores(chunk_size=args.chunk_size, weights_path=args.weights)
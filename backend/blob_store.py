@@ -0,0 +1,112 @@
+import asyncio
+import functools
+import gzip
+import hashlib
+import importlib.util
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+# Threads doing blob file I/O, so reads and writes never block the event loop
+BLOB_IO_THREADS = int(os.getenv("BLOB_IO_THREADS", "4"))
+
+# zstd compression needs the optional 'zstandard' package; gzip is always available
+ZSTD_AVAILABLE = importlib.util.find_spec("zstandard") is not None
+
+# compression -> file suffix
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    if compression == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def decompress(data: bytes, compression: str) -> bytes:
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+class BlobStore:
+    """
+    Files keyed by string under `root`, sharded two levels deep by hash
+    prefix: key "abc" lives at root/ba/78/abc<suffix>, where ba78... is the
+    SHA-256 of the key (or the key itself when keys are already hex digests).
+    Each directory therefore holds at most 256 entries plus its own files.
+    Writes go to a temp file and are renamed into place, so readers never
+    see a partial blob.
+    """
+
+    def __init__(self, root, hashed_keys: bool = False):
+        self.root = Path(root)
+        self.hashed_keys = hashed_keys
+
+    def path_for(self, key: str, suffix: str = "") -> Path:
+        digest = key if self.hashed_keys else hashlib.sha256(key.encode()).hexdigest()
+        return self.root / digest[:2] / digest[2:4] / f"{key}{suffix}"
+
+    def temp_path(self) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        return self.root / f".tmp-{uuid.uuid4().hex}"
+
+    def commit(self, temp_path: Path, key: str, suffix: str = "", replace: bool = True) -> Path:
+        """
+        Moves a finished temp file to the key's path. With replace=False an
+        existing blob is kept (content-addressed keys) and the temp file dropped.
+        """
+        path = self.path_for(key, suffix)
+        if not replace and path.exists():
+            temp_path.unlink(missing_ok=True)
+            return path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temp_path, path)
+        return path
+
+    def put(self, key: str, data: bytes, suffix: str = "") -> Path:
+        temp_path = self.temp_path()
+        try:
+            temp_path.write_bytes(data)
+            return self.commit(temp_path, key, suffix)
+        except Exception:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+    def get(self, key: str, suffix: str = "") -> Optional[bytes]:
+        try:
+            return self.path_for(key, suffix).read_bytes()
+        except FileNotFoundError:
+            return None
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+async def run_blob_io(fn, *args):
+    """Runs blocking blob I/O on the blob threads and awaits its result."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, BLOB_IO_THREADS), thread_name_prefix="blob")
+        executor = _executor
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(fn, *args))
+
+
+def shutdown_blob_io():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
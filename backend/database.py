@@ -1,70 +1,192 @@
-import sqlite3
+from contextlib import contextmanager
 import os
+import queue
+import sqlite3
+import threading
+import time
 
-DB_NAME = "internship.db"
+from backend.migrations import run_migrations
 
-def get_db_connection():
-    """Establishes a connection to the SQLite database."""
-    # check_same_thread=False is required for SQLite to work with FastAPI's 
-    # multi-threaded/async environment. It allows a connection created in one thread 
-    # to be used in another, preventing ProgrammingError.
-    conn = sqlite3.connect(DB_NAME, check_same_thread=False)
+DB_NAME = os.getenv("DB_NAME", "internship.db")
+# How long a statement waits for another process's lock before SQLITE_BUSY
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+# Page cache per connection, in KiB (negative cache_size = KiB in SQLite)
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "65536"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+# Read connections kept open; the pool never holds more than this many
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "8"))
+# Longest a caller waits for a free pooled read connection before failing
+DB_READ_WAIT_SECONDS = float(os.getenv("DB_READ_WAIT_SECONDS", "30"))
+# Attempts to take the write lock when another process holds it past busy_timeout
+DB_WRITE_RETRIES = int(os.getenv("DB_WRITE_RETRIES", "5"))
+DB_WRITE_RETRY_SECONDS = float(os.getenv("DB_WRITE_RETRY_SECONDS", "0.1"))
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def _connect(path: str, readonly: bool = False):
+    # check_same_thread=False: pooled connections move between threads, but a
+    # connection is only ever used by one borrower at a time.
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=DB_BUSY_TIMEOUT_MS / 1000)
     conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT_MS}")
+    # WAL: readers never block the writer and vice versa; NORMAL is durable
+    # across application crashes (only an OS crash can lose the last commits)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA foreign_keys = ON")
+    if readonly:
+        conn.execute("PRAGMA query_only = ON")
     return conn
 
-def init_db():
-    """Initializes the database and creates the applicants table if it doesn't exist."""
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS applicants (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                full_name TEXT,
-                email TEXT,
-                college TEXT,
-                degree TEXT,
-                github TEXT,
-                kaggle_url TEXT,
-                resume_path TEXT,
-                parsed_resume_json TEXT,
-                github_json TEXT,
-                self_rating_json TEXT,
-                application_id TEXT,
-                overall_score REAL,
-                score_breakdown_json TEXT
-            )
-        ''')
-        conn.commit()
-    finally:
-        conn.close()
-
-def create_applicant(conn, data):
+
+class ConnectionPool:
     """
-    Inserts a new applicant into the database.
-    data format:
-    (full_name, email, college, degree, github, kaggle_url, resume_path, parsed_resume_json, github_json, self_rating_json, application_id, overall_score, score_breakdown_json)
-    
-    Uses the provided connection 'conn' to execute the insert.
+    Connections to one SQLite file: a bounded set of read-only connections
+    and a single write connection. All writes in the process go through the
+    writer, one transaction at a time, so they never contend with each other;
+    only other processes (CLI scripts) can make it wait.
     """
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO applicants 
-        (full_name, email, college, degree, github, kaggle_url, resume_path, parsed_resume_json, github_json, self_rating_json, application_id, overall_score, score_breakdown_json)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, data)
-    conn.commit()
-
-def get_db():
+
+    def __init__(self, path: str, read_size: int = DB_READ_POOL_SIZE):
+        self.path = path
+        self._read_size = read_size
+        self._idle_readers = queue.LifoQueue()
+        self._readers_created = 0
+        self._readers_lock = threading.Lock()
+        self._writer = None
+        self._write_lock = threading.RLock()
+        self._write_depth = 0
+
+    def _acquire_reader(self):
+        try:
+            return self._idle_readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            if self._readers_created < self._read_size:
+                self._readers_created += 1
+                return _connect(self.path, readonly=True)
+        try:
+            return self._idle_readers.get(timeout=DB_READ_WAIT_SECONDS)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"No pooled read connection became free within {DB_READ_WAIT_SECONDS}s"
+            ) from None
+
+    @contextmanager
+    def reader(self):
+        """Borrows a read-only connection; any read transaction is ended on return."""
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle_readers.put(conn)
+
+    def _begin_immediate(self, conn):
+        # Take the write lock up front, so later statements cannot fail with
+        # SQLITE_BUSY halfway through the transaction
+        for attempt in range(DB_WRITE_RETRIES + 1):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                return
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e) or attempt == DB_WRITE_RETRIES:
+                    raise
+                time.sleep(DB_WRITE_RETRY_SECONDS * (2 ** attempt))
+
+    @contextmanager
+    def writer(self, transaction: bool = True):
+        """
+        The single write connection, held exclusively. With transaction=True
+        the block is one IMMEDIATE transaction, committed on success and
+        rolled back on error; nested writer() blocks join the outer one.
+        transaction=False leaves BEGIN/COMMIT to the caller (migrations,
+        batched backfills that commit per chunk).
+        """
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = _connect(self.path)
+            conn = self._writer
+            if not transaction or self._write_depth > 0:
+                self._write_depth += 1
+                try:
+                    yield conn
+                finally:
+                    self._write_depth -= 1
+                return
+
+            self._begin_immediate(conn)
+            self._write_depth += 1
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                self._write_depth -= 1
+
+    def close(self):
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        while True:
+            try:
+                self._idle_readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def get_db_connection():
+    """A standalone connection with the same settings as the pooled ones (caller closes it)."""
+    return _connect(DB_NAME)
+
+
+def get_read_connection():
     """
-    Dependency that provides a new database session per request.
-    Yields the connection and closes it after the request is processed.
+    A standalone read-only connection (caller closes it), for long reads such
+    as streamed exports that must not tie up a pooled reader.
     """
-    conn = get_db_connection()
-    try:
-        yield conn
-    finally:
-        conn.close()
+    return _connect(DB_NAME, readonly=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """The process-wide pool for DB_NAME (rebuilt if DB_NAME is changed, e.g. by tests)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.path != DB_NAME:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(DB_NAME)
+        return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def init_db():
+    """Creates the database if needed and applies any pending schema migrations."""
+    with get_pool().writer(transaction=False) as conn:
+        run_migrations(conn)
 
 # Auto-initialize for convenience, though in prod this might be explicit
 if __name__ == "__main__":
@@ -0,0 +1,140 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from backend.database import get_pool
+from backend.outbox import queue_email
+from backend.repository import run_in_db_thread
+
+# A digest goes out once the oldest applicant in it has waited this long...
+RECRUITER_DIGEST_MINUTES = float(os.getenv("RECRUITER_DIGEST_MINUTES", "15"))
+# ...or as soon as this many applicants are waiting (0 = time window only)
+RECRUITER_DIGEST_EVERY = int(os.getenv("RECRUITER_DIGEST_EVERY", "50"))
+# Applicants listed in a digest, best score first
+RECRUITER_DIGEST_TOP = int(os.getenv("RECRUITER_DIGEST_TOP", "10"))
+# How often the scheduler checks whether a digest is due
+RECRUITER_DIGEST_CHECK_SECONDS = float(os.getenv("RECRUITER_DIGEST_CHECK_SECONDS", "30"))
+
+# Settled applicants not yet listed in a digest. Applicants still being
+# enriched are left out and carried into the next digest once they settle,
+# so every listed score is final and nobody waits on a slow enrichment.
+_WINDOW_SQL = """
+    SELECT id, application_id, full_name, college, degree, overall_score, top_skills, gh_stars, created_at,
+           COUNT(*) OVER () AS window_count,
+           MIN(created_at) OVER () AS window_start,
+           MAX(id) OVER () AS window_last_id,
+           MIN(id) OVER () AS window_first_id
+    FROM applicants
+    WHERE digest_id IS NULL AND enrichment_status NOT IN ('pending', 'running')
+    ORDER BY overall_score DESC, id
+    LIMIT :top
+"""
+
+
+def _timestamp(moment: datetime) -> str:
+    # Same format as SQLite's CURRENT_TIMESTAMP (UTC)
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def digest_content(rows) -> str:
+    """Plain-text digest for the window rows (already ranked)."""
+    first = rows[0]
+    lines = [
+        f"{first['window_count']} new application(s) since {first['window_start']} UTC.",
+        "",
+        f"Top {len(rows)} by score:",
+        "",
+    ]
+    for rank, row in enumerate(rows, start=1):
+        score = row["overall_score"] if row["overall_score"] is not None else 0
+        lines.append(f"{rank}. {row['full_name']} ({row['college']}, {row['degree']}) - score {score:.1f}")
+        details = [f"Application ID: {row['application_id']}"]
+        if row["top_skills"]:
+            details.append(f"skills: {row['top_skills']}")
+        if row["gh_stars"]:
+            details.append(f"GitHub stars: {row['gh_stars']}")
+        lines.append("   " + " | ".join(details))
+    lines += ["", "Full list: /admin?sort=created"]
+    return "\n".join(lines)
+
+
+def queue_digest_if_due(recruiter_email: str, window_minutes: float = RECRUITER_DIGEST_MINUTES,
+                        every: int = RECRUITER_DIGEST_EVERY, top: int = RECRUITER_DIGEST_TOP,
+                        now: datetime = None) -> Optional[int]:
+    """
+    Queues one digest email covering every settled applicant not yet in a
+    digest, if the window is full (`every` applicants) or old enough
+    (`window_minutes`), and marks them as digested. The ranking, count and
+    window bounds come from a single query. Returns the email_outbox id, or
+    None if nothing was due.
+    """
+    now = now or datetime.now(timezone.utc)
+    with get_pool().writer() as conn:
+        rows = conn.execute(_WINDOW_SQL, {"top": max(1, top)}).fetchall()
+        if not rows:
+            return None
+
+        first = rows[0]
+        full = every > 0 and first["window_count"] >= every
+        expired = first["window_start"] is None or first["window_start"] <= _timestamp(now - timedelta(minutes=window_minutes))
+        if not (full or expired):
+            return None
+
+        outbox_id = queue_email(
+            conn, "recruiter_digest", recruiter_email,
+            f"EazeIntern digest: {first['window_count']} new application(s)",
+            digest_content(rows)
+        )
+        digest_id = conn.execute("""
+            INSERT INTO recruiter_digests (first_applicant_id, last_applicant_id, applicant_count, outbox_id)
+            VALUES (?, ?, ?, ?)
+        """, (first["window_first_id"], first["window_last_id"], first["window_count"], outbox_id)).lastrowid
+        # Same rows as the window: the write lock has been held since the query
+        conn.execute("""
+            UPDATE applicants SET digest_id = ?
+            WHERE digest_id IS NULL AND enrichment_status NOT IN ('pending', 'running')
+        """, (digest_id,))
+    return outbox_id
+
+
+class RecruiterDigestScheduler:
+    """
+    Background task that checks every RECRUITER_DIGEST_CHECK_SECONDS whether a
+    recruiter digest is due and queues it in the email outbox.
+    """
+
+    def __init__(self, check_seconds: float = RECRUITER_DIGEST_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._task = None
+
+    def start(self, on_queued=None) -> bool:
+        """Starts the checks; needs RECRUITER_EMAIL. on_queued() runs after a digest is queued."""
+        if self._task:
+            return True
+        recruiter_email = os.getenv("RECRUITER_EMAIL")
+        if not recruiter_email:
+            print("RECRUITER_EMAIL is not set; recruiter digests are disabled.")
+            return False
+        self._task = asyncio.create_task(self._run(recruiter_email, on_queued))
+        return True
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self, recruiter_email: str, on_queued):
+        while True:
+            try:
+                outbox_id = await run_in_db_thread(queue_digest_if_due, recruiter_email)
+                if outbox_id and on_queued:
+                    on_queued()
+            except Exception as e:
+                print(f"Recruiter digest failed: {e}")
+            await asyncio.sleep(self.check_seconds)
+
+
+digest_scheduler = RecruiterDigestScheduler()
@@ -1,8 +1,14 @@
+import asyncio
 import os
 import smtplib
+import time
 from email.message import EmailMessage
 from dotenv import load_dotenv
 
+from backend.outbox import claim_due_emails, mark_email_failed, mark_email_sent, requeue_interrupted_emails
+from backend.poll_worker import run_poll_worker
+from backend.repository import run_in_db_thread
+
 # Load environment variables
 load_dotenv()
 
@@ -11,107 +17,178 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global variables for recruiter email (SMTP credentials are now fetched per-function)
-RECRUITER_EMAIL = os.getenv("RECRUITER_EMAIL")
-
-
-def send_confirmation_email(to_email: str, application_id: str):
+# SMTP server used by the outbox delivery worker
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") == "1"
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+# The SMTP session is closed after this long without mail to send
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", "60"))
+# Idle worker re-checks the outbox at this interval even without a wake-up
+EMAIL_POLL_SECONDS = float(os.getenv("EMAIL_POLL_SECONDS", "5"))
+# Emails claimed from the outbox per round
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+# Pause after a worker error such as "database is locked" (doubled while it persists, up to a minute)
+EMAIL_ERROR_SECONDS = float(os.getenv("EMAIL_ERROR_SECONDS", "1"))
+
+
+class SMTPSession:
     """
-    Sends confirmation email to candidate
+    One SMTP connection, opened (STARTTLS + login) on first use and reused for
+    every message after that. A session the server dropped is reopened once.
+    Blocking; the delivery worker drives it from a thread.
     """
-    # Keys matching .env file
-    sender_email = os.getenv("SMTP_EMAIL")
-    sender_password = os.getenv("SMTP_PASSWORD")
-
-    # 1. Log credential status
-    if not sender_email or not sender_password:
-        logger.error("[Email Service] Missing SMTP_EMAIL or SMTP_PASSWORD environment variables.")
-        logger.info("   -> Please check your .env file.")
-        logger.info("   -> Email sending SKIPPED.")
-        return False
 
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, username: str = None,
+                 password: str = None, starttls: bool = SMTP_STARTTLS, timeout: float = SMTP_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.connections = 0
+        self._smtp = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._smtp is not None
+
+    def _open(self):
+        logger.info(f"[Email Service] Connecting to {self.host}:{self.port}...")
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        self.connections += 1
+
+    def send(self, message: EmailMessage):
+        if self._smtp is None:
+            self._open()
+        try:
+            self._smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Servers drop idle sessions; reconnect and try this message once more
+            self._smtp = None
+            self._open()
+            self._smtp.send_message(message)
+        except OSError:
+            # Broken socket: the next message starts a fresh session
+            self.close()
+            raise
+
+    def close(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+
+
+def build_message(email: dict, sender: str) -> EmailMessage:
+    """An EmailMessage for an email_outbox row."""
     msg = EmailMessage()
-    msg['Subject'] = "Internship Application Received"
-    msg['From'] = sender_email
-    msg['To'] = to_email
-
-    content = f"""
-    <html>
-    <body>
-        <h3>Application Received</h3>
-        <p>Thank you for applying for the internship.</p>
-        <p>Your Application ID is: <strong>{application_id}</strong></p>
-        <p>You can track your application status on your dashboard.</p>
-        <br>
-        <p>Best Regards,</p>
-        <p>Team EazeIntern</p>
-    </body>
-    </html>
-    """
-    msg.set_content(content, subtype='html')
-
-    try:
-        # 2. Connect to Gmail SMTP Server
-        logger.info(f"[Email Service] Connecting to smtp.gmail.com:587 for {to_email}...")
-        
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls() # Secure the connection
-            
-            # 3. Login
-            server.login(sender_email, sender_password)
-            
-            # 4. Send Email
-            server.send_message(msg)
-            
-        logger.info(f"[Email Service] Email sent successfully to {to_email} (App ID: {application_id})")
-        return True
-
-    except smtplib.SMTPAuthenticationError as e:
-        logger.error(f"[Email Service] Authentication Failed. Server response: {e}")
-        logger.info("   -> Check SMTP_EMAIL and SMTP_PASSWORD in .env.")
-        logger.info("   -> Ensure you are using an App Password (16 chars), not your login password.")
-        return False
-    except Exception as e:
-        logger.error(f"[Email Service] Failed to send email: {e}")
-        return False
+    msg["Subject"] = email["subject"]
+    msg["From"] = sender
+    msg["To"] = email["to_email"]
+    msg.set_content(email["body"], subtype=email["subtype"])
+    return msg
 
 
-def send_recruiter_notification(application_data: dict):
+class EmailDeliveryWorker:
     """
-    Sends new application alert to recruiter
+    Background task that delivers email_outbox rows over a single SMTP session.
+    Failed sends are retried with exponential backoff (see backend.outbox);
+    every attempt's outcome is recorded on the row. notify() wakes the worker
+    early after something was queued.
     """
-    sender_email = os.getenv("SMTP_EMAIL")
-    sender_password = os.getenv("SMTP_PASSWORD")
 
-    if not sender_email or not sender_password or not RECRUITER_EMAIL:
-        logger.error("[Email Service] Missing credentials for recruiter notification.")
-        return False
-
-    candidate = application_data.get("candidate", {})
-
-    msg = EmailMessage()
-    msg["Subject"] = "Inbound: New Internship Application"
-    msg["From"] = sender_email
-    msg["To"] = RECRUITER_EMAIL
-
-    content = f"""
-    New application received!
-    
-    Name: {candidate.get("name")}
-    Email: {candidate.get("email")}
-    College: {candidate.get("college")}
-    Degree: {candidate.get("degree")}
-    
-    Application ID: {application_data.get("application_id")}
-    """
-    msg.set_content(content)
-
-    try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.send_message(msg)
+    def __init__(self, poll_seconds: float = EMAIL_POLL_SECONDS, batch_size: int = EMAIL_BATCH_SIZE):
+        self.poll_seconds = poll_seconds
+        self.batch_size = max(1, batch_size)
+        self.session = None
+        self._wakeup = None
+        self._task = None
+        # The send in progress; it finishes (and is recorded) even if the worker is cancelled
+        self._delivery = None
+
+    def start(self) -> bool:
+        """Starts delivering; without SMTP_EMAIL configured, mail just stays queued."""
+        if self._task:
+            return True
+        sender = os.getenv("SMTP_EMAIL")
+        if not sender:
+            logger.error("[Email Service] SMTP_EMAIL is not set; emails stay queued in email_outbox.")
+            return False
+
+        recovered = requeue_interrupted_emails()
+        if recovered:
+            logger.info(f"[Email Service] Re-queued {recovered} interrupted email(s).")
+        self.session = SMTPSession(
+            SMTP_HOST, SMTP_PORT, username=sender, password=os.getenv("SMTP_PASSWORD"),
+            starttls=SMTP_STARTTLS, timeout=SMTP_TIMEOUT
+        )
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(sender))
         return True
-    except Exception as e:
-        logger.error(f"[Email Service] Failed to send recruiter email: {e}")
-        return False
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        # The SMTP connection must not be closed under a send still using it
+        if self._delivery is not None:
+            await asyncio.gather(self._delivery, return_exceptions=True)
+            self._delivery = None
+        await asyncio.to_thread(self.session.close)
+        requeue_interrupted_emails()
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self, sender: str):
+        self._last_sent = time.monotonic()
+        await run_poll_worker(
+            self._wakeup, self.poll_seconds,
+            claim=lambda: run_in_db_thread(claim_due_emails, self.batch_size),
+            handle=lambda emails: self._deliver_batch(emails, sender),
+            error_seconds=EMAIL_ERROR_SECONDS,
+            on_error=lambda e, delay: logger.error(f"[Email Service] Delivery worker error: {e}; retrying in {delay:.1f}s"),
+            on_idle=self._close_idle_session,
+        )
+
+    async def _close_idle_session(self):
+        if self.session.is_open and time.monotonic() - self._last_sent > SMTP_IDLE_SECONDS:
+            await asyncio.to_thread(self.session.close)
+
+    async def _deliver_batch(self, emails, sender: str):
+        for email in emails:
+            # Shielded: cancelling the worker lets the send and its status update finish
+            self._delivery = asyncio.ensure_future(self._deliver(email, sender))
+            await asyncio.shield(self._delivery)
+            self._delivery = None
+            self._last_sent = time.monotonic()
+
+    async def _deliver(self, email, sender: str):
+        try:
+            await asyncio.to_thread(self.session.send, build_message(email, sender))
+        except Exception as e:
+            logger.error(f"[Email Service] Failed to send email {email['id']} to {email['to_email']}: {e}")
+            await run_in_db_thread(mark_email_failed, email, str(e))
+        else:
+            await run_in_db_thread(mark_email_sent, email["id"])
+            logger.info(f"[Email Service] Email sent to {email['to_email']} (App ID: {email['application_id']})")
+
+
+email_worker = EmailDeliveryWorker()
@@ -0,0 +1,339 @@
+import asyncio
+import json
+import os
+import time
+
+from backend.database import get_pool
+from backend import repository, profiles
+from backend.resume_parser import parse_resume, PARSER_VERSION
+from backend.resume_store import get_cached_parse, store_cached_parse
+from backend.github_service import analyze_github, GitHubRateLimited, GITHUB_MAX_RATE_LIMIT_WAIT
+from backend.scoring import FEATURE_COLUMNS, extract_features, score_features
+from backend.ranking import feature_matrix
+from backend.listing import TOP_SKILLS_COUNT
+from backend.providers import EnrichmentProvider, ProviderDeferred, run_providers
+from backend.poll_worker import run_poll_worker
+from backend.summaries import build_summary, summary_json
+from backend.utils import load_json_field
+
+# Number of applicants enriched concurrently by this process
+ENRICHMENT_WORKERS = int(os.getenv("ENRICHMENT_WORKERS", "4"))
+# A job is marked failed after this many unsuccessful attempts
+ENRICHMENT_MAX_ATTEMPTS = int(os.getenv("ENRICHMENT_MAX_ATTEMPTS", "3"))
+# Idle workers re-check the table at this interval even without a wake-up
+ENRICHMENT_POLL_SECONDS = float(os.getenv("ENRICHMENT_POLL_SECONDS", "5"))
+# Base delay before a failed job is retried (doubled on every attempt)
+ENRICHMENT_RETRY_SECONDS = float(os.getenv("ENRICHMENT_RETRY_SECONDS", "10"))
+# Pause after a worker error such as "database is locked" (doubled while it persists, up to a minute)
+ENRICHMENT_ERROR_SECONDS = float(os.getenv("ENRICHMENT_ERROR_SECONDS", "1"))
+
+
+def _set_applicant_status(conn, application_id: str, status: str):
+    conn.execute(
+        "UPDATE applicants SET enrichment_status = ? WHERE application_id = ?",
+        (status, application_id)
+    )
+
+
+def claim_next_job():
+    """
+    Atomically moves the oldest runnable pending job to 'running'.
+    Returns the job row, or None if nothing is ready.
+    """
+    with get_pool().writer() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE enrichment_jobs
+            SET status = 'running', attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE id = (
+                SELECT id FROM enrichment_jobs
+                WHERE status = 'pending' AND available_at <= ?
+                ORDER BY id
+                LIMIT 1
+            )
+            RETURNING id, application_id, attempts
+        """, (time.time(),))
+        job = cursor.fetchone()
+        if job:
+            _set_applicant_status(conn, job["application_id"], "running")
+    return job
+
+
+def complete_job(job):
+    with get_pool().writer() as conn:
+        conn.execute(
+            "UPDATE enrichment_jobs SET status = 'done', last_error = NULL, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (job["id"],)
+        )
+        _set_applicant_status(conn, job["application_id"], "done")
+
+
+def fail_job(job, error: str):
+    """Re-queues the job with exponential backoff, or marks it failed once attempts run out."""
+    with get_pool().writer() as conn:
+        if job["attempts"] < ENRICHMENT_MAX_ATTEMPTS:
+            retry_at = time.time() + ENRICHMENT_RETRY_SECONDS * (2 ** (job["attempts"] - 1))
+            conn.execute("""
+                UPDATE enrichment_jobs
+                SET status = 'pending', available_at = ?, last_error = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (retry_at, error, job["id"]))
+            _set_applicant_status(conn, job["application_id"], "pending")
+        else:
+            conn.execute(
+                "UPDATE enrichment_jobs SET status = 'failed', last_error = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (error, job["id"])
+            )
+            _set_applicant_status(conn, job["application_id"], "failed")
+
+
+def defer_job(job, retry_at: float, reason: str):
+    """
+    Puts the job back in the queue until retry_at without using up an attempt
+    (its source was unavailable, nothing about the applicant failed).
+    """
+    with get_pool().writer() as conn:
+        conn.execute("""
+            UPDATE enrichment_jobs
+            SET status = 'pending', attempts = attempts - 1, available_at = ?, last_error = ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (retry_at, reason, job["id"]))
+        _set_applicant_status(conn, job["application_id"], "pending")
+
+
+def requeue_interrupted_jobs() -> int:
+    """
+    Jobs left in 'running' belong to a process that died mid-enrichment.
+    Puts them back in the queue so they are picked up again.
+    """
+    with get_pool().writer() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE applicants SET enrichment_status = 'pending'
+            WHERE application_id IN (SELECT application_id FROM enrichment_jobs WHERE status = 'running')
+        """)
+        cursor.execute(
+            "UPDATE enrichment_jobs SET status = 'pending', updated_at = CURRENT_TIMESTAMP WHERE status = 'running'"
+        )
+    return cursor.rowcount
+
+
+async def _parse_resume_cached(resume_path: str, resume_hash):
+    """
+    parse_resume, short-circuited by the (pdf_hash, parser_version) cache.
+    Failed parses (an "error" key, e.g. an unreadable PDF) are not cached.
+    """
+    if resume_hash:
+        cached = await repository.read(get_cached_parse, resume_hash, PARSER_VERSION)
+        if cached is not None:
+            return cached
+
+    parsed = await parse_resume(resume_path)
+
+    if resume_hash and isinstance(parsed, dict) and "error" not in parsed:
+        await repository.write(store_cached_parse, resume_hash, PARSER_VERSION, parsed)
+    return parsed
+
+
+class ResumeProvider(EnrichmentProvider):
+    name = "resume"
+    column = "parsed_resume_json"
+    # Parse pool's own wall-clock limit plus time spent queueing for a worker
+    timeout = float(os.getenv("RESUME_PROVIDER_TIMEOUT", "60"))
+    error_message = "Resume parsing failed"
+
+    async def fetch(self, applicant):
+        return await _parse_resume_cached(str(applicant["resume_path"]), applicant.get("resume_hash"))
+
+
+class GitHubProvider(EnrichmentProvider):
+    name = "github"
+    column = "github_json"
+    # Always longer than a rate-limit sleep, so the timeout never cuts one short
+    timeout = max(float(os.getenv("GITHUB_PROVIDER_TIMEOUT", "120")), GITHUB_MAX_RATE_LIMIT_WAIT + 60)
+    error_message = "GitHub analysis failed"
+
+    async def fetch(self, applicant):
+        github = applicant.get("github") or ""
+        # Extract username from URL if needed
+        github_username = github.split("/")[-1] if "github.com" in github else github
+        try:
+            return await analyze_github(github_username)
+        except GitHubRateLimited as e:
+            raise ProviderDeferred(str(e), e.reset_at)
+
+
+class KaggleProvider(EnrichmentProvider):
+    """
+    Normalises the Kaggle link collected on the form. Kaggle's API needs
+    per-user credentials, so this only records the profile identity for now.
+    """
+    name = "kaggle"
+    timeout = 5.0
+    error_message = "Kaggle lookup failed"
+
+    async def fetch(self, applicant):
+        url = (applicant.get("kaggle_url") or "").strip()
+        if "kaggle.com" not in url:
+            return {}
+        username = url.rstrip("/").split("/")[-1]
+        return {"username": username, "profile_url": f"https://www.kaggle.com/{username}"}
+
+
+# Providers run for every applicant; append to plug in additional sources
+ENRICHMENT_PROVIDERS = [ResumeProvider(), GitHubProvider(), KaggleProvider()]
+
+
+async def enrich_applicant(application_id: str):
+    """
+    Runs the enrichment stages for a stored applicant: the providers (resume
+    parsing, GitHub analysis, ...) concurrently, then scoring, the DB update
+    and profile.json. (The confirmation email is queued at submission.)
+    Individual stages fail soft (like the original inline pipeline); only a missing
+    applicant or a failed DB update raises, which makes the job retry. An
+    exhausted GitHub rate limit raises ProviderDeferred: the job waits for the reset.
+    """
+    applicant = await repository.get_applicant_by_app_id(application_id)
+    if not applicant:
+        raise LookupError(f"Applicant {application_id} not found")
+
+    self_ratings = load_json_field(applicant["self_rating_json"])
+
+    # 1. Run the enrichment providers (resume, GitHub, ...) concurrently.
+    # Each has its own timeout; a failed or slow one only blanks its own result.
+    results = await run_providers(applicant, ENRICHMENT_PROVIDERS)
+    parsed_resume_data = results.get("resume", {})
+    github_data = results.get("github", {})
+    # The raw text goes to the search index and the first-page preview to its own column;
+    # neither is kept in parsed_resume_json
+    resume_text = parsed_resume_data.pop("text", "") if isinstance(parsed_resume_data, dict) else ""
+    resume_preview = parsed_resume_data.pop("preview", "") if isinstance(parsed_resume_data, dict) else ""
+
+    column_values = {}
+    # Providers without a dedicated column are stored together
+    provider_data = {}
+    for provider in ENRICHMENT_PROVIDERS:
+        if provider.column:
+            column_values[provider.column] = json.dumps(results[provider.name], default=str)
+        else:
+            provider_data[provider.name] = results[provider.name]
+    column_values["provider_data_json"] = json.dumps(provider_data, default=str)
+
+    # List view display fields, so the dashboard never decodes the JSON columns
+    skills = parsed_resume_data.get("skills", []) if isinstance(parsed_resume_data, dict) else []
+    column_values["top_skills"] = ", ".join(skills[:TOP_SKILLS_COUNT])
+    column_values["gh_followers"] = github_data.get("followers") if isinstance(github_data, dict) else None
+    column_values["resume_preview"] = resume_preview
+
+    # 2. Calculate Score with the active scoring_config version
+    score_version = None
+    try:
+        score_version, weights = await repository.get_scoring_config()
+        features = extract_features(self_ratings, parsed_resume_data, github_data)
+        score_result = score_features(features, weights)
+        overall_score = score_result.get("overall_score", 0)
+        score_breakdown = score_result.get("breakdown", {})
+        # Scoring inputs are kept as columns so bulk rescoring never re-reads the JSON
+        column_values.update(features)
+    except Exception as e:
+        print(f"Scoring Failed for {application_id}: {e}")
+        overall_score = 0
+        score_breakdown = {}
+
+    # 3. Update Database with enriched data
+    # CRITICAL: We store the entire parsed_resume_data as a JSON string.
+    # This preserves all fields (name, email, skills, education, experience) without data loss.
+    column_values["overall_score"] = overall_score
+    column_values["score_breakdown_json"] = json.dumps(score_breakdown)
+    column_values["score_version"] = score_version
+    # Hover summary for the dashboard, served as-is by /admin/api/applicant/{id}/summary
+    column_values["summary_json"] = summary_json(build_summary({**applicant, **column_values}))
+    await repository.update_enrichment(application_id, column_values, {
+        "full_name": applicant["full_name"],
+        "email": applicant["email"],
+        "college": applicant["college"],
+        "degree": applicant["degree"],
+        "skills": parsed_resume_data.get("skills", []),
+        "resume_text": resume_text,
+    })
+
+    # Keep the in-memory what-if matrix current without reloading it
+    if "skill_count" in column_values:
+        feature_matrix.upsert(
+            application_id, applicant["full_name"], {column: column_values[column] for column in FEATURE_COLUMNS}
+        )
+
+    # 4. profile.json is a view over the row just written (see backend/profiles.py);
+    # a compressed copy is stored only when PROFILE_MODE=eager
+    if profiles.PROFILE_MODE == "eager":
+        try:
+            stored = await repository.get_applicant_by_app_id(application_id)
+            await profiles.save_profile(stored)
+        except Exception as e:
+            print(f"Failed to save profile.json for {application_id}: {e}")
+
+
+class EnrichmentQueue:
+    """
+    Bounded pool of asyncio workers draining the enrichment_jobs table.
+    The table is the source of truth, so queued work survives restarts;
+    notify() only wakes idle workers early.
+    """
+
+    def __init__(self, workers: int = ENRICHMENT_WORKERS, poll_seconds: float = ENRICHMENT_POLL_SECONDS):
+        self.workers = max(1, workers)
+        self.poll_seconds = poll_seconds
+        self._wakeup = None
+        self._tasks = []
+
+    def start(self):
+        if self._tasks:
+            return
+        recovered = requeue_interrupted_jobs()
+        if recovered:
+            print(f"Re-queued {recovered} interrupted enrichment job(s).")
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        # Pick up anything left pending by a previous run
+        self._wakeup.set()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Jobs cancelled mid-run go back to pending for the next start
+        requeue_interrupted_jobs()
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker(self, index: int):
+        await run_poll_worker(
+            self._wakeup, self.poll_seconds,
+            claim=lambda: repository.run_in_db_thread(claim_next_job),
+            handle=self._run_job,
+            error_seconds=ENRICHMENT_ERROR_SECONDS,
+            on_error=lambda e, delay: print(f"Enrichment worker {index} error: {e}; retrying in {delay:.1f}s"),
+        )
+
+    async def _run_job(self, job):
+        """Runs one claimed job and records how it ended."""
+        # More work may be waiting; let the other idle workers look too
+        self._wakeup.set()
+        try:
+            await enrich_applicant(job["application_id"])
+            await repository.run_in_db_thread(complete_job, job)
+        except asyncio.CancelledError:
+            raise
+        except ProviderDeferred as e:
+            print(f"Enrichment job {job['id']} for {job['application_id']} deferred: {e}")
+            await repository.run_in_db_thread(defer_job, job, e.retry_at, str(e))
+        except Exception as e:
+            print(f"Enrichment job {job['id']} for {job['application_id']} failed: {e}")
+            await repository.run_in_db_thread(fail_job, job, str(e))
+
+
+enrichment_queue = EnrichmentQueue()
@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend import database
+from backend.exports import ARROW_AVAILABLE, COLUMNAR_BATCH_SIZE, COLUMNAR_FORMATS, export_filename, stream_columnar_export
+
+
+def export_columnar(output: str = None, format: str = "parquet", batch_size: int = COLUMNAR_BATCH_SIZE):
+    if not ARROW_AVAILABLE:
+        print("Columnar export requires pyarrow: pip install pyarrow")
+        return
+    if not os.path.exists(database.DB_NAME):
+        print(f"Dataset {database.DB_NAME} not found!")
+        return
+
+    output = output or export_filename(COLUMNAR_FORMATS[format][0])
+    tmp_output = output + ".tmp"
+    with open(tmp_output, "wb") as f:
+        for chunk in stream_columnar_export(format, batch_size=batch_size):
+            f.write(chunk)
+    # Readers never see a half-written file
+    os.replace(tmp_output, output)
+    print(f"✅ Exported applicants to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export applicants as a Parquet or Arrow IPC file.")
+    parser.add_argument("--format", choices=sorted(COLUMNAR_FORMATS), default="parquet")
+    parser.add_argument("--output", help="Output path (default: eazeintern_candidates_<date>.<format>)")
+    parser.add_argument("--batch-size", type=int, default=COLUMNAR_BATCH_SIZE, help="Rows per record batch")
+    args = parser.parse_args()
+    export_columnar(output=args.output, format=args.format, batch_size=args.batch_size)
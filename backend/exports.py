@@ -0,0 +1,332 @@
+from datetime import date, datetime
+from typing import Iterable, Iterator, List
+import csv
+import importlib.util
+import io
+import json
+import os
+import zlib
+
+from backend.database import get_read_connection
+from backend.listing import ListingFilters, filter_clause, order_clause
+from backend.utils import load_json_field
+
+# Rows fetched from the cursor (and serialized) per step of a streamed export
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "500"))
+# Rows per record batch (= Parquet row group) in columnar exports
+COLUMNAR_BATCH_SIZE = int(os.getenv("COLUMNAR_BATCH_SIZE", "10000"))
+
+# Parquet / Arrow IPC exports need 'pyarrow' (in requirements.txt); the app still starts without it
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+
+def snapshot_chunks(sql: str, params=(), chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[list]:
+    """
+    Yields the query's rows in lists of chunk_size, all read inside one
+    read transaction. Every chunk therefore comes from the same snapshot,
+    while (in WAL mode) submissions keep committing. The transaction lasts as
+    long as the client's download, so it runs on its own connection rather
+    than a pooled reader the dashboard and workers depend on.
+    """
+    conn = get_read_connection()
+    try:
+        conn.execute("BEGIN")
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
+def gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Gzips a byte stream incrementally."""
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_filename(extension: str) -> str:
+    return f"eazeintern_candidates_{datetime.now().strftime('%Y%m%d')}.{extension}"
+
+
+def export_item(row) -> dict:
+    """The structured export object for one applicants row."""
+    return {
+        "application_id": row["application_id"],
+        "full_name": row["full_name"],
+        "email": row["email"],
+        "college": row["college"],
+        "degree": row["degree"],
+        "github_profile": row["github"],
+        "kaggle_profile": row["kaggle_url"],
+        "resume_path": row["resume_path"],
+        "overall_score": row["overall_score"],
+        "self_ratings": load_json_field(row["self_rating_json"]),
+        "parsed_resume": load_json_field(row["parsed_resume_json"]),
+        "github_analysis": load_json_field(row["github_json"]),
+        "score_breakdown": load_json_field(row["score_breakdown_json"]),
+        "created_at": row["created_at"]
+    }
+
+
+JSON_EXPORT_SQL = """
+    SELECT application_id, full_name, email, college, degree, github, kaggle_url, resume_path,
+           overall_score, self_rating_json, parsed_resume_json, github_json, score_breakdown_json, created_at
+    FROM applicants ORDER BY application_id
+"""
+
+
+def stream_json_export(ndjson: bool = False, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    All applicants as a JSON array, or as NDJSON (one object per line),
+    serialized chunk by chunk so memory stays bounded by chunk_size rows.
+    """
+    first = True
+    if not ndjson:
+        yield b"["
+    for rows in snapshot_chunks(JSON_EXPORT_SQL, chunk_size=chunk_size):
+        parts = []
+        for row in rows:
+            item = json.dumps(export_item(row), default=str)
+            if ndjson:
+                parts.append(item + "\n")
+            else:
+                parts.append(("\n" if first else ",\n") + item)
+            first = False
+        yield "".join(parts).encode("utf-8")
+    if not ndjson:
+        yield b"\n]\n" if not first else b"]\n"
+
+
+# Columns selectable for the CSV export: name -> header. All are plain applicants
+# columns, so the export never decodes JSON.
+CSV_COLUMNS = {
+    "application_id": "Application ID",
+    "full_name": "Name",
+    "email": "Email",
+    "college": "College",
+    "degree": "Degree",
+    "github": "GitHub",
+    "kaggle_url": "Kaggle",
+    "top_skills": "Top Skills",
+    "skill_count": "Skill Count",
+    "gh_repos": "GitHub Repos",
+    "gh_stars": "GitHub Stars",
+    "gh_followers": "GitHub Followers",
+    "gh_last_activity": "Last GitHub Activity",
+    "overall_score": "Overall Score",
+    "enrichment_status": "Status",
+    "created_at": "Submitted At",
+}
+# Same columns as the old client-side export
+DEFAULT_CSV_COLUMNS = [
+    "application_id", "full_name", "email", "college", "degree",
+    "top_skills", "gh_repos", "gh_stars", "overall_score",
+]
+
+
+def parse_csv_columns(columns: str) -> List[str]:
+    """Comma-separated column names -> validated list; raises ValueError on unknown names."""
+    if not columns.strip():
+        return list(DEFAULT_CSV_COLUMNS)
+    selected = [name.strip() for name in columns.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in CSV_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+    return selected
+
+
+def _csv_cell(value):
+    # Keep spreadsheet apps from evaluating applicant-supplied text as a formula
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        return "'" + value
+    return value
+
+
+def stream_csv_export(filters: ListingFilters, columns: List[str], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Applicants matching the dashboard filters, in the dashboard's sort order,
+    as CSV. Rows go from the cursor through csv.writer one chunk at a time.
+    """
+    conditions, params = filter_clause(filters)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"SELECT {', '.join(columns)} FROM applicants {where} ORDER BY {order_clause(filters)}"
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([CSV_COLUMNS[name] for name in columns])
+    # UTF-8 BOM so Excel detects the encoding
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+    for rows in snapshot_chunks(sql, params, chunk_size=chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_cell(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+COLUMNAR_EXPORT_SQL = """
+    SELECT application_id, full_name, email, college, degree, github, kaggle_url, enrichment_status,
+           created_at, overall_score, score_version, score_breakdown_json,
+           rating_programming, rating_dsa, rating_ml_ai, rating_web_dev, rating_tools,
+           parsed_resume_json, skill_count, education_count, experience_count,
+           github_json, gh_repos, gh_stars, gh_followers, gh_last_activity
+    FROM applicants ORDER BY id
+"""
+
+COLUMNAR_FORMATS = {
+    # format -> (file extension, media type)
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+
+def columnar_schema():
+    """Flat, typed schema of the analytics export."""
+    import pyarrow as pa
+
+    return pa.schema([
+        ("application_id", pa.string()),
+        ("full_name", pa.string()),
+        ("email", pa.string()),
+        ("college", pa.string()),
+        ("degree", pa.string()),
+        ("github", pa.string()),
+        ("kaggle_url", pa.string()),
+        ("enrichment_status", pa.string()),
+        ("created_at", pa.timestamp("s")),
+        ("overall_score", pa.float64()),
+        ("score_version", pa.int32()),
+        ("score_skills", pa.int32()),
+        ("score_resume", pa.int32()),
+        ("score_github", pa.int32()),
+        ("rating_programming", pa.float64()),
+        ("rating_dsa", pa.float64()),
+        ("rating_ml_ai", pa.float64()),
+        ("rating_web_dev", pa.float64()),
+        ("rating_tools", pa.float64()),
+        ("skills", pa.list_(pa.string())),
+        ("skill_count", pa.int32()),
+        ("education_count", pa.int32()),
+        ("experience_count", pa.int32()),
+        ("gh_repos", pa.int32()),
+        ("gh_stars", pa.int32()),
+        ("gh_followers", pa.int32()),
+        ("gh_top_languages", pa.list_(pa.string())),
+        ("gh_last_activity", pa.date32()),
+    ])
+
+
+def _timestamp(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S") if value else None
+    except ValueError:
+        return None
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value[:10]) if value else None
+    except ValueError:
+        return None
+
+
+def _string_list(value):
+    # Dicts (e.g. top_languages: language -> repo count, most used first) give their keys
+    return [str(item) for item in value] if isinstance(value, (list, dict)) else []
+
+
+def columnar_row(row) -> dict:
+    """One applicants row flattened to the columnar_schema() fields."""
+    breakdown = load_json_field(row["score_breakdown_json"])
+    resume = load_json_field(row["parsed_resume_json"])
+    github = load_json_field(row["github_json"])
+    return {
+        "application_id": row["application_id"],
+        "full_name": row["full_name"],
+        "email": row["email"],
+        "college": row["college"],
+        "degree": row["degree"],
+        "github": row["github"],
+        "kaggle_url": row["kaggle_url"],
+        "enrichment_status": row["enrichment_status"],
+        "created_at": _timestamp(row["created_at"]),
+        "overall_score": row["overall_score"],
+        "score_version": row["score_version"],
+        "score_skills": breakdown.get("skills"),
+        "score_resume": breakdown.get("resume"),
+        "score_github": breakdown.get("github"),
+        "rating_programming": row["rating_programming"],
+        "rating_dsa": row["rating_dsa"],
+        "rating_ml_ai": row["rating_ml_ai"],
+        "rating_web_dev": row["rating_web_dev"],
+        "rating_tools": row["rating_tools"],
+        "skills": _string_list(resume.get("skills")),
+        "skill_count": row["skill_count"],
+        "education_count": row["education_count"],
+        "experience_count": row["experience_count"],
+        "gh_repos": row["gh_repos"],
+        "gh_stars": row["gh_stars"],
+        "gh_followers": row["gh_followers"],
+        "gh_top_languages": _string_list(github.get("top_languages")),
+        "gh_last_activity": _date(row["gh_last_activity"]),
+    }
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose contents are handed out (and dropped) by drain()."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer.extend(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def stream_columnar_export(format: str = "parquet", batch_size: int = COLUMNAR_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    All applicants as a Parquet file or an Arrow IPC file, built one record
+    batch at a time from a snapshot cursor; each batch's bytes are yielded as
+    soon as it is written, so memory is bounded by batch_size rows.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = columnar_schema()
+    sink = _DrainableSink()
+    if format == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+
+    try:
+        for rows in snapshot_chunks(COLUMNAR_EXPORT_SQL, chunk_size=batch_size):
+            flattened = [columnar_row(row) for row in rows]
+            batch = pa.RecordBatch.from_pylist(flattened, schema=schema)
+            writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
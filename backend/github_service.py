@@ -1,62 +1,407 @@
-from typing import Dict, Any
+from typing import Dict, Any, NamedTuple, Optional
+import heapq
+import importlib.util
+import json
+import os
+import re
+import time
 import httpx
 import asyncio
 
-GITHUB_API_URL = "https://api.github.com"
+from backend.database import get_pool
+from backend.repository import run_in_db_thread
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+# Optional personal access token; raises the limit from 60 to 5,000 requests/hour
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "").strip()
+
+# Cached responses younger than this are served without contacting GitHub.
+# Older ones are revalidated with If-None-Match (a 304 does not count against the limit).
+GITHUB_CACHE_TTL_SECONDS = float(os.getenv("GITHUB_CACHE_TTL_SECONDS", "21600"))
+# Longest a request sleeps for the rate-limit window to reset. Later resets
+# raise GitHubRateLimited, and the enrichment job is re-queued for the reset time.
+GITHUB_MAX_RATE_LIMIT_WAIT = float(os.getenv("GITHUB_MAX_RATE_LIMIT_WAIT", "60"))
+
+# Repository pagination: GitHub returns at most 100 repos per page
+GITHUB_REPOS_PER_PAGE = 100
+# Upper bound on pages read per user (protects against accounts with thousands of forks)
+GITHUB_MAX_REPO_PAGES = int(os.getenv("GITHUB_MAX_REPO_PAGES", "10"))
+# Pages fetched concurrently for a single user
+GITHUB_PAGE_CONCURRENCY = int(os.getenv("GITHUB_PAGE_CONCURRENCY", "4"))
+
+# Optional stage: real language proportions from each repo's /languages endpoint
+GITHUB_LANGUAGE_BYTES = os.getenv("GITHUB_LANGUAGE_BYTES", "0").lower() in ("1", "true", "yes")
+GITHUB_LANGUAGE_CONCURRENCY = int(os.getenv("GITHUB_LANGUAGE_CONCURRENCY", "4"))
+# Only the most recently pushed repos are broken down (one request each on a cache miss)
+GITHUB_MAX_LANGUAGE_REPOS = int(os.getenv("GITHUB_MAX_LANGUAGE_REPOS", "30"))
+
+# Matches the page number of the rel="last" entry in a Link header
+_LAST_PAGE_RE = re.compile(r'<[^>]*[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+# Shared client tuning
+GITHUB_CONNECT_TIMEOUT = float(os.getenv("GITHUB_CONNECT_TIMEOUT", "5"))
+GITHUB_READ_TIMEOUT = float(os.getenv("GITHUB_READ_TIMEOUT", "10"))
+GITHUB_MAX_CONNECTIONS = int(os.getenv("GITHUB_MAX_CONNECTIONS", "20"))
+GITHUB_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GITHUB_MAX_KEEPALIVE_CONNECTIONS", "10"))
+GITHUB_KEEPALIVE_EXPIRY = float(os.getenv("GITHUB_KEEPALIVE_EXPIRY", "30"))
+
+# Application-scoped client, opened in the FastAPI lifespan
+_client = None
+
+
+def create_github_client() -> httpx.AsyncClient:
+    """
+    Builds a pooled keep-alive client for api.github.com.
+    HTTP/2 is used when the optional 'h2' package is installed.
+    """
+    return httpx.AsyncClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        timeout=httpx.Timeout(
+            connect=GITHUB_CONNECT_TIMEOUT,
+            read=GITHUB_READ_TIMEOUT,
+            write=GITHUB_READ_TIMEOUT,
+            pool=GITHUB_CONNECT_TIMEOUT,
+        ),
+        limits=httpx.Limits(
+            max_connections=GITHUB_MAX_CONNECTIONS,
+            max_keepalive_connections=GITHUB_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=GITHUB_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+async def open_github_client():
+    """Opens the shared client. Called once at application startup."""
+    global _client
+    if _client is None:
+        _client = create_github_client()
+    return _client
+
+
+async def close_github_client():
+    """Closes the shared client and its pooled connections. Called on shutdown."""
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+
+
+def get_github_client() -> httpx.AsyncClient:
+    """Returns the shared client, creating it on first use outside the app (scripts, tests)."""
+    global _client
+    if _client is None:
+        _client = create_github_client()
+    return _client
+
+class GitHubRateLimited(Exception):
+    """Raised when the rate-limit window resets later than GITHUB_MAX_RATE_LIMIT_WAIT."""
+
+    def __init__(self, message: str, reset_at: float):
+        super().__init__(message)
+        self.reset_at = reset_at
+
+
+class GitHubRateLimiter:
+    """
+    Token bucket refilled by GitHub itself: every response reports how many
+    requests are left (X-RateLimit-Remaining) and when the window resets
+    (X-RateLimit-Reset). Calls made with an empty bucket sleep until the reset
+    instead of failing.
+    """
+
+    def __init__(self, max_wait: float = GITHUB_MAX_RATE_LIMIT_WAIT):
+        self.max_wait = max_wait
+        self.remaining = None  # Unknown until the first response
+        self.reset_at = 0.0
+
+    async def acquire(self):
+        while True:
+            now = time.time()
+            if self.remaining is not None and now >= self.reset_at:
+                # Window has reset; the next response tells us the new budget
+                self.remaining = None
+            if self.remaining is None or self.remaining > 0:
+                if self.remaining is not None:
+                    self.remaining -= 1
+                return
+
+            wait = self.reset_at - now
+            if wait > self.max_wait:
+                raise GitHubRateLimited(f"GitHub rate limit resets in {int(wait)}s", self.reset_at)
+            print(f"GitHub rate limit reached, waiting {wait:.0f}s for reset")
+            await asyncio.sleep(wait)
+
+    def update(self, headers):
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            self.remaining = int(remaining)
+            self.reset_at = float(reset)
+        except ValueError:
+            pass
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining == 0 and time.time() < self.reset_at
+
+
+rate_limiter = GitHubRateLimiter()
+
+
+class GitHubResponse(NamedTuple):
+    status: int
+    data: Any
+    link: Optional[str] = None
+
+
+def _request_headers() -> dict:
+    headers = {"Accept": "application/vnd.github.v3+json", "User-Agent": "InternshipParser/1.0"}
+    if GITHUB_TOKEN:
+        headers["Authorization"] = f"Bearer {GITHUB_TOKEN}"
+    return headers
+
+
+def _load_cached_response(url: str):
+    with get_pool().reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT etag, body_json, link, fetched_at FROM github_cache WHERE url = ?", (url,))
+        return cursor.fetchone()
+
+
+def _store_cached_response(url: str, etag, body_json: str, link):
+    with get_pool().writer() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO github_cache (url, etag, body_json, link, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (url, etag, body_json, link, time.time())
+        )
+
+
+def _touch_cached_response(url: str):
+    with get_pool().writer() as conn:
+        conn.execute("UPDATE github_cache SET fetched_at = ? WHERE url = ?", (time.time(), url))
+
+
+async def _rate_limited_get(url: str, headers: dict) -> httpx.Response:
+    """GET on the shared client, paced by the rate limiter."""
+    client = get_github_client()
+    # A second attempt is made only after waiting out an exhausted rate limit
+    for _ in range(2):
+        await rate_limiter.acquire()
+        resp = await client.get(url, headers=headers)
+        rate_limiter.update(resp.headers)
+        if resp.status_code in (403, 429) and rate_limiter.exhausted:
+            continue
+        break
+    return resp
+
+
+async def github_get(path: str) -> GitHubResponse:
+    """
+    GET a GitHub API path through the persistent response cache.
+    Fresh entries are returned directly; stale ones are revalidated with their
+    ETag. Requests wait on the rate limiter rather than failing when it is empty.
+    """
+    url = f"{GITHUB_API_URL}{path}"
+    cached = await run_in_db_thread(_load_cached_response, url)
+    if cached and time.time() - cached["fetched_at"] < GITHUB_CACHE_TTL_SECONDS:
+        return GitHubResponse(200, json.loads(cached["body_json"]), cached["link"])
+
+    headers = _request_headers()
+    if cached and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+
+    resp = await _rate_limited_get(url, headers)
+
+    if resp.status_code == 304 and cached:
+        await run_in_db_thread(_touch_cached_response, url)
+        return GitHubResponse(200, json.loads(cached["body_json"]), cached["link"])
+
+    if resp.status_code == 200:
+        await run_in_db_thread(_store_cached_response, url, resp.headers.get("ETag"), resp.text, resp.headers.get("Link"))
+        return GitHubResponse(200, resp.json(), resp.headers.get("Link"))
+
+    return GitHubResponse(resp.status_code, None)
+
+
+def _last_page(link: Optional[str]) -> int:
+    """Page count advertised by a Link header (1 when there is no next page)."""
+    if not link:
+        return 1
+    match = _LAST_PAGE_RE.search(link)
+    return int(match.group(1)) if match else 1
+
+
+class RepoAggregate:
+    """
+    Streaming fold over repository pages. Each page is folded in as it arrives
+    and then dropped, so large accounts never have their full repo list in memory.
+    """
+
+    def __init__(self, language_repo_limit: int = 0):
+        self.repo_count = 0
+        self.total_stars = 0
+        self.languages = {}
+        self.last_pushed_at = ""
+        # Min-heap of (pushed_at, full_name): the most recently pushed own repos
+        self.language_repo_limit = language_repo_limit
+        self.language_repos = []
+
+    def add_page(self, repos):
+        for repo in repos:
+            if self.language_repo_limit and not repo.get("fork") and not repo.get("archived") and repo.get("full_name"):
+                entry = (repo.get("pushed_at") or "", repo["full_name"])
+                if len(self.language_repos) < self.language_repo_limit:
+                    heapq.heappush(self.language_repos, entry)
+                else:
+                    heapq.heappushpop(self.language_repos, entry)
+            self.repo_count += 1
+            self.total_stars += repo.get("stargazers_count", 0) or 0
+            lang = repo.get("language")
+            if lang:
+                self.languages[lang] = self.languages.get(lang, 0) + 1
+            pushed_at = repo.get("pushed_at") or ""
+            if pushed_at > self.last_pushed_at:
+                self.last_pushed_at = pushed_at
+
+    @property
+    def last_activity(self) -> str:
+        return self.last_pushed_at.split("T")[0] if self.last_pushed_at else "N/A"
+
+    @property
+    def top_languages(self) -> dict:
+        # Sort languages by usage
+        return dict(sorted(self.languages.items(), key=lambda item: item[1], reverse=True))
+
+
+def _load_repo_languages(full_name: str, pushed_at: str):
+    """Cached language bytes for a repo, or None if missing or the repo was pushed since."""
+    with get_pool().reader() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT languages_json FROM github_repo_languages WHERE full_name = ? AND pushed_at = ?",
+            (full_name, pushed_at)
+        )
+        row = cursor.fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def _store_repo_languages(full_name: str, pushed_at: str, languages: dict):
+    with get_pool().writer() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO github_repo_languages (full_name, pushed_at, languages_json) VALUES (?, ?, ?)",
+            (full_name, pushed_at, json.dumps(languages))
+        )
+
+
+async def aggregate_language_bytes(language_repos) -> dict:
+    """
+    Sums /repos/{full_name}/languages byte counts over (pushed_at, full_name) pairs.
+    Results are cached per repo and keyed by pushed_at, so unchanged repos are never
+    fetched twice. At most GITHUB_LANGUAGE_CONCURRENCY requests are in flight.
+    """
+    totals = {}
+    semaphore = asyncio.Semaphore(max(1, GITHUB_LANGUAGE_CONCURRENCY))
+
+    async def fetch_languages(pushed_at: str, full_name: str):
+        cached = await run_in_db_thread(_load_repo_languages, full_name, pushed_at)
+        if cached is not None:
+            return cached
+        async with semaphore:
+            resp = await _rate_limited_get(f"{GITHUB_API_URL}/repos/{full_name}/languages", _request_headers())
+        if resp.status_code != 200:
+            return {}
+        languages = resp.json()
+        await run_in_db_thread(_store_repo_languages, full_name, pushed_at, languages)
+        return languages
+
+    for result in asyncio.as_completed([fetch_languages(*entry) for entry in language_repos]):
+        for lang, size in (await result).items():
+            totals[lang] = totals.get(lang, 0) + size
+
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+async def aggregate_repos(username: str) -> tuple:
+    """
+    Reads every repo page for a user (up to GITHUB_MAX_REPO_PAGES) into a RepoAggregate.
+    The first page's Link header gives the page count; the remaining pages are
+    fetched concurrently, at most GITHUB_PAGE_CONCURRENCY at a time.
+    Returns (aggregate, truncated).
+    """
+    aggregate = RepoAggregate(GITHUB_MAX_LANGUAGE_REPOS if GITHUB_LANGUAGE_BYTES else 0)
+    path = f"/users/{username}/repos?per_page={GITHUB_REPOS_PER_PAGE}&page="
+
+    first = await github_get(path + "1")
+    if first.status != 200:
+        return aggregate, False
+    aggregate.add_page(first.data)
+
+    total_pages = _last_page(first.link)
+    last_page = min(total_pages, max(1, GITHUB_MAX_REPO_PAGES))
+    semaphore = asyncio.Semaphore(max(1, GITHUB_PAGE_CONCURRENCY))
+
+    async def fetch_page(page: int) -> GitHubResponse:
+        async with semaphore:
+            return await github_get(path + str(page))
+
+    for next_page in asyncio.as_completed([fetch_page(page) for page in range(2, last_page + 1)]):
+        resp = await next_page
+        if resp.status == 200:
+            aggregate.add_page(resp.data)
+
+    return aggregate, total_pages > last_page
+
 
 async def analyze_github(github_url: str) -> Dict[str, Any]:
     """
     Analyzes a GitHub profile via the public API.
+    Raises GitHubRateLimited if the rate limit resets too far in the future.
     """
     username = github_url.rstrip("/").split("/")[-1]
-    
-    # Simple unauthenticated request (rate limits apply)
-    # In prod, we should use a token
-    headers = {"Accept": "application/vnd.github.v3+json", "User-Agent": "InternshipParser/1.0"}
 
-    async with httpx.AsyncClient() as client:
-        try:
-            # 1. Get User Details
-            user_resp = await client.get(f"{GITHUB_API_URL}/users/{username}", headers=headers)
-            if user_resp.status_code != 200:
-                print(f"Failed to fetch user {username}: {user_resp.status_code}")
-                return {"error": "User not found or API limit exceeded"}
-            
-            user_data = user_resp.json()
-            
-            # 2. Get Repositories
-            repos_resp = await client.get(f"{GITHUB_API_URL}/users/{username}/repos?per_page=100", headers=headers)
-            repos = repos_resp.json() if repos_resp.status_code == 200 else []
-
-            # 3. Aggregate Data
-            total_stars = 0
-            languages = {}
-            last_activity = "N/A"
-            
-            sorted_repos = sorted(repos, key=lambda x: x.get("pushed_at", ""), reverse=True)
-            if sorted_repos:
-                last_activity = sorted_repos[0].get("pushed_at", "N/A").split("T")[0]
-
-            for repo in repos:
-                total_stars += repo.get("stargazers_count", 0)
-                lang = repo.get("language")
-                if lang:
-                    languages[lang] = languages.get(lang, 0) + 1
-            
-            # Sort languages by usage
-            sorted_languages = dict(sorted(languages.items(), key=lambda item: item[1], reverse=True))
-
-            return {
-                "username": username,
-                "avatar_url": user_data.get("avatar_url"),
-                "bio": user_data.get("bio"),
-                "public_repos": user_data.get("public_repos"),
-                "followers": user_data.get("followers"),
-                "total_stars": total_stars,
-                "top_languages": sorted_languages,
-                "last_activity": last_activity
-            }
-
-        except Exception as e:
-            print(f"Error accessing GitHub API: {e}")
-            return {"error": str(e)}
+    try:
+        # 1. Get User Details
+        user_resp = await github_get(f"/users/{username}")
+        if user_resp.status in (403, 429) and rate_limiter.exhausted:
+            raise GitHubRateLimited("GitHub rate limit exhausted", rate_limiter.reset_at)
+        if user_resp.status != 200:
+            print(f"Failed to fetch user {username}: {user_resp.status}")
+            return {"error": "User not found or API limit exceeded"}
+        
+        user_data = user_resp.data
+        
+        # 2. Get Repositories (all pages, folded as they arrive)
+        aggregate, truncated = await aggregate_repos(username)
+
+        result = {
+            "username": username,
+            "avatar_url": user_data.get("avatar_url"),
+            "bio": user_data.get("bio"),
+            "public_repos": user_data.get("public_repos"),
+            "followers": user_data.get("followers"),
+            "total_stars": aggregate.total_stars,
+            "top_languages": aggregate.top_languages,
+            "last_activity": aggregate.last_activity,
+            "repos_analyzed": aggregate.repo_count,
+            "repos_truncated": truncated
+        }
+
+        # 3. Optional: byte-level language breakdown across own, active repos
+        if GITHUB_LANGUAGE_BYTES:
+            language_bytes = await aggregate_language_bytes(aggregate.language_repos)
+            total_bytes = sum(language_bytes.values())
+            result["language_bytes"] = language_bytes
+            result["language_share"] = {
+                lang: round(size * 100 / total_bytes, 1) for lang, size in language_bytes.items()
+            } if total_bytes else {}
+
+        return result
+
+    except GitHubRateLimited:
+        # Not a profile problem: the caller retries once the window resets
+        raise
+    except Exception as e:
+        print(f"Error accessing GitHub API: {e}")
+        return {"error": str(e)}
@@ -0,0 +1,158 @@
+from dataclasses import dataclass
+from typing import Literal, Optional
+import base64
+import json
+
+from fastapi import HTTPException, Query
+
+from backend.search import build_match_query
+
+# Dashboard sort keys -> applicants column. Every sort is tie-broken by id,
+# which makes (column, id) a unique keyset position.
+SORT_COLUMNS = {
+    "score": "overall_score",
+    "stars": "gh_stars",
+    "repos": "gh_repos",
+    "created": "created_at",
+}
+
+# Narrow, typed column list for the list view (no JSON blobs); the detail page loads the rest
+LIST_COLUMNS = [
+    "id", "application_id", "full_name", "email", "college", "degree",
+    "overall_score", "enrichment_status", "skill_count", "top_skills",
+    "gh_repos", "gh_stars", "gh_followers", "gh_last_activity", "created_at",
+]
+
+ENRICHMENT_STATUSES = ("pending", "running", "done", "failed")
+
+# Skills shown in the list view (stored in applicants.top_skills)
+TOP_SKILLS_COUNT = 5
+
+
+@dataclass
+class ListingFilters:
+    """Sort, filter and search parameters shared by the dashboard and its exports."""
+    sort: str = "score"
+    order: str = "desc"
+    q: str = ""
+    status: str = ""
+    min_score: Optional[float] = None
+    college: str = ""
+
+
+def listing_filters(
+    sort: Literal["score", "stars", "repos", "created"] = "score",
+    order: Literal["desc", "asc"] = "desc",
+    q: str = "",
+    status: str = "",
+    min_score: Optional[float] = Query(default=None, ge=0, le=100),
+    college: str = "",
+) -> ListingFilters:
+    """FastAPI dependency reading ListingFilters from the query string."""
+    status = status.strip()
+    if status and status not in ENRICHMENT_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Unknown status '{status}'")
+    return ListingFilters(sort=sort, order=order, q=q.strip(), status=status, min_score=min_score, college=college.strip())
+
+
+def filter_clause(filters: ListingFilters):
+    """Returns (WHERE conditions, params) for the filters, without the keyset part."""
+    conditions, params = [], []
+    match = build_match_query(filters.q)
+    if match:
+        # Name, contact, education, skills and resume text, via the FTS5 index
+        conditions.append("id IN (SELECT rowid FROM applicants_fts WHERE applicants_fts MATCH ?)")
+        params.append(match)
+    if filters.status:
+        conditions.append("enrichment_status = ?")
+        params.append(filters.status)
+    if filters.min_score is not None:
+        conditions.append("overall_score >= ?")
+        params.append(filters.min_score)
+    if filters.college:
+        conditions.append("college LIKE ?")
+        params.append(f"%{filters.college}%")
+    return conditions, params
+
+
+def order_clause(filters: ListingFilters, reverse: bool = False) -> str:
+    direction = "DESC" if (filters.order == "desc") != reverse else "ASC"
+    column = SORT_COLUMNS[filters.sort]
+    if column == "id":
+        return f"id {direction}"
+    return f"{column} {direction}, id {direction}"
+
+
+def encode_cursor(value, row_id: int) -> str:
+    raw = json.dumps([value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(row_id, int) or not (value is None or isinstance(value, (int, float, str))):
+            raise ValueError
+        return value, row_id
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid page cursor")
+
+
+def _seek_clause(column: str, descending: bool, value, row_id: int):
+    """
+    Rows strictly after (value, row_id) in ORDER BY column, id. SQLite sorts
+    NULL lowest: last when descending, first when ascending.
+    """
+    if column == "id":
+        return ("id < ?", [row_id]) if descending else ("id > ?", [row_id])
+    if descending:
+        if value is None:
+            return f"({column} IS NULL AND id < ?)", [row_id]
+        return f"({column} < ? OR ({column} = ? AND id < ?) OR {column} IS NULL)", [value, value, row_id]
+    if value is None:
+        return f"({column} IS NOT NULL OR id > ?)", [row_id]
+    return f"({column} > ? OR ({column} = ? AND id > ?))", [value, value, row_id]
+
+
+def fetch_page(conn, filters: ListingFilters, after: str = None, before: str = None, limit: int = 50):
+    """
+    One keyset page of applicants. `after` / `before` are cursors from a
+    previous page. Returns (rows, next_cursor, prev_cursor).
+    """
+    column = SORT_COLUMNS[filters.sort]
+    conditions, params = filter_clause(filters)
+    backwards = bool(before) and not after
+    cursor_value = decode_cursor(before if backwards else after) if (after or before) else None
+
+    if cursor_value:
+        descending = (filters.order == "desc") != backwards
+        seek, seek_params = _seek_clause(column, descending, *cursor_value)
+        conditions.append(seek)
+        params.extend(seek_params)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT {', '.join(LIST_COLUMNS)} FROM applicants {where} "
+        f"ORDER BY {order_clause(filters, reverse=backwards)} LIMIT ?",
+        (*params, limit + 1)
+    )
+    rows = cursor.fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    def position(row):
+        return encode_cursor(row[column], row["id"])
+
+    next_cursor = prev_cursor = None
+    if rows:
+        # Going forward there is a previous page whenever we started from a cursor
+        if has_more or backwards:
+            next_cursor = position(rows[-1])
+        if cursor_value and (has_more or not backwards):
+            prev_cursor = position(rows[0])
+    return rows, next_cursor, prev_cursor
@@ -1,10 +1,14 @@
-from fastapi import FastAPI, Request, Form, UploadFile, File, Depends, HTTPException
-from fastapi.responses import RedirectResponse
+from fastapi import FastAPI, Request, Form, UploadFile, File, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel, Field
 import os
-import shutil
 import json
+from dataclasses import asdict
+from urllib.parse import urlencode
+from contextlib import asynccontextmanager
+from typing import Literal
 from pathlib import Path
 from starlette.middleware.sessions import SessionMiddleware
 from dotenv import load_dotenv
@@ -18,30 +22,63 @@ import sys
 # Add the project root directory to sys.path so 'backend' module can be found
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.database import get_db, init_db, create_applicant
-from backend.resume_parser import parse_resume
-from backend.github_service import analyze_github
-from backend.email_service import send_confirmation_email
-from backend.utils import generate_application_id
-from backend.scoring import calculate_score
-
-app = FastAPI()
+from backend.database import init_db, close_pool
+from backend import repository
+from backend.enrichment import enrichment_queue
+from backend.email_service import email_worker
+from backend.digest import digest_scheduler
+from backend.outbox import outbox_stats
+from backend.parse_pool import parse_pool
+from backend.github_service import open_github_client, close_github_client
+from backend.resume_store import save_resume_upload
+from backend.blob_store import run_blob_io, shutdown_blob_io
+from backend.profiles import load_profile
+from backend.summaries import summary_etag
+from backend.ranking import feature_matrix
+from backend.listing import ListingFilters, listing_filters
+from backend.exports import (
+    stream_json_export, stream_csv_export, parse_csv_columns, gzip_stream, export_filename,
+    stream_columnar_export, ARROW_AVAILABLE, COLUMNAR_FORMATS
+)
+from backend.scoring import validate_weights
+from backend.utils import generate_application_id, load_json_field
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initializes the DB and opens the shared clients and worker pools for the app's lifetime."""
+    init_db()
+    feature_matrix.load()
+    parse_pool.start()
+    await open_github_client()
+    enrichment_queue.start()
+    email_worker.start()
+    digest_scheduler.start(on_queued=email_worker.notify)
+    try:
+        yield
+    finally:
+        await digest_scheduler.stop()
+        await email_worker.stop()
+        await enrichment_queue.stop()
+        await close_github_client()
+        parse_pool.shutdown()
+        repository.shutdown_db_threads()
+        shutdown_blob_io()
+        close_pool()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add Session Middleware
 app.add_middleware(SessionMiddleware, secret_key=os.getenv("SECRET_KEY", "fallback_secret_key"))
 
-# Mount static files
+# Mount static files (resumes are served by the authenticated /admin/applicant/{id}/resume)
 app.mount("/static", StaticFiles(directory="static"), name="static")
-app.mount("/applications", StaticFiles(directory="applications"), name="applications")
+
+# Resume files never change for an applicant (content-addressed), so browsers may keep them this long
+RESUME_CACHE_SECONDS = int(os.getenv("RESUME_CACHE_SECONDS", "86400"))
 
 # Configure Jinja2 templates
 templates = Jinja2Templates(directory="templates")
 
-# Initialize DB on startup
-@app.on_event("startup")
-def on_startup():
-    init_db()
-
 @app.get("/")
 def landing_page(request: Request):
     """Serves the main landing page."""
@@ -58,14 +95,12 @@ def track_page(request: Request):
     return templates.TemplateResponse("track.html", {"request": request})
 
 @app.post("/track")
-async def track_application(request: Request, application_id: str = Form(...), db = Depends(get_db)):
+async def track_application(request: Request, application_id: str = Form(...)):
     """Handles tracking form submission."""
     # sanitization
     application_id = application_id.strip()
     
-    cursor = db.cursor()
-    cursor.execute("SELECT id FROM applicants WHERE application_id = ?", (application_id,))
-    if cursor.fetchone():
+    if await repository.applicant_exists(application_id):
         return RedirectResponse(url=f"/dashboard/{application_id}", status_code=303)
     else:
         return templates.TemplateResponse("track.html", {
@@ -88,8 +123,7 @@ async def submit_application(
     skill_ml: int = Form(...),
     skill_web: int = Form(...),
     skill_tools: int = Form(...),
-    resume: UploadFile = File(...),
-    db = Depends(get_db)
+    resume: UploadFile = File(...)
 ):
     try:
         # Validate file type
@@ -99,16 +133,9 @@ async def submit_application(
         # 1. Generate unique application_id
         application_id = generate_application_id()
 
-        # 2. Creates application folder safely
-        # Ensure the 'applications' parent directory exists
+        # 2. Save resume into the content-addressed store (hashed while streaming to disk)
         try:
-            app_folder = Path(f"applications/{application_id}")
-            app_folder.mkdir(parents=True, exist_ok=True)
-            
-            # Save resume
-            resume_path = app_folder / "resume.pdf"
-            with open(resume_path, "wb") as buffer:
-                shutil.copyfileobj(resume.file, buffer)
+            resume_hash, resume_path = await save_resume_upload(resume)
         except Exception as e:
             print(f"Filesystem Error: {e}")
             raise HTTPException(status_code=500, detail="Failed to save application files.")
@@ -125,117 +152,38 @@ async def submit_application(
             "Tools": skill_tools
         }
 
-        # Safe defaults
+        # Safe defaults, filled in by the enrichment workers
         parsed_resume_data = {}
         github_data = {}
 
         try:
-            create_applicant(db, (
-                full_name,
-                email,
-                college,
-                degree,
-                github,
-                kaggle,
-                str(resume_path),
-                json.dumps(parsed_resume_data), # Initially empty
-                json.dumps(github_data),        # Initially empty
-                json.dumps(self_ratings),
-                application_id,
-                0.0,             # Initial overall_score
-                json.dumps({})   # Initial score_breakdown
-            ))
-        except Exception as e:
-            print(f"Database Insert Error: {e}")
-            raise HTTPException(status_code=500, detail="Database insertion failed.")
-
-        # 4. Parse Resume safely (Non-blocking failure)
-        try:
-            # parse_resume is async, so proper await usage is critical
-            parsed_resume_data = await parse_resume(str(resume_path))
-        except Exception as e:
-            print(f"Resume Parsing Failed for {application_id}: {e}")
-            parsed_resume_data = {"error": "Resume parsing failed", "details": str(e)}
-
-        # 5. Analyze GitHub safely (Non-blocking failure)
-        try:
-            # Extract username from URL if needed
-            github_username = github.split("/")[-1] if "github.com" in github else github
-            # analyze_github is async
-            github_data = await analyze_github(github_username)
-        except Exception as e:
-            print(f"GitHub Analysis Failed for {application_id}: {e}")
-            github_data = {"error": "GitHub analysis failed", "details": str(e)}
-
-        # 6. Update Database with enriched data
-        # Calculate Score
-        try:
-            score_result = calculate_score(self_ratings, parsed_resume_data, github_data)
-            print(f"DEBUG: Score Result for {application_id}: {score_result}")
-            overall_score = score_result.get("overall_score", 0)
-            score_breakdown = score_result.get("breakdown", {})
-        except Exception as e:
-            print(f"Scoring Failed for {application_id}: {e}")
-            overall_score = 0
-            score_breakdown = {}
-
-        # We perform an UPDATE now that we have (potentially) enriched data
-        # CRITICAL: We store the entire parsed_resume_data as a JSON string.
-        # This preserves all fields (name, email, skills, education, experience) without data loss.
-        try:
-            cursor = db.cursor()
-            cursor.execute("""
-                UPDATE applicants 
-                SET parsed_resume_json = ?, github_json = ?, overall_score = ?, score_breakdown_json = ?
-                WHERE application_id = ?
-            """, (
-                json.dumps(parsed_resume_data, default=str), 
-                json.dumps(github_data, default=str), 
-                overall_score,
-                json.dumps(score_breakdown),
-                application_id
-            ))
-            db.commit()
-        except Exception as e:
-            print(f"Database Update Failed for {application_id}: {e}")
-            # We do NOT raise here, because the application is already submitted successfully.
-            # The user can still see their dashboard, just without enriched data.
-
-        # 6.5 Save Full Profile JSON to Disk
-        try:
-            full_profile = {
-                "application_id": application_id,
+            await repository.insert_applicant({
                 "full_name": full_name,
                 "email": email,
                 "college": college,
                 "degree": degree,
                 "github": github,
-                "kaggle": kaggle,
-                "self_ratings": self_ratings,
-                "parsed_resume": parsed_resume_data,
-                "github_analysis": github_data,
-                "resume_path": str(resume_path)
-            }
-            
-            profile_path = app_folder / "profile.json"
-            with open(profile_path, "w", encoding='utf-8') as f:
-                json.dump(full_profile, f, indent=4, default=str)
-                
-            print(f"✅ Profile JSON saved to {profile_path}")
-            
+                "kaggle_url": kaggle,
+                "resume_path": resume_path.as_posix(),
+                "parsed_resume_json": json.dumps(parsed_resume_data), # Initially empty
+                "github_json": json.dumps(github_data),               # Initially empty
+                "self_rating_json": json.dumps(self_ratings),
+                "application_id": application_id,
+                "overall_score": 0.0,                                 # Initial overall_score
+                "score_breakdown_json": json.dumps({}),               # Initial score_breakdown
+                "resume_hash": resume_hash
+            })
         except Exception as e:
-            print(f"Failed to save profile.json for {application_id}: {e}")
-
+            print(f"Database Insert Error: {e}")
+            raise HTTPException(status_code=500, detail="Database insertion failed.")
 
-        # 7. Send confirmation email safely
-        try:
-            print(f"DEBUG: Triggering email for {email}")
-            send_confirmation_email(email, application_id)
-        except Exception as e:
-            print(f"Email sending failed for {application_id}: {e}")
-            # Fail silently regarding the response to user; logging is sufficient.
+        # 4. Wake the background workers. Parsing, GitHub analysis, scoring and profile.json
+        # run in the enrichment workers (see backend/enrichment.py); the confirmation email
+        # is delivered from email_outbox. Both were queued in the same transaction as the applicant.
+        enrichment_queue.notify()
+        email_worker.notify()
 
-        # 8. Redirect to dashboard
+        # 5. Redirect to dashboard
         return RedirectResponse(url=f"/dashboard/{application_id}", status_code=303)
 
     except HTTPException as he:
@@ -247,18 +195,15 @@ async def submit_application(
         raise HTTPException(status_code=500, detail="Internal Server Error during application processing.")
 
 @app.get("/dashboard/{application_id}")
-async def dashboard(request: Request, application_id: str, db = Depends(get_db)):
+async def dashboard(request: Request, application_id: str):
     """User dashboard to view their application status."""
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM applicants WHERE application_id = ?", (application_id,))
-    applicant = cursor.fetchone()
+    applicant_dict = await repository.get_applicant_by_app_id(application_id)
     
-    if not applicant:
+    if not applicant_dict:
         raise HTTPException(status_code=404, detail="Application not found")
     
     # Parse JSON strings back to dicts for the template
     # This ensures the full resume structure is passed to the frontend
-    applicant_dict = dict(applicant)
     if applicant_dict.get("parsed_resume_json"):
         try:
             applicant_dict["parsed_resume"] = json.loads(applicant_dict["parsed_resume_json"])
@@ -283,41 +228,90 @@ async def dashboard(request: Request, application_id: str, db = Depends(get_db))
     })
 
 @app.get("/admin/applicant/{application_id}")
-async def admin_applicant_detail(request: Request, application_id: str, db = Depends(get_db)):
+async def admin_applicant_detail(request: Request, application_id: str):
     """View detailed applicant info by Application ID."""
     # Check session
     if not request.session.get("admin_logged_in"):
         return RedirectResponse(url="/admin/login", status_code=303)
 
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM applicants WHERE application_id = ?", (application_id,))
-    applicant = cursor.fetchone()
+    app_dict = await repository.get_applicant_by_app_id(application_id)
     
-    if not applicant:
+    if not app_dict:
         raise HTTPException(status_code=404, detail="Applicant not found")
 
-    app_dict = dict(applicant)
-
-    # Helper function to safely parse JSON or return default
-    def safe_json_load(json_str, default):
-        if not json_str:
-            return default
-        try:
-            return json.loads(json_str)
-        except json.JSONDecodeError:
-            return default
-
     # Parse JSON fields
-    app_dict["parsed_resume"] = safe_json_load(app_dict.get("parsed_resume_json"), {})
-    app_dict["github_data"] = safe_json_load(app_dict.get("github_json"), {})
-    app_dict["self_ratings"] = safe_json_load(app_dict.get("self_rating_json"), {})
-    app_dict["score_breakdown"] = safe_json_load(app_dict.get("score_breakdown_json"), {})
+    app_dict["parsed_resume"] = load_json_field(app_dict.get("parsed_resume_json"))
+    app_dict["github_data"] = load_json_field(app_dict.get("github_json"))
+    app_dict["self_ratings"] = load_json_field(app_dict.get("self_rating_json"))
+    app_dict["score_breakdown"] = load_json_field(app_dict.get("score_breakdown_json"))
 
     return templates.TemplateResponse("admin_applicant_detail.html", {
         "request": request,
         "applicant": app_dict
     })
 
+@app.get("/admin/applicant/{application_id}/profile.json")
+async def admin_applicant_profile(request: Request, application_id: str):
+    """The applicant's full profile document (built from the DB unless a stored copy exists)."""
+    if not request.session.get("admin_logged_in"):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    profile = await load_profile(application_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Applicant not found")
+    return profile
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match lists etag (or is *)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+@app.get("/admin/applicant/{application_id}/resume")
+async def admin_applicant_resume(request: Request, application_id: str):
+    """
+    The applicant's resume PDF. Served with a strong ETag (the file's SHA-256),
+    Cache-Control and Range support (Starlette's FileResponse).
+    """
+    if not request.session.get("admin_logged_in"):
+        return RedirectResponse(url="/admin/login", status_code=303)
+
+    resume = await repository.get_resume_file(application_id)
+    if not resume or not resume["resume_path"] or not await run_blob_io(os.path.isfile, resume["resume_path"]):
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    headers = {
+        "Cache-Control": f"private, max-age={RESUME_CACHE_SECONDS}",
+        "Content-Disposition": f'inline; filename="resume-{application_id}.pdf"',
+    }
+    if resume["resume_hash"]:
+        etag = f'"{resume["resume_hash"]}"'
+        headers["ETag"] = etag
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+    return FileResponse(resume["resume_path"], media_type="application/pdf", headers=headers)
+
+@app.get("/admin/api/applicant/{application_id}/summary")
+async def admin_applicant_summary(request: Request, application_id: str):
+    """
+    Compact hover summary for the dashboard (score breakdown, skills, languages,
+    GitHub counts, resume preview), with an ETag so repeat fetches get a 304.
+    """
+    if not request.session.get("admin_logged_in"):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    body = await repository.get_applicant_summary(application_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Applicant not found")
+
+    etag = summary_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @app.get("/admin/login")
 def admin_login_page(request: Request):
     """Serves the admin login page."""
@@ -355,132 +349,168 @@ async def admin_logout(request: Request):
     return RedirectResponse(url="/", status_code=303)
 
 @app.get("/admin")
-async def admin_dashboard(request: Request, db = Depends(get_db)):
-    """Admin dashboard to view all applicants."""
+async def admin_dashboard(
+    request: Request,
+    filters: ListingFilters = Depends(listing_filters),
+    after: str = None,
+    before: str = None,
+    limit: int = Query(default=50, ge=1, le=200)
+):
+    """Admin dashboard: one keyset page of applicants, sorted and filtered in SQL."""
     # Check session
     if not request.session.get("admin_logged_in"):
         return RedirectResponse(url="/admin/login", status_code=303)
-    
-    cursor = db.cursor()
-    # Order by overall_score DESC (NULLs last logic implicitly handled or we accept NULLs first/last depending on DB)
-    # Using simple ORDER BY overall_score DESC usually puts NULLs last in SQLite.
-    cursor.execute("SELECT * FROM applicants ORDER BY overall_score DESC")
-    applicants = cursor.fetchall()
-    
-    # Process data for the list view
-    processed_applicants = []
-    for app in applicants:
-        app_dict = dict(app)
-        
-        # Handle Score Display
-        score = app_dict.get("overall_score")
-        if score is not None:
-             app_dict["overall_score"] = round(float(score), 1)
-        else:
-             app_dict["overall_score"] = "N/A"
-
-        # 1. Parse Resume Data
-        if app_dict.get("parsed_resume_json"):
-            try:
-                resume_data = json.loads(app_dict["parsed_resume_json"])
-                app_dict["parsed_resume"] = resume_data # Fully parsed for detailed view
-                app_dict["skills_preview"] = ", ".join(resume_data.get("skills", [])[:5])
-            except json.JSONDecodeError:
-                app_dict["parsed_resume"] = {}
-                app_dict["skills_preview"] = "Data Error"
-        else:
-            app_dict["parsed_resume"] = {}
-            app_dict["skills_preview"] = "Processing..."
-            
-        # 2. Parse GitHub Data
-        if app_dict.get("github_json"):
-            try:
-                gh_data = json.loads(app_dict["github_json"])
-                app_dict["github_data"] = gh_data # Fully parsed for detailed view
-                app_dict["gh_stars"] = gh_data.get("total_stars", 0)
-                app_dict["gh_repos"] = gh_data.get("public_repos", 0)
-            except json.JSONDecodeError:
-                app_dict["github_data"] = {}
-                app_dict["gh_stars"] = "-"
-                app_dict["gh_repos"] = "-"  
-        else:
-            app_dict["github_data"] = {}
-            app_dict["gh_stars"] = "-"
-            app_dict["gh_repos"] = "-"
-
-        # 3. Parse Self Ratings
-        if app_dict.get("self_rating_json"):
-            try:
-                app_dict["self_ratings"] = json.loads(app_dict["self_rating_json"])
-            except json.JSONDecodeError:
-                 app_dict["self_ratings"] = {}
-        else:
-            app_dict["self_ratings"] = {}
-            
-        processed_applicants.append(app_dict)
+
+    # The list view reads only materialized columns; no JSON is decoded here
+    processed_applicants, next_cursor, prev_cursor = await repository.list_applicants_page(
+        filters, after=after, before=before, limit=limit
+    )
 
     return templates.TemplateResponse("admin_dashboard.html", {
         "request": request, 
-        "applicants": processed_applicants
+        "applicants": processed_applicants,
+        "filters": filters,
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+        "query_string": urlencode({
+            key: value for key, value in asdict(filters).items() if value not in ("", None)
+        })
     })
 
+@app.get("/admin/metrics")
+async def admin_metrics(request: Request):
+    """Runtime metrics for sizing the worker pools."""
+    if not request.session.get("admin_logged_in"):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    return {
+        "parse_pool": parse_pool.stats(),
+        "email_outbox": await repository.read(outbox_stats)
+    }
+
+@app.get("/admin/search")
+async def admin_search(
+    request: Request,
+    q: str = "",
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0)
+):
+    """Full-text search over applicant fields and resume text, best matches first."""
+    if not request.session.get("admin_logged_in"):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    return {
+        "query": q,
+        "results": await repository.search_applicants(q, limit=limit, offset=offset)
+    }
+
+class WhatIfRequest(BaseModel):
+    # Partial weights/caps overlaid on the active scoring config (see scoring.DEFAULT_WEIGHTS)
+    weights: dict = Field(default_factory=dict)
+    top_k: int = Field(default=20, ge=1, le=500)
+
+@app.post("/admin/api/what-if")
+async def admin_what_if(request: Request, payload: WhatIfRequest):
+    """Re-ranks every applicant under proposed weights without touching stored scores."""
+    if not request.session.get("admin_logged_in"):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    try:
+        validate_weights(payload.weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    version, current_weights = await repository.get_scoring_config()
+    # Proposed values override the active version, not the v1 defaults
+    proposed_weights = dict(current_weights, **payload.weights)
+    proposed_weights["self_ratings"] = dict(current_weights["self_ratings"], **payload.weights.get("self_ratings", {}))
+
+    result = feature_matrix.what_if(current_weights, proposed_weights, top_k=payload.top_k)
+    result["scoring_version"] = version
+    return result
+
 @app.get("/admin/export/json")
-async def admin_export_json(request: Request, db = Depends(get_db)):
-    """Export all candidates as a JSON file."""
+async def admin_export_json(
+    request: Request,
+    format: Literal["json", "ndjson"] = "json",
+    gzip: bool = False
+):
+    """
+    Export all candidates as a JSON array (or NDJSON), streamed from one
+    consistent DB snapshot. gzip=true compresses the stream.
+    """
     # Check session
     if not request.session.get("admin_logged_in"):
         return RedirectResponse(url="/admin/login", status_code=303)
 
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM applicants ORDER BY application_id")
-    applicants = cursor.fetchall()
+    ndjson = format == "ndjson"
+    body = stream_json_export(ndjson=ndjson)
+    media_type = "application/x-ndjson" if ndjson else "application/json"
+    filename = export_filename(format)
+    if gzip:
+        body = gzip_stream(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
-    export_data = []
-    for app in applicants:
-        app_dict = dict(app)
-        
-        # Helper to parse JSON fields safely
-        def parse_field(field_name):
-            try:
-                content = app_dict.get(field_name)
-                return json.loads(content) if content else {}
-            except json.JSONDecodeError:
-                return {}
-
-        # Construct structured export object
-        export_item = {
-            "application_id": app_dict["application_id"],
-            "full_name": app_dict["full_name"],
-            "email": app_dict["email"],
-            "college": app_dict["college"],
-            "degree": app_dict["degree"],
-            "github_profile": app_dict["github"],
-            "kaggle_profile": app_dict["kaggle"],
-            "resume_path": app_dict["resume_path"],
-            "overall_score": app_dict["overall_score"],
-            "self_ratings": parse_field("self_rating_json"),
-            "parsed_resume": parse_field("parsed_resume_json"),
-            "github_analysis": parse_field("github_json"),
-            "score_breakdown": parse_field("score_breakdown_json"),
-            "created_at": app_dict["created_at"]
-        }
-        export_data.append(export_item)
+@app.get("/admin/export/csv")
+async def admin_export_csv(
+    request: Request,
+    filters: ListingFilters = Depends(listing_filters),
+    columns: str = "",
+    gzip: bool = False
+):
+    """
+    Export the candidates matching the dashboard's filter, sort and search
+    parameters as CSV, streamed. `columns` is a comma-separated subset of
+    exports.CSV_COLUMNS.
+    """
+    if not request.session.get("admin_logged_in"):
+        return RedirectResponse(url="/admin/login", status_code=303)
 
-    # Generate filename with date
-    from datetime import datetime
-    date_str = datetime.now().strftime("%Y%m%d")
-    filename = f"eazeintern_candidates_{date_str}.json"
-    
-    # Return as downloadable file
-    from fastapi import Response
-    json_content = json.dumps(export_data, indent=4, default=str)
-    
-    return Response(
-        content=json_content,
-        media_type="application/json",
+    try:
+        selected = parse_csv_columns(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    body = stream_csv_export(filters, selected)
+    media_type = "text/csv; charset=utf-8"
+    filename = export_filename("csv")
+    if gzip:
+        body = gzip_stream(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
+@app.get("/admin/export/columnar")
+async def admin_export_columnar(request: Request, format: Literal["parquet", "arrow"] = "parquet"):
+    """
+    Export all candidates as a Parquet or Arrow IPC file with a flat typed
+    schema (see exports.columnar_schema), for loading straight into pandas.
+    """
+    if not request.session.get("admin_logged_in"):
+        return RedirectResponse(url="/admin/login", status_code=303)
+    if not ARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Columnar export requires the 'pyarrow' package")
+
+    extension, media_type = COLUMNAR_FORMATS[format]
+    return StreamingResponse(
+        stream_columnar_export(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={export_filename(extension)}"}
+    )
+
 if __name__ == "__main__":
     import uvicorn
     print("🚀 Starting Backend Server...")
@@ -1,35 +1,31 @@
-import sqlite3
 import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend import database
+from backend.migrations import MIGRATIONS, get_schema_version, run_migrations
 
-DB_NAME = "internship.db"
 
 def migrate():
-    if not os.path.exists(DB_NAME):
+    """Applies pending schema migrations (the app also does this at startup)."""
+    if not os.path.exists(database.DB_NAME):
         print("Database not found, nothing to migrate.")
         return
 
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-    
     try:
-        # Check if columns exist
-        cursor.execute("PRAGMA table_info(applicants)")
-        columns = [info[1] for info in cursor.fetchall()]
-        
-        if "overall_score" not in columns:
-            print("Adding overall_score to applicants table...")
-            cursor.execute("ALTER TABLE applicants ADD COLUMN overall_score REAL")
-            
-        if "score_breakdown_json" not in columns:
-            print("Adding score_breakdown_json to applicants table...")
-            cursor.execute("ALTER TABLE applicants ADD COLUMN score_breakdown_json TEXT")
-            
-        conn.commit()
+        # Migrations manage their own BEGIN IMMEDIATE transactions
+        with database.get_pool().writer(transaction=False) as conn:
+            applied = run_migrations(conn)
+            print(f"Applied migrations: {applied or 'none'}")
+            print(f"Schema version: {get_schema_version(conn)} (latest {MIGRATIONS[-1][0]})")
         print("Migration successful.")
     except Exception as e:
         print(f"Migration failed: {e}")
     finally:
-        conn.close()
+        database.close_pool()
+
 
 if __name__ == "__main__":
     migrate()
@@ -0,0 +1,388 @@
+import json
+
+from backend.scoring import DEFAULT_WEIGHTS
+from backend.search import CREATE_SEARCH_TABLE_SQL
+from backend.listing import TOP_SKILLS_COUNT
+
+# Columns added to applicants before the migration runner existed. The baseline
+# migration adds any that are missing, so databases of every older version converge.
+# Format: column name -> (column definition, optional backfill statement)
+APPLICANT_EXTRA_COLUMNS = {
+    "overall_score": ("REAL", None),
+    "score_breakdown_json": ("TEXT", None),
+    # Rows that existed before the enrichment queue were enriched inline.
+    "enrichment_status": ("TEXT DEFAULT 'pending'", "UPDATE applicants SET enrichment_status = 'done'"),
+    # SHA-256 of the uploaded PDF (key into the content-addressed store and parse_cache)
+    "resume_hash": ("TEXT", None),
+    # Results of enrichment providers that have no dedicated column (e.g. kaggle)
+    "provider_data_json": ("TEXT", None),
+    # Scoring inputs (see backend.scoring.FEATURE_COLUMNS) and the scoring_config version used
+    "rating_programming": ("REAL", None),
+    "rating_dsa": ("REAL", None),
+    "rating_ml_ai": ("REAL", None),
+    "rating_web_dev": ("REAL", None),
+    "rating_tools": ("REAL", None),
+    "skill_count": ("INTEGER", None),
+    "education_count": ("INTEGER", None),
+    "experience_count": ("INTEGER", None),
+    "gh_repos": ("INTEGER", None),
+    "gh_stars": ("INTEGER", None),
+    "gh_last_activity": ("TEXT", None),
+    "score_version": ("INTEGER", None),
+    # Display-only list view fields, written at enrichment (see backfill_list_columns)
+    "top_skills": ("TEXT", None),
+    "gh_followers": ("INTEGER", None),
+}
+
+
+def _baseline(conn):
+    """Everything init_db created before versioned migrations (all idempotent)."""
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS applicants (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            full_name TEXT,
+            email TEXT,
+            college TEXT,
+            degree TEXT,
+            github TEXT,
+            kaggle_url TEXT,
+            resume_path TEXT,
+            parsed_resume_json TEXT,
+            github_json TEXT,
+            self_rating_json TEXT,
+            application_id TEXT,
+            overall_score REAL,
+            score_breakdown_json TEXT,
+            enrichment_status TEXT DEFAULT 'pending',
+            resume_hash TEXT,
+            provider_data_json TEXT,
+            rating_programming REAL,
+            rating_dsa REAL,
+            rating_ml_ai REAL,
+            rating_web_dev REAL,
+            rating_tools REAL,
+            skill_count INTEGER,
+            education_count INTEGER,
+            experience_count INTEGER,
+            gh_repos INTEGER,
+            gh_stars INTEGER,
+            gh_last_activity TEXT,
+            score_version INTEGER,
+            top_skills TEXT,
+            gh_followers INTEGER
+        )
+    ''')
+    ensure_applicant_columns(conn)
+
+    # Keyset pagination indexes for the admin dashboard sorts (see backend.listing)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_applicants_score_id ON applicants (overall_score, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_applicants_stars_id ON applicants (gh_stars, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_applicants_repos_id ON applicants (gh_repos, id)")
+
+    # Durable queue for the post-submission enrichment pipeline
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS enrichment_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            application_id TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            available_at REAL NOT NULL DEFAULT 0,
+            last_error TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_enrichment_jobs_status ON enrichment_jobs (status, available_at)"
+    )
+
+    # parse_resume output per distinct PDF; a parser version bump simply stops matching old rows
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS parse_cache (
+            pdf_hash TEXT NOT NULL,
+            parser_version TEXT NOT NULL,
+            result_json TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (pdf_hash, parser_version)
+        )
+    ''')
+
+    # GitHub API responses with their ETags, for conditional revalidation
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS github_cache (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            body_json TEXT NOT NULL,
+            link TEXT,
+            fetched_at REAL NOT NULL
+        )
+    ''')
+
+    # Per-repo language bytes; an entry is valid while the repo's pushed_at is unchanged
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS github_repo_languages (
+            full_name TEXT PRIMARY KEY,
+            pushed_at TEXT NOT NULL,
+            languages_json TEXT NOT NULL
+        )
+    ''')
+
+    # Versioned scoring weights; exactly one row is active
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scoring_config (
+            version INTEGER PRIMARY KEY,
+            weights_json TEXT NOT NULL,
+            is_active INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Full-text index of applicant fields and resume text (see backend.search)
+    cursor.execute(CREATE_SEARCH_TABLE_SQL)
+
+    cursor.execute("SELECT COUNT(*) FROM scoring_config")
+    if cursor.fetchone()[0] == 0:
+        cursor.execute(
+            "INSERT INTO scoring_config (version, weights_json, is_active) VALUES (1, ?, 1)",
+            (json.dumps(DEFAULT_WEIGHTS),)
+        )
+
+
+def ensure_applicant_columns(conn):
+    """Adds any columns from APPLICANT_EXTRA_COLUMNS that the applicants table is missing."""
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA table_info(applicants)")
+    columns = {info[1] for info in cursor.fetchall()}
+
+    for column, (definition, backfill_sql) in APPLICANT_EXTRA_COLUMNS.items():
+        if column in columns:
+            continue
+        print(f"Adding {column} to applicants table...")
+        cursor.execute(f"ALTER TABLE applicants ADD COLUMN {column} {definition}")
+        if backfill_sql:
+            cursor.execute(backfill_sql)
+
+def _add_created_at(conn):
+    """
+    Adds applicants.created_at. SQLite cannot ALTER in a CURRENT_TIMESTAMP
+    default, so repository.insert_applicant sets it explicitly. Existing rows take the
+    time their enrichment job was queued, where there is one.
+    """
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA table_info(applicants)")
+    if "created_at" not in {info[1] for info in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE applicants ADD COLUMN created_at TEXT")
+    cursor.execute("""
+        UPDATE applicants SET created_at = (
+            SELECT MIN(created_at) FROM enrichment_jobs WHERE enrichment_jobs.application_id = applicants.application_id
+        )
+        WHERE created_at IS NULL
+    """)
+
+
+def _lookup_indexes(conn):
+    """
+    Unique index for the application_id lookups (/track, dashboards, enrichment
+    updates) plus email and creation time. overall_score is already covered by
+    the baseline's (overall_score, id) keyset index.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT application_id, COUNT(*) FROM applicants
+        WHERE application_id IS NOT NULL
+        GROUP BY application_id HAVING COUNT(*) > 1
+        LIMIT 5
+    """)
+    duplicates = cursor.fetchall()
+    if duplicates:
+        raise RuntimeError(
+            "Cannot add unique index on applicants.application_id; duplicated ids: "
+            + ", ".join(row[0] for row in duplicates)
+        )
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_applicants_application_id ON applicants (application_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_applicants_email ON applicants (email)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_applicants_created_at_id ON applicants (created_at, id)")
+
+
+def backfill_list_columns(conn, batch_size: int = 1000) -> int:
+    """
+    Fills the list view columns (top_skills, gh_followers, plus the counts and
+    GitHub stats shared with scoring) for rows enriched before they existed.
+    Each batch is committed on its own, so an interrupted run simply resumes.
+    """
+    # Imported here: backfill_scores imports backend.database, which imports this module
+    from backend.backfill_scores import backfill_features
+
+    # skill_count, gh_repos, gh_stars, gh_last_activity are scoring features
+    updated = backfill_features(conn, batch_size)
+
+    cursor = conn.cursor()
+    while True:
+        # Only enriched rows; '' marks "no skills" so a row is never picked twice
+        cursor.execute("""
+            UPDATE applicants SET
+                top_skills = COALESCE((
+                    SELECT group_concat(value, ', ') FROM (
+                        SELECT value FROM json_each(applicants.parsed_resume_json, '$.skills')
+                        ORDER BY key LIMIT ?
+                    )
+                ), ''),
+                gh_followers = CASE WHEN json_valid(github_json)
+                    THEN json_extract(github_json, '$.followers') END
+            WHERE id IN (
+                SELECT id FROM applicants
+                WHERE top_skills IS NULL AND parsed_resume_json IS NOT NULL
+                  AND json_valid(parsed_resume_json)
+                LIMIT ?
+            )
+        """, (TOP_SKILLS_COUNT, batch_size))
+        conn.commit()
+        if cursor.rowcount == 0:
+            break
+        updated += cursor.rowcount
+        print(f"Backfilled list view columns for {updated} rows")
+
+    # Unparseable JSON: mark as done with empty values
+    cursor.execute("""
+        UPDATE applicants SET top_skills = ''
+        WHERE top_skills IS NULL AND parsed_resume_json IS NOT NULL AND NOT json_valid(parsed_resume_json)
+    """)
+    return updated
+
+
+def _email_outbox(conn):
+    """Durable queue of outgoing email, delivered by the email_service worker."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            to_email TEXT NOT NULL,
+            subject TEXT NOT NULL,
+            body TEXT NOT NULL,
+            subtype TEXT NOT NULL DEFAULT 'plain',
+            application_id TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            available_at REAL NOT NULL DEFAULT 0,
+            last_error TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            sent_at TEXT
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_email_outbox_status ON email_outbox (status, available_at, id)")
+
+
+def _recruiter_digests(conn):
+    """
+    One row per recruiter digest: the applicants.id range it covered. Starts
+    at the current newest applicant, so existing applicants are not announced.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS recruiter_digests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_applicant_id INTEGER,
+            last_applicant_id INTEGER NOT NULL,
+            applicant_count INTEGER NOT NULL,
+            outbox_id INTEGER,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute("""
+        INSERT INTO recruiter_digests (last_applicant_id, applicant_count)
+        SELECT (SELECT COALESCE(MAX(id), 0) FROM applicants), 0
+        WHERE NOT EXISTS (SELECT 1 FROM recruiter_digests)
+    """)
+
+
+def _add_resume_preview(conn):
+    """Adds applicants.resume_preview, the first-page excerpt written at enrichment."""
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA table_info(applicants)")
+    if "resume_preview" not in {info[1] for info in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE applicants ADD COLUMN resume_preview TEXT")
+
+
+def _add_summary_json(conn):
+    """
+    Adds applicants.summary_json, the dashboard hover summary written at
+    enrichment. Older rows have none; the summary endpoint builds theirs on request.
+    """
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA table_info(applicants)")
+    if "summary_json" not in {info[1] for info in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE applicants ADD COLUMN summary_json TEXT")
+
+
+def _add_digest_id(conn):
+    """
+    Adds applicants.digest_id, the recruiter digest that listed the applicant
+    (NULL until then). Applicants inside an earlier digest's id range are
+    attributed to it, so they are not announced again.
+    """
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA table_info(applicants)")
+    if "digest_id" not in {info[1] for info in cursor.fetchall()}:
+        cursor.execute("ALTER TABLE applicants ADD COLUMN digest_id INTEGER")
+    cursor.execute("""
+        UPDATE applicants SET digest_id = (
+            SELECT MIN(d.id) FROM recruiter_digests d WHERE d.last_applicant_id >= applicants.id
+        )
+        WHERE digest_id IS NULL
+          AND id <= (SELECT COALESCE(MAX(last_applicant_id), 0) FROM recruiter_digests)
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_applicants_undigested ON applicants (id) WHERE digest_id IS NULL")
+
+
+# Ordered schema steps; append new ones, never edit or reorder applied ones.
+# Steps must be idempotent. Data backfills may commit in batches.
+MIGRATIONS = [
+    (1, "baseline schema", _baseline),
+    (2, "applicants.created_at", _add_created_at),
+    (3, "application_id, email and created_at indexes", _lookup_indexes),
+    (4, "backfill list view columns", backfill_list_columns),
+    (5, "email_outbox table", _email_outbox),
+    (6, "recruiter_digests table", _recruiter_digests),
+    (7, "applicants.resume_preview", _add_resume_preview),
+    (8, "applicants.summary_json", _add_summary_json),
+    (9, "applicants.digest_id", _add_digest_id),
+]
+
+
+def get_schema_version(conn) -> int:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    row = conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()
+    return row[0]
+
+
+def run_migrations(conn) -> list:
+    """
+    Applies every migration newer than the recorded schema version, in order,
+    each under BEGIN IMMEDIATE so concurrent starts apply a step only once.
+    Returns the versions applied.
+    """
+    applied = []
+    for version, name, step in MIGRATIONS:
+        if version <= get_schema_version(conn):
+            continue
+        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have applied it while we waited for the lock
+            if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                conn.rollback()
+                continue
+            print(f"Applying migration {version}: {name}")
+            step(conn)
+            conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (version, name))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+    return applied
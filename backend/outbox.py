@@ -0,0 +1,103 @@
+import os
+import time
+
+from backend.database import get_pool
+
+# An email is marked failed after this many unsuccessful delivery attempts
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+# Base delay before a failed email is retried (doubled on every attempt)
+EMAIL_RETRY_SECONDS = float(os.getenv("EMAIL_RETRY_SECONDS", "30"))
+
+EMAIL_STATUSES = ("pending", "sending", "sent", "failed")
+
+
+def queue_email(conn, kind: str, to_email: str, subject: str, body: str,
+                subtype: str = "plain", application_id: str = None) -> int:
+    """
+    Adds a message to email_outbox. Does not commit: queue it in the same
+    transaction as the change it reports, and the delivery worker sends it.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO email_outbox (kind, to_email, subject, body, subtype, application_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (kind, to_email, subject, body, subtype, application_id))
+    return cursor.lastrowid
+
+
+def queue_confirmation_email(conn, to_email: str, application_id: str) -> int:
+    content = f"""
+    <html>
+    <body>
+        <h3>Application Received</h3>
+        <p>Thank you for applying for the internship.</p>
+        <p>Your Application ID is: <strong>{application_id}</strong></p>
+        <p>You can track your application status on your dashboard.</p>
+        <br>
+        <p>Best Regards,</p>
+        <p>Team EazeIntern</p>
+    </body>
+    </html>
+    """
+    return queue_email(
+        conn, "confirmation", to_email, "Internship Application Received", content,
+        subtype="html", application_id=application_id
+    )
+
+
+def claim_due_emails(limit: int) -> list:
+    """Moves up to `limit` due pending emails to 'sending' and returns them, oldest first."""
+    with get_pool().writer() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE email_outbox
+            SET status = 'sending', attempts = attempts + 1
+            WHERE id IN (
+                SELECT id FROM email_outbox
+                WHERE status = 'pending' AND available_at <= ?
+                ORDER BY id
+                LIMIT ?
+            )
+            RETURNING id, kind, to_email, subject, body, subtype, application_id, attempts
+        """, (time.time(), limit))
+        emails = [dict(row) for row in cursor.fetchall()]
+    return sorted(emails, key=lambda email: email["id"])
+
+
+def mark_email_sent(email_id: int):
+    with get_pool().writer() as conn:
+        conn.execute(
+            "UPDATE email_outbox SET status = 'sent', last_error = NULL, sent_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (email_id,)
+        )
+
+
+def mark_email_failed(email: dict, error: str):
+    """Re-queues the email with exponential backoff, or marks it failed once attempts run out."""
+    with get_pool().writer() as conn:
+        if email["attempts"] < EMAIL_MAX_ATTEMPTS:
+            retry_at = time.time() + EMAIL_RETRY_SECONDS * (2 ** (email["attempts"] - 1))
+            conn.execute(
+                "UPDATE email_outbox SET status = 'pending', available_at = ?, last_error = ? WHERE id = ?",
+                (retry_at, error, email["id"])
+            )
+        else:
+            conn.execute(
+                "UPDATE email_outbox SET status = 'failed', last_error = ? WHERE id = ?",
+                (error, email["id"])
+            )
+
+
+def requeue_interrupted_emails() -> int:
+    """Emails left in 'sending' by a process that stopped mid-delivery go back to pending."""
+    with get_pool().writer() as conn:
+        cursor = conn.execute("UPDATE email_outbox SET status = 'pending' WHERE status = 'sending'")
+    return cursor.rowcount
+
+
+def outbox_stats(conn) -> dict:
+    """Email count per delivery status."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT status, COUNT(*) FROM email_outbox GROUP BY status")
+    counts = dict(cursor.fetchall())
+    return {status: counts.get(status, 0) for status in EMAIL_STATUSES}
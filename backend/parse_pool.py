@@ -0,0 +1,204 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, only the wall-clock backstop applies
+    resource = None
+
+# Windows has no SIGALRM/setitimer either; there the parent's backstop in
+# ParsePool.run is the only wall-clock limit
+HAS_ALARM = hasattr(signal, "SIGALRM")
+
+# Number of parser processes
+PARSE_POOL_WORKERS = int(os.getenv("PARSE_POOL_WORKERS", "2"))
+# Recycle a worker process after it has handled this many jobs
+PARSE_MAX_TASKS_PER_CHILD = int(os.getenv("PARSE_MAX_TASKS_PER_CHILD", "50"))
+# Per-job limits
+PARSE_CPU_LIMIT_SECONDS = int(os.getenv("PARSE_CPU_LIMIT_SECONDS", "20"))
+PARSE_WALL_LIMIT_SECONDS = float(os.getenv("PARSE_WALL_LIMIT_SECONDS", "30"))
+# Address-space cap per worker process (0 disables)
+PARSE_MEMORY_LIMIT_MB = int(os.getenv("PARSE_MEMORY_LIMIT_MB", "1024"))
+
+
+class ParseLimitExceeded(Exception):
+    """Raised when a parse job exceeds its CPU-time or wall-clock budget."""
+
+
+# Set by the limit handler. The exception can land inside library code that
+# catches Exception (pypdf does), so _run_limited re-raises it from this.
+_limit_hit = None
+
+
+def _raise_limit(signum, frame):
+    global _limit_hit
+    if HAS_ALARM and signum == signal.SIGALRM:
+        _limit_hit = "Parse job exceeded its wall-clock limit"
+    else:
+        _limit_hit = "Parse job exceeded its CPU-time limit"
+    raise ParseLimitExceeded(_limit_hit)
+
+
+def _init_worker(memory_limit_mb: int):
+    """Runs once in every worker process."""
+    if HAS_ALARM:
+        signal.signal(signal.SIGALRM, _raise_limit)
+    if resource is None:
+        return
+    signal.signal(signal.SIGXCPU, _raise_limit)
+    if memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _run_limited(fn, args, cpu_seconds: int, wall_seconds: float):
+    """
+    Runs fn(*args) inside a worker with per-job limits.
+    RLIMIT_CPU is cumulative for the process, so the soft limit is set relative
+    to the CPU time already used by earlier jobs and lifted again afterwards.
+    A limit hit always raises ParseLimitExceeded, even if fn swallowed it.
+    """
+    global _limit_hit
+    _limit_hit = None
+    cpu_limited = resource is not None and cpu_seconds > 0
+    if cpu_limited:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        used = int(usage.ru_utime + usage.ru_stime) + 1
+        soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        budget = used + cpu_seconds
+        if hard != resource.RLIM_INFINITY:
+            budget = min(budget, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (budget, hard))
+    wall_limited = HAS_ALARM and wall_seconds > 0
+    if wall_limited:
+        signal.setitimer(signal.ITIMER_REAL, wall_seconds)
+    try:
+        result = fn(*args)
+    finally:
+        if wall_limited:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        if cpu_limited:
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    if _limit_hit:
+        raise ParseLimitExceeded(_limit_hit)
+    return result
+
+
+class ParsePool:
+    """
+    ProcessPoolExecutor wrapper for CPU-bound parsing.
+    Keeps pypdf and the regex scans off the event loop, enforces per-job limits
+    and replaces the pool if a worker dies or hangs past the wall-clock backstop.
+    """
+
+    def __init__(
+        self,
+        workers: int = PARSE_POOL_WORKERS,
+        max_tasks_per_child: int = PARSE_MAX_TASKS_PER_CHILD,
+        cpu_seconds: int = PARSE_CPU_LIMIT_SECONDS,
+        wall_seconds: float = PARSE_WALL_LIMIT_SECONDS,
+        memory_limit_mb: int = PARSE_MEMORY_LIMIT_MB,
+    ):
+        self.workers = max(1, workers)
+        self.max_tasks_per_child = max_tasks_per_child
+        self.cpu_seconds = cpu_seconds
+        self.wall_seconds = wall_seconds
+        self.memory_limit_mb = memory_limit_mb
+        self._executor = None
+        self._lock = threading.Lock()
+        # Metrics
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.limit_exceeded = 0
+        self.recycled_pools = 0
+
+    def _create_executor(self):
+        # max_tasks_per_child is not supported with the 'fork' start method
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.memory_limit_mb,),
+            max_tasks_per_child=self.max_tasks_per_child or None,
+        )
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            return self._executor
+
+    def start(self):
+        self._get_executor()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _recycle(self, executor):
+        """Throws away a broken or hung pool. Running workers are killed outright."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self.recycled_pools += 1
+        # ProcessPoolExecutor has no public API to kill a stuck worker
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn, *args):
+        """Runs fn(*args) in a worker process and returns its result."""
+        executor = self._get_executor()
+        self.in_flight += 1
+        try:
+            future = executor.submit(_run_limited, fn, args, self.cpu_seconds, self.wall_seconds)
+            # The in-process limits normally fire first; this only catches
+            # workers that ignore signals (e.g. stuck inside C code).
+            backstop = self.wall_seconds + 5 if self.wall_seconds > 0 else None
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=backstop)
+            self.completed += 1
+            return result
+        except ParseLimitExceeded:
+            self.limit_exceeded += 1
+            raise
+        except asyncio.TimeoutError:
+            self.limit_exceeded += 1
+            self._recycle(executor)
+            raise ParseLimitExceeded("Parse job did not respond and its worker was terminated")
+        except BrokenProcessPool:
+            # A worker was killed (e.g. CPU hard limit or OOM); start a fresh pool
+            self.failed += 1
+            self._recycle(executor)
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            # Jobs submitted but not yet picked up by a worker
+            "queue_depth": max(0, self.in_flight - self.workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "limit_exceeded": self.limit_exceeded,
+            "recycled_pools": self.recycled_pools,
+        }
+
+
+parse_pool = ParsePool()
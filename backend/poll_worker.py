@@ -0,0 +1,39 @@
+import asyncio
+
+# Longest pause between retries while a worker keeps failing
+POLL_WORKER_MAX_ERROR_SECONDS = 60
+
+
+async def run_poll_worker(wakeup: asyncio.Event, poll_seconds: float, claim, handle,
+                          error_seconds: float, on_error, on_idle=None):
+    """
+    Drives a table-backed queue worker until cancelled. `await claim()`
+    returns the due work (falsy if none) and `await handle(work)` processes
+    it; with nothing due, `await on_idle()` runs and the worker waits for
+    `wakeup` or poll_seconds. An error (e.g. "database is locked") is passed
+    to on_error(error, delay) and pauses the worker for error_seconds,
+    doubled while it persists, instead of ending it.
+    """
+    errors = 0
+    while True:
+        try:
+            # Cleared before claiming so a wake-up during the claim is not lost
+            wakeup.clear()
+            work = await claim()
+            if work:
+                await handle(work)
+            else:
+                if on_idle is not None:
+                    await on_idle()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+            errors = 0
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            errors += 1
+            delay = min(error_seconds * 2 ** (errors - 1), POLL_WORKER_MAX_ERROR_SECONDS)
+            on_error(e, delay)
+            await asyncio.sleep(delay)
@@ -0,0 +1,72 @@
+import json
+import os
+from typing import Optional
+
+from backend.blob_store import BlobStore, COMPRESSION_SUFFIXES, ZSTD_AVAILABLE, compress, decompress, run_blob_io
+from backend import repository
+from backend.utils import load_json_field
+
+# "lazy": profile.json is built from SQLite when requested (nothing written).
+# "eager": enrichment also stores a compressed copy in the blob store.
+PROFILE_MODE = os.getenv("PROFILE_MODE", "lazy")
+# Compression of stored profiles: none, gzip or zstd (zstd needs 'zstandard')
+PROFILE_COMPRESSION = os.getenv("PROFILE_COMPRESSION", "gzip")
+PROFILE_STORE_DIR = os.getenv("PROFILE_STORE_DIR", "applications/profiles")
+
+profile_blobs = BlobStore(PROFILE_STORE_DIR)
+
+
+def profile_compression() -> str:
+    if PROFILE_COMPRESSION == "zstd" and not ZSTD_AVAILABLE:
+        print("PROFILE_COMPRESSION=zstd needs the 'zstandard' package; using gzip.")
+        return "gzip"
+    return PROFILE_COMPRESSION if PROFILE_COMPRESSION in COMPRESSION_SUFFIXES else "gzip"
+
+
+def build_profile(applicant: dict) -> dict:
+    """The profile.json document for an applicants row."""
+    return {
+        "application_id": applicant["application_id"],
+        "full_name": applicant["full_name"],
+        "email": applicant["email"],
+        "college": applicant["college"],
+        "degree": applicant["degree"],
+        "github": applicant["github"],
+        "kaggle": applicant["kaggle_url"],
+        "self_ratings": load_json_field(applicant["self_rating_json"]),
+        "parsed_resume": load_json_field(applicant["parsed_resume_json"]),
+        "github_analysis": load_json_field(applicant["github_json"]),
+        "provider_data": load_json_field(applicant.get("provider_data_json")),
+        "resume_path": applicant["resume_path"],
+    }
+
+
+def _encode(profile: dict, compression: str) -> bytes:
+    data = json.dumps(profile, separators=(",", ":"), default=str).encode("utf-8")
+    return compress(data, compression)
+
+
+def _stored_profile(application_id: str) -> Optional[dict]:
+    # Any compression a copy may have been written with
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        data = profile_blobs.get(application_id, ".json" + suffix)
+        if data is not None:
+            return json.loads(decompress(data, compression))
+    return None
+
+
+async def save_profile(applicant: dict):
+    """Stores the applicant's profile.json in the blob store (compressed), off the event loop."""
+    compression = profile_compression()
+    data = _encode(build_profile(applicant), compression)
+    return await run_blob_io(profile_blobs.put, applicant["application_id"], data, ".json" + COMPRESSION_SUFFIXES[compression])
+
+
+async def load_profile(application_id: str) -> Optional[dict]:
+    """The stored profile copy if there is one, else the profile built from SQLite; None if unknown."""
+    if PROFILE_MODE == "eager":
+        stored = await run_blob_io(_stored_profile, application_id)
+        if stored is not None:
+            return stored
+    applicant = await repository.get_applicant_by_app_id(application_id)
+    return build_profile(applicant) if applicant else None
@@ -0,0 +1,64 @@
+from typing import Any, Dict, List
+import asyncio
+
+
+class EnrichmentProvider:
+    """
+    One independent source of applicant enrichment (resume, GitHub, Kaggle, ...).
+
+    Subclasses set a unique `name`, a `timeout` in seconds and implement
+    `fetch(applicant)`, which receives the stored applicant row as a dict and
+    returns a JSON-serialisable dict. `column` names the applicants column the
+    result is stored in; providers without a dedicated column are stored under
+    their name in provider_data_json.
+    """
+
+    name = ""
+    timeout = 30.0
+    column = None
+    # Stored as {"error": error_message, ...} when the provider fails or times out
+    error_message = "Enrichment provider failed"
+
+    async def fetch(self, applicant: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class ProviderDeferred(Exception):
+    """
+    Raised by a provider whose source is temporarily unavailable (e.g. an
+    exhausted API rate limit) until `retry_at` (epoch seconds). The enrichment
+    job is re-queued for that time instead of storing an error result.
+    """
+
+    def __init__(self, message: str, retry_at: float):
+        super().__init__(message)
+        self.retry_at = retry_at
+
+
+async def _run_provider(provider: EnrichmentProvider, applicant: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return await asyncio.wait_for(provider.fetch(applicant), timeout=provider.timeout)
+    except asyncio.TimeoutError:
+        print(f"Provider '{provider.name}' timed out for {applicant.get('application_id')}")
+        return {"error": provider.error_message, "details": f"Timed out after {provider.timeout}s"}
+    except ProviderDeferred:
+        raise
+    except Exception as e:
+        print(f"Provider '{provider.name}' failed for {applicant.get('application_id')}: {e}")
+        return {"error": provider.error_message, "details": str(e)}
+
+
+async def run_providers(applicant: Dict[str, Any], providers: List[EnrichmentProvider]) -> Dict[str, Dict[str, Any]]:
+    """
+    Runs all providers concurrently, each under its own timeout.
+    A slow or failing provider yields an error dict for its own slot only,
+    so the other results are still returned (and stored) as partial data.
+    Raises ProviderDeferred (after all providers finished) if one deferred.
+    """
+    results = await asyncio.gather(
+        *(_run_provider(provider, applicant) for provider in providers), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return {provider.name: result for provider, result in zip(providers, results)}
@@ -0,0 +1,132 @@
+from datetime import datetime
+import threading
+import time
+
+import numpy as np
+
+from backend.database import get_pool
+from backend.scoring import FEATURE_COLUMNS, merge_weights, score_feature_arrays, to_activity_dates
+
+INITIAL_CAPACITY = 1024
+
+
+class FeatureMatrix:
+    """
+    In-memory copy of every scored applicant's scoring inputs, one NumPy
+    column per feature. Loaded once at startup and kept current by
+    upsert() as enrichment finishes, so what-if queries never touch the DB.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset(INITIAL_CAPACITY)
+        self.loaded = False
+
+    def _reset(self, capacity: int):
+        self.size = 0
+        self.application_ids = []
+        self.names = []
+        self._index = {}
+        self._columns = {column: np.zeros(capacity, dtype=float) for column in FEATURE_COLUMNS}
+        self._columns["gh_last_activity"] = np.full(capacity, np.datetime64("NaT"), dtype="datetime64[D]")
+
+    def _grow(self):
+        for column, values in self._columns.items():
+            extra = np.full(len(values), np.datetime64("NaT"), dtype=values.dtype) if column == "gh_last_activity" \
+                else np.zeros(len(values), dtype=float)
+            self._columns[column] = np.concatenate([values, extra])
+
+    def load(self, conn=None):
+        """(Re)builds the matrix from every applicant that has feature columns."""
+        if conn is None:
+            with get_pool().reader() as conn:
+                return self.load(conn)
+
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT application_id, full_name, {", ".join(FEATURE_COLUMNS)} FROM applicants
+            WHERE skill_count IS NOT NULL
+            ORDER BY id
+        """)
+        rows = cursor.fetchall()
+
+        with self._lock:
+            self._reset(max(INITIAL_CAPACITY, len(rows) * 2))
+            for row in rows:
+                self._set_row(row[0], row[1], dict(zip(FEATURE_COLUMNS, row[2:])))
+            self.loaded = True
+        return len(rows)
+
+    def _set_row(self, application_id: str, full_name: str, features: dict):
+        index = self._index.get(application_id)
+        if index is None:
+            if self.size == len(self._columns["skill_count"]):
+                self._grow()
+            index = self.size
+            self.size += 1
+            self._index[application_id] = index
+            self.application_ids.append(application_id)
+            self.names.append(full_name)
+        else:
+            self.names[index] = full_name
+
+        for column in FEATURE_COLUMNS:
+            if column == "gh_last_activity":
+                self._columns[column][index] = to_activity_dates([features.get(column)])[0]
+            else:
+                self._columns[column][index] = features.get(column) or 0
+
+    def upsert(self, application_id: str, full_name: str, features: dict):
+        """Adds or replaces one applicant's row (called after enrichment)."""
+        with self._lock:
+            self._set_row(application_id, full_name, features)
+
+    def what_if(self, current_weights: dict, proposed_weights: dict, top_k: int = 20, now: datetime = None) -> dict:
+        """
+        Scores everyone under the current and the proposed weights and returns
+        the proposed top-K with each applicant's rank under both.
+        rank_delta > 0 means the applicant moves up.
+        """
+        started = time.perf_counter()
+        with self._lock:
+            size = self.size
+            features = {column: values[:size].copy() for column, values in self._columns.items()}
+            application_ids = self.application_ids[:size]
+            names = self.names[:size]
+
+        current = score_feature_arrays(features, current_weights, now=now)["overall_score"]
+        proposed_scores = score_feature_arrays(features, merge_weights(proposed_weights), now=now)
+        proposed = proposed_scores["overall_score"]
+
+        # Highest score first; ties keep submission order
+        order = np.arange(size)
+        current_order = np.lexsort((order, -current))
+        proposed_order = np.lexsort((order, -proposed))
+        current_rank = np.empty(size, dtype=int)
+        current_rank[current_order] = np.arange(1, size + 1)
+
+        top = []
+        for rank, index in enumerate(proposed_order[:top_k], start=1):
+            top.append({
+                "application_id": application_ids[index],
+                "full_name": names[index],
+                "rank": rank,
+                "previous_rank": int(current_rank[index]),
+                "rank_delta": int(current_rank[index]) - rank,
+                "score": int(proposed[index]),
+                "previous_score": int(current[index]),
+                "breakdown": {
+                    "skills": int(proposed_scores["skills"][index]),
+                    "resume": int(proposed_scores["resume"][index]),
+                    "github": int(proposed_scores["github"][index]),
+                },
+            })
+
+        return {
+            "applicants_ranked": size,
+            "top": top,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+
+feature_matrix = FeatureMatrix()
@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend import database
+from backend.parse_pool import parse_pool
+from backend.resume_parser import PARSER_VERSION, extract_resume_data
+from backend.resume_store import get_cached_parse, store_cached_parse
+from backend.search import index_applicant
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _read_chunk(last_id: int, chunk_size: int, reparse: bool):
+    """
+    The next chunk of applicants as dicts, with "resume_text" from the parse
+    cache, or None where the PDF still has to be re-extracted.
+    """
+    with database.get_pool().reader() as conn:
+        rows = conn.execute("""
+            SELECT id, parsed_resume_json, resume_path, resume_hash, enrichment_status
+            FROM applicants WHERE id > ? ORDER BY id LIMIT ?
+        """, (last_id, chunk_size)).fetchall()
+        chunk = []
+        for row in rows:
+            applicant = dict(row)
+            cached = get_cached_parse(conn, row["resume_hash"], PARSER_VERSION) if row["resume_hash"] else None
+            if cached is not None and "text" in cached:
+                applicant["resume_text"] = cached["text"]
+            elif reparse and row["resume_path"] and os.path.exists(row["resume_path"]):
+                applicant["resume_text"] = None
+            else:
+                applicant["resume_text"] = ""
+            chunk.append(applicant)
+    return chunk
+
+
+async def _extract_missing(chunk) -> dict:
+    """
+    Re-extracts the resumes without cached text in the parser process pool
+    (with its CPU and wall-clock limits). Returns {applicant id: parse result}.
+    """
+    missing = [applicant for applicant in chunk if applicant["resume_text"] is None]
+    results = await asyncio.gather(
+        *(parse_pool.run(extract_resume_data, applicant["resume_path"]) for applicant in missing),
+        return_exceptions=True
+    )
+    parsed = {}
+    for applicant, result in zip(missing, results):
+        if isinstance(result, Exception):
+            print(f"Could not re-extract resume for applicant {applicant['id']}: {result}")
+            result = {"error": str(result)}
+        parsed[applicant["id"]] = result
+    return parsed
+
+
+# Compared with the chunk read: a change means enrichment has re-indexed
+# the applicant (or is about to) since the read
+_ENRICHMENT_FIELDS = ("parsed_resume_json", "resume_hash", "enrichment_status")
+
+
+def _write_chunk(chunk, parsed: dict) -> int:
+    """
+    Caches the new parses and re-indexes the chunk in one short write
+    transaction. The other indexed fields are re-read inside it, and rows
+    that enrichment changed (or that were deleted) since the chunk was read
+    are left to enrichment's own index entry. Returns the rows indexed.
+    """
+    indexed = 0
+    with database.get_pool().writer() as conn:
+        current = {row["id"]: row for row in conn.execute("""
+            SELECT id, full_name, email, college, degree, parsed_resume_json, resume_hash, enrichment_status
+            FROM applicants WHERE id BETWEEN ? AND ?
+        """, (chunk[0]["id"], chunk[-1]["id"]))}
+        for applicant in chunk:
+            result = parsed.get(applicant["id"])
+            if result is not None:
+                applicant["resume_text"] = result.get("text", "")
+                if applicant["resume_hash"] and "error" not in result:
+                    store_cached_parse(conn, applicant["resume_hash"], PARSER_VERSION, result)
+            row = current.get(applicant["id"])
+            if row is None or any(row[field] != applicant[field] for field in _ENRICHMENT_FIELDS):
+                continue
+            try:
+                skills = json.loads(row["parsed_resume_json"] or "{}").get("skills", [])
+            except (json.JSONDecodeError, AttributeError):
+                skills = []
+            index_applicant(conn, row["id"], {
+                "full_name": row["full_name"],
+                "email": row["email"],
+                "college": row["college"],
+                "degree": row["degree"],
+                "skills": skills,
+                "resume_text": applicant["resume_text"] or "",
+            })
+            indexed += 1
+    return indexed
+
+
+def rebuild_search_index(chunk_size: int = DEFAULT_CHUNK_SIZE, reparse: bool = True) -> int:
+    """
+    Re-indexes every applicant in applicants_fts, in id-ordered chunks.
+    Resumes parsed before the index existed are re-extracted in the parser
+    pool (unless reparse is False) before the chunk's write transaction
+    starts, so the SQLite write lock is only held for the index writes and
+    submissions and enrichment keep going during a rebuild.
+    """
+    database.init_db()
+    indexed = 0
+    last_id = 0
+
+    try:
+        while True:
+            chunk = _read_chunk(last_id, chunk_size, reparse)
+            if not chunk:
+                break
+            parsed = asyncio.run(_extract_missing(chunk)) if reparse else {}
+            indexed += _write_chunk(chunk, parsed)
+            last_id = chunk[-1]["id"]
+            print(f"Indexed {indexed} applicants (up to id {last_id})")
+
+        # Merge the index b-trees written chunk by chunk
+        with database.get_pool().writer() as conn:
+            conn.execute("INSERT INTO applicants_fts (applicants_fts) VALUES ('optimize')")
+    finally:
+        parse_pool.shutdown()
+
+    return indexed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the applicant full-text search index.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per transaction")
+    parser.add_argument("--no-reparse", action="store_true", help="Only use cached resume text; never re-read PDFs")
+    args = parser.parse_args()
+    count = rebuild_search_index(chunk_size=args.chunk_size, reparse=not args.no_reparse)
+    print(f"✅ Search index rebuilt for {count} applicants.")
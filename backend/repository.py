@@ -0,0 +1,193 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from backend.database import get_pool
+from backend.listing import ListingFilters, fetch_page
+from backend import search
+from backend.outbox import queue_confirmation_email
+from backend.scoring import get_active_scoring_config
+from backend.summaries import build_summary, summary_json
+
+# Threads that run SQLite calls for async code. Every query runs on one of
+# these, never on the event loop; keep it at or below DB_READ_POOL_SIZE.
+DB_THREADS = int(os.getenv("DB_THREADS", "4"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, DB_THREADS), thread_name_prefix="db")
+        return _executor
+
+
+def shutdown_db_threads():
+    """Waits for running queries and stops the DB threads (restarted lazily on next use)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+async def run_in_db_thread(fn, *args, **kwargs):
+    """Runs a blocking DB function on the DB threads and awaits its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def _read(fn, *args):
+    with get_pool().reader() as conn:
+        return fn(conn, *args)
+
+
+def _write(fn, *args):
+    with get_pool().writer() as conn:
+        return fn(conn, *args)
+
+
+async def read(fn, *args):
+    """fn(conn, *args) on a pooled read connection, off the event loop."""
+    return await run_in_db_thread(_read, fn, *args)
+
+
+async def write(fn, *args):
+    """fn(conn, *args) as one writer transaction, off the event loop."""
+    return await run_in_db_thread(_write, fn, *args)
+
+
+# --- Applicants ---
+
+# Columns set by insert_applicant; the rest are filled in by enrichment
+APPLICANT_INSERT_COLUMNS = [
+    "full_name", "email", "college", "degree", "github", "kaggle_url", "resume_path",
+    "parsed_resume_json", "github_json", "self_rating_json", "application_id",
+    "overall_score", "score_breakdown_json", "resume_hash",
+]
+
+
+def _select_applicant(conn, application_id: str):
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM applicants WHERE application_id = ?", (application_id,))
+    row = cursor.fetchone()
+    return dict(row) if row else None
+
+
+def _applicant_exists(conn, application_id: str) -> bool:
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM applicants WHERE application_id = ?", (application_id,))
+    return cursor.fetchone() is not None
+
+
+def _select_resume_file(conn, application_id: str):
+    cursor = conn.cursor()
+    cursor.execute("SELECT resume_path, resume_hash FROM applicants WHERE application_id = ?", (application_id,))
+    row = cursor.fetchone()
+    return dict(row) if row else None
+
+
+def _select_summary(conn, application_id: str):
+    cursor = conn.cursor()
+    cursor.execute("SELECT summary_json FROM applicants WHERE application_id = ?", (application_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    if row["summary_json"]:
+        return row["summary_json"]
+    # Not enriched yet (or enriched before summaries existed): build it from the row
+    applicant = _select_applicant(conn, application_id)
+    return summary_json({**build_summary(applicant), "status": applicant["enrichment_status"]})
+
+
+def _insert_applicant(conn, applicant: dict):
+    values = [applicant.get(column) for column in APPLICANT_INSERT_COLUMNS]
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        INSERT INTO applicants ({", ".join(APPLICANT_INSERT_COLUMNS)}, enrichment_status, created_at)
+        VALUES ({", ".join("?" * len(values))}, 'pending', CURRENT_TIMESTAMP)
+    """, values)
+    row_id = cursor.lastrowid
+    search.index_applicant(conn, row_id, applicant)
+    cursor.execute("INSERT INTO enrichment_jobs (application_id) VALUES (?)", (applicant["application_id"],))
+    queue_confirmation_email(conn, applicant["email"], applicant["application_id"])
+    return row_id
+
+
+def _update_enrichment(conn, application_id: str, column_values: dict, search_fields: dict):
+    # Column names come from the provider classes and scoring, never from user input
+    assignments = ", ".join(f"{column} = ?" for column in column_values)
+    cursor = conn.cursor()
+    cursor.execute(
+        f"UPDATE applicants SET {assignments} WHERE application_id = ? RETURNING id",
+        (*column_values.values(), application_id)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        raise LookupError(f"Applicant {application_id} not found")
+    search.index_applicant(conn, row["id"], search_fields)
+
+
+def _list_page(conn, filters: ListingFilters, after, before, limit: int):
+    rows, next_cursor, prev_cursor = fetch_page(conn, filters, after=after, before=before, limit=limit)
+    return [dict(row) for row in rows], next_cursor, prev_cursor
+
+
+async def get_applicant_by_app_id(application_id: str) -> Optional[dict]:
+    """The full applicants row as a dict, or None."""
+    return await read(_select_applicant, application_id)
+
+
+async def applicant_exists(application_id: str) -> bool:
+    return await read(_applicant_exists, application_id)
+
+
+async def get_resume_file(application_id: str) -> Optional[dict]:
+    """{resume_path, resume_hash} for the applicant, or None."""
+    return await read(_select_resume_file, application_id)
+
+
+async def get_applicant_summary(application_id: str) -> Optional[str]:
+    """
+    The dashboard hover summary as a JSON string (precomputed at enrichment),
+    or None. Summaries built on the fly also carry the enrichment "status".
+    """
+    return await read(_select_summary, application_id)
+
+
+async def insert_applicant(applicant: dict):
+    """
+    Stores a new applicant (keys: APPLICANT_INSERT_COLUMNS) as 'pending', indexes
+    the form fields for search, and queues its enrichment job and confirmation
+    email, all in one transaction: a committed applicant is always picked up by
+    the enrichment and email workers, even after a restart.
+    """
+    return await write(_insert_applicant, applicant)
+
+
+async def update_enrichment(application_id: str, column_values: dict, search_fields: dict):
+    """
+    Writes the enrichment results (column -> value) and re-indexes the
+    applicant for search (see search.SEARCH_COLUMNS) in one transaction.
+    """
+    await write(_update_enrichment, application_id, column_values, search_fields)
+
+
+async def list_applicants_page(filters: ListingFilters, after: str = None, before: str = None, limit: int = 50):
+    """One keyset page of list view rows as dicts: (rows, next_cursor, prev_cursor)."""
+    return await read(_list_page, filters, after, before, limit)
+
+
+async def search_applicants(text: str, limit: int = 20, offset: int = 0):
+    return await read(search.search_applicants, text, limit, offset)
+
+
+async def get_scoring_config():
+    """(version, weights) of the active scoring config."""
+    return await read(get_active_scoring_config)
@@ -1,29 +1,78 @@
 from typing import Dict, Any, List
+import os
 import pypdf
 import re
 
+from backend.parse_pool import ParseLimitExceeded, parse_pool
+from backend.skill_matcher import skill_matcher
+
+# Bump when extraction logic changes; cached parse results are keyed by this.
+# Includes the taxonomy version so a taxonomy update also forces a re-parse.
+PARSER_VERSION = f"3+skills-{skill_matcher.version}"
+
+# Extracted text is returned (for the search index) up to this many characters
+RESUME_TEXT_MAX_CHARS = int(os.getenv("RESUME_TEXT_MAX_CHARS", "100000"))
+# First-page text kept as a preview for the dashboard, so the PDF need not be opened
+RESUME_PREVIEW_CHARS = int(os.getenv("RESUME_PREVIEW_CHARS", "600"))
+
+# Section keywords, compiled once into case-insensitive substring matchers
+edu_keywords = ["B.Tech", "M.Tech", "Bachelor", "Master", "PhD", "B.Sc", "M.Sc", "University", "College", "Institute", "Degree"]
+# Broad keywords to catch job titles or section lines. 
+# Note: This is a simple extractor and might catch headers or generic lines.
+exp_keywords = ["Intern", "Internship", "Experience", "Work", "Project", "Developer", "Engineer", "Analyst", "Associate", "Consultant"]
+
+EDU_KEYWORDS_RE = re.compile("|".join(re.escape(kw) for kw in edu_keywords), re.IGNORECASE)
+EXP_KEYWORDS_RE = re.compile("|".join(re.escape(kw) for kw in exp_keywords), re.IGNORECASE)
+
+def text_preview(text: str, max_chars: int = RESUME_PREVIEW_CHARS) -> str:
+    """Whitespace-collapsed excerpt cut at a word boundary before max_chars ("…" marks a cut)."""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return cut + "…"
+
 async def parse_resume(path: str) -> Dict[str, Any]:
+    """
+    Parses a PDF resume in the parser process pool so the event loop stays free.
+    Raises ParseLimitExceeded if the file blows its CPU-time or wall-clock budget.
+    """
+    return await parse_pool.run(extract_resume_data, path)
+
+def extract_resume_data(path: str) -> Dict[str, Any]:
     """
     Parses a PDF resume and extracts structured data using rule-based logic.
-    Returns a dictionary with name, email, skills, education, and experience.
+    Returns a dictionary with name, email, skills, education, and experience,
+    plus the extracted plain text under "text" and a first-page excerpt under "preview".
+    CPU-bound; call through parse_resume() from async code.
     """
     full_text = ""
+    first_page_text = ""
     try:
         # 1. Extract full text from PDF using pypdf
         reader = pypdf.PdfReader(path)
-        for page in reader.pages:
+        for index, page in enumerate(reader.pages):
             extract = page.extract_text()
             if extract:
                 full_text += extract + "\n"
+                if index == 0:
+                    first_page_text = extract
+    except ParseLimitExceeded:
+        # Not an unreadable PDF: the job ran out of time and must fail as such
+        raise
     except Exception as e:
         print(f"Error reading PDF: {e}")
-        # Safe fallback structure
+        # Safe fallback structure; "error" marks it as a failed parse (never cached)
         return {
+            "error": f"Could not read PDF: {e}",
             "name": "Unknown",
             "email": "Not found",
             "skills": [],
+            "skill_counts": {},
             "education": [],
-            "experience": []
+            "experience": [],
+            "text": "",
+            "preview": ""
         }
 
     # Split text into lines for line-by-line analysis
@@ -69,34 +118,16 @@ async def parse_resume(path: str) -> Dict[str, Any]:
         email = email_match.group(0)
 
     # 4. Extract Skills
-    # Strategy: detect from a predefined skills list in the full text (case-insensitive)
-    found_skills = set()
-    # Extensive list of tech skills
-    skills_db = [
-        "Python", "Java", "C++", "C", "C#", "JavaScript", "TypeScript", "HTML", "CSS", 
-        "React", "Angular", "Vue", "Node.js", "Express", "Django", "Flask", "FastAPI",
-        "SQL", "NoSQL", "MongoDB", "PostgreSQL", "MySQL", "Redis", "Oracle",
-        "Docker", "Kubernetes", "AWS", "Azure", "GCP", "Git", "GitHub", "GitLab",
-        "Machine Learning", "Deep Learning", "AI", "Data Science", "Pandas", "NumPy",
-        "TensorFlow", "PyTorch", "Scikit-learn", "Keras", "NLP", "OpenCV",
-        "Linux", "Bash", "Shell", "DevOps", "Agile", "Scrum", "Jira"
-    ]
-    
-    lower_text = full_text.lower()
-    for skill in skills_db:
-        # Use word boundary regex to avoid partial matches (e.g., 'Java' inside 'JavaScript' if not careful, 
-        # though 'JavaScript' is in list, 'C' is dangerous without boundaries)
-        pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-        if re.search(pattern, lower_text):
-            found_skills.add(skill)
+    # Strategy: one pass of the compiled taxonomy matcher over the full text.
+    # Aliases ("k8s", "sklearn", "JS") resolve to their canonical skill names.
+    skill_counts = skill_matcher.match(full_text)
 
     # 5. Extract Education
     # Strategy: detect lines containing education keywords
     education_entries = []
-    edu_keywords = ["B.Tech", "M.Tech", "Bachelor", "Master", "PhD", "B.Sc", "M.Sc", "University", "College", "Institute", "Degree"]
     
     for line in lines:
-        if any(kw.lower() in line.lower() for kw in edu_keywords):
+        if EDU_KEYWORDS_RE.search(line):
             # Limit length to avoid capturing long narrative paragraphs unless it's a short description
             if len(line.split()) < 20: 
                 education_entries.append(line)
@@ -104,12 +135,9 @@ async def parse_resume(path: str) -> Dict[str, Any]:
     # 6. Extract Experience / Projects
     # Strategy: detect lines containing keywords like Internship, Experience, Project
     experience_entries = []
-    # Broad keywords to catch job titles or section lines. 
-    # Note: This is a simple extractor and might catch headers or generic lines.
-    exp_keywords = ["Intern", "Internship", "Experience", "Work", "Project", "Developer", "Engineer", "Analyst", "Associate", "Consultant"]
     
     for line in lines:
-        if any(kw.lower() in line.lower() for kw in exp_keywords):
+        if EXP_KEYWORDS_RE.search(line):
             # Heuristic: Avoid very long lines that might be descriptions
             if len(line.split()) < 15:
                 experience_entries.append(line)
@@ -117,7 +145,10 @@ async def parse_resume(path: str) -> Dict[str, Any]:
     return {
         "name": name,
         "email": email,
-        "skills": list(found_skills),
+        "skills": list(skill_counts),
+        "skill_counts": skill_counts,
         "education": education_entries,
-        "experience": experience_entries
+        "experience": experience_entries,
+        "text": full_text[:RESUME_TEXT_MAX_CHARS],
+        "preview": text_preview(first_page_text)
     }
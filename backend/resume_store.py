@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from backend.blob_store import BlobStore, run_blob_io
+
+# Uploaded resumes are stored once per distinct file, named by their SHA-256 and
+# sharded by its first hex digits (RESUME_STORE_DIR/ab/cd/abcd....pdf)
+RESUME_STORE_DIR = Path(os.getenv("RESUME_STORE_DIR", "applications/resumes"))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+resume_blobs = BlobStore(RESUME_STORE_DIR, hashed_keys=True)
+
+
+def _store_resume_file(source):
+    """Copies a file object into the store while hashing it. Returns (sha256, path)."""
+    digest = hashlib.sha256()
+    tmp_path = resume_blobs.temp_path()
+    try:
+        with open(tmp_path, "wb") as buffer:
+            while True:
+                chunk = source.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                buffer.write(chunk)
+
+        pdf_hash = digest.hexdigest()
+        # Resumes stored before sharding sit directly in RESUME_STORE_DIR
+        legacy_path = RESUME_STORE_DIR / f"{pdf_hash}.pdf"
+        if legacy_path.exists():
+            tmp_path.unlink()
+            return pdf_hash, legacy_path
+        # Atomic, so a concurrent identical upload can never leave a partial file
+        return pdf_hash, resume_blobs.commit(tmp_path, pdf_hash, ".pdf", replace=False)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+async def save_resume_upload(upload):
+    """
+    Streams an UploadFile into the content-addressed store, hashing it on the way,
+    on the blob I/O threads. Returns (sha256 hex digest, stored path).
+    Re-uploads of an identical file reuse the existing copy.
+    """
+    return await run_blob_io(_store_resume_file, upload.file)
+
+
+def get_cached_parse(conn, pdf_hash: str, parser_version: str):
+    """Returns the cached parse_resume output for this file and parser version, or None."""
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT result_json FROM parse_cache WHERE pdf_hash = ? AND parser_version = ?",
+        (pdf_hash, parser_version)
+    )
+    row = cursor.fetchone()
+    if not row:
+        return None
+    try:
+        return json.loads(row[0])
+    except json.JSONDecodeError:
+        return None
+
+
+def store_cached_parse(conn, pdf_hash: str, parser_version: str, result: dict):
+    """Does not commit; run it inside a writer transaction."""
+    conn.execute(
+        "INSERT OR REPLACE INTO parse_cache (pdf_hash, parser_version, result_json) VALUES (?, ?, ?)",
+        (pdf_hash, parser_version, json.dumps(result, default=str))
+    )
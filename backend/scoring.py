@@ -1,108 +1,154 @@
 from datetime import datetime
-import math
+import copy
+import json
+import re
 
-def calculate_score(self_ratings: dict, resume_data: dict, github_data: dict) -> dict:
-    """
-    Calculates the candidate score based on:
-    1. Skill Self-Ratings (Max 40 points)
-    2. Resume Analysis (Max 30 points)
-    3. GitHub Analysis (Max 30 points)
-    
-    Total Score is capped at 100.
-    """
-    
-    # --- 1. Skill Self-Ratings (Target Max: 40) ---
-    # Formula given:
-    # Programming * 2
-    # DSA * 2
-    # ML_AI * 1.6
-    # Web_Dev * 1.2
-    # Tools * 1.2
-    # Note: If inputs are 1-10, max raw score is 80.
-    # We will apply min(score, 40) to respect the section weight.
-    
-    prog = float(self_ratings.get("Programming", 0))
-    dsa = float(self_ratings.get("DSA", 0))
-    ml = float(self_ratings.get("ML_AI", 0))
-    web = float(self_ratings.get("Web_Dev", 0))
-    tools = float(self_ratings.get("Tools", 0))
-    
-    raw_skills_score = (
-        (prog * 2) + 
-        (dsa * 2) + 
-        (ml * 1.6) + 
-        (web * 1.2) + 
-        (tools * 1.2)
+import numpy as np
+
+# Version 1 of the scoring weights: the original hard-coded formula.
+# New versions are stored in the scoring_config table; missing keys fall back to these.
+DEFAULT_WEIGHTS = {
+    # 1. Skill Self-Ratings (Target Max: 40)
+    "self_ratings": {
+        "Programming": 2,
+        "DSA": 2,
+        "ML_AI": 1.6,
+        "Web_Dev": 1.2,
+        "Tools": 1.2,
+    },
+    "skills_cap": 40,
+    # 2. Resume Score (Target Max: 30)
+    "resume_points_per_skill": 1.5,
+    "resume_skill_count_cap": 10,
+    "resume_education_points": 10,
+    "resume_experience_points": 5,
+    "resume_cap": 30,
+    # 3. GitHub Score (Target Max: 30)
+    "github_points_per_repo": 0.5,
+    "github_repo_cap": 20,
+    "github_points_per_star": 0.2,
+    "github_star_cap": 50,
+    "github_activity_points": 10,
+    "github_activity_days": 180,
+    "github_cap": 30,
+    # Final
+    "total_cap": 100,
+}
+
+# Self-rating keys and the applicants columns their values are materialized in
+RATING_COLUMNS = {
+    "Programming": "rating_programming",
+    "DSA": "rating_dsa",
+    "ML_AI": "rating_ml_ai",
+    "Web_Dev": "rating_web_dev",
+    "Tools": "rating_tools",
+}
+
+# Every scoring input, as stored on the applicants row
+FEATURE_COLUMNS = list(RATING_COLUMNS.values()) + [
+    "skill_count",
+    "education_count",
+    "experience_count",
+    "gh_repos",
+    "gh_stars",
+    "gh_last_activity",
+]
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def merge_weights(weights: dict = None) -> dict:
+    """Overlays (possibly partial) weights on DEFAULT_WEIGHTS."""
+    merged = copy.deepcopy(DEFAULT_WEIGHTS)
+    for key, value in (weights or {}).items():
+        if key == "self_ratings" and isinstance(value, dict):
+            merged["self_ratings"].update(value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def validate_weights(weights: dict):
+    """Raises ValueError for unknown weight keys or non-numeric values."""
+    if not isinstance(weights, dict):
+        raise ValueError("Weights must be an object")
+    for key, value in weights.items():
+        if key not in DEFAULT_WEIGHTS:
+            raise ValueError(f"Unknown weight '{key}'")
+        if key == "self_ratings":
+            if not isinstance(value, dict):
+                raise ValueError("'self_ratings' must be an object")
+            for rating, rating_weight in value.items():
+                if rating not in RATING_COLUMNS:
+                    raise ValueError(f"Unknown self rating '{rating}'")
+                if isinstance(rating_weight, bool) or not isinstance(rating_weight, (int, float)):
+                    raise ValueError(f"Weight for '{rating}' must be a number")
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Weight '{key}' must be a number")
+
+
+def _count(value) -> int:
+    if isinstance(value, (list, tuple, dict)):
+        return len(value)
+    return 1 if value else 0
+
+
+def extract_features(self_ratings: dict, resume_data: dict, github_data: dict) -> dict:
+    """Flattens the scoring inputs into the feature columns stored on the applicants row."""
+    features = {
+        column: float(self_ratings.get(key, 0) or 0) for key, column in RATING_COLUMNS.items()
+    }
+    features["skill_count"] = _count(resume_data.get("skills", []))
+    features["education_count"] = _count(resume_data.get("education", []))
+    features["experience_count"] = _count(resume_data.get("experience", []))
+    features["gh_repos"] = int(github_data.get("public_repos", 0) or 0)
+    features["gh_stars"] = int(github_data.get("total_stars", 0) or 0)
+
+    # Expected format YYYY-MM-DD; anything else (e.g. "N/A") means no activity
+    last_activity = str(github_data.get("last_activity") or "")[:10]
+    features["gh_last_activity"] = last_activity if _DATE_RE.match(last_activity) else None
+    return features
+
+
+def score_features(features: dict, weights: dict = None, now: datetime = None) -> dict:
+    """Scores one applicant's feature dict (see extract_features)."""
+    w = merge_weights(weights)
+    now = now or datetime.now()
+
+    # --- 1. Skill Self-Ratings ---
+    # Weighted sum of the 1-5 self ratings, capped to respect the section weight.
+    raw_skills_score = sum(
+        features[column] * w["self_ratings"].get(key, 0) for key, column in RATING_COLUMNS.items()
     )
-    
-    # Cap skills score at 40
-    skills_score = min(raw_skills_score, 40.0)
-
-
-    # --- 2. Resume Score (Target Max: 30) ---
-    # Formula:
-    # min(len(skills), 10) * 1.5  -> Max 15 points
-    # +10 if education exists
-    # +5 if experience exists
-    
-    skills_list = resume_data.get("skills", [])
-    education_list = resume_data.get("education", [])
-    experience_list = resume_data.get("experience", [])
-    
-    # Skill count score
-    skill_count = len(skills_list)
-    resume_skills_score = min(skill_count, 10) * 1.5
-    
-    # Education score
-    resume_edu_score = 10 if len(education_list) > 0 else 0
-    
-    # Experience score
-    resume_exp_score = 5 if len(experience_list) > 0 else 0
-    
-    resume_score = resume_skills_score + resume_edu_score + resume_exp_score
-    resume_score = min(resume_score, 30.0) # Safety cap
-
-
-    # --- 3. GitHub Score (Target Max: 30) ---
-    # Formula:
-    # min(public_repos, 20) * 0.5 -> Max 10 points
-    # min(total_stars, 50) * 0.2  -> Max 10 points
-    # +10 if last_activity within 6 months
-    
-    public_repos = int(github_data.get("public_repos", 0))
-    total_stars = int(github_data.get("total_stars", 0))
-    last_activity_str = github_data.get("last_activity") # Expected format YYYY-MM-DD or None
-    
-    # Repos score
-    gh_repo_score = min(public_repos, 20) * 0.5
-    
-    # Stars score
-    gh_stars_score = min(total_stars, 50) * 0.2
-    
-    # Activity score
+    skills_score = min(raw_skills_score, float(w["skills_cap"]))
+
+    # --- 2. Resume Score ---
+    # min(len(skills), cap) * points, plus flat points if education / experience exist
+    resume_skills_score = min(features["skill_count"], w["resume_skill_count_cap"]) * w["resume_points_per_skill"]
+    resume_edu_score = w["resume_education_points"] if features["education_count"] > 0 else 0
+    resume_exp_score = w["resume_experience_points"] if features["experience_count"] > 0 else 0
+    resume_score = min(resume_skills_score + resume_edu_score + resume_exp_score, float(w["resume_cap"]))
+
+    # --- 3. GitHub Score ---
+    # Capped repos and stars, plus flat points for recent activity
+    gh_repo_score = min(features["gh_repos"], w["github_repo_cap"]) * w["github_points_per_repo"]
+    gh_stars_score = min(features["gh_stars"], w["github_star_cap"]) * w["github_points_per_star"]
+
     gh_activity_score = 0
-    if last_activity_str:
+    if features["gh_last_activity"]:
         try:
-            # Flexible date parsing
-            # Assuming format could be "YYYY-MM-DD" or similar ISO
-            last_activity_date = datetime.strptime(str(last_activity_str)[:10], "%Y-%m-%d")
-            
-            # Check if within 6 months (approx 180 days)
-            delta = datetime.now() - last_activity_date
-            if delta.days <= 180:
-                gh_activity_score = 10
+            last_activity_date = datetime.strptime(features["gh_last_activity"], "%Y-%m-%d")
+            if (now - last_activity_date).days <= w["github_activity_days"]:
+                gh_activity_score = w["github_activity_points"]
         except (ValueError, TypeError):
-             # Make checking safe for invalid formats like "N/A"
-             pass
-             
-    github_score = gh_repo_score + gh_stars_score + gh_activity_score
-    github_score = min(github_score, 30.0) # Safety cap
+            # Make checking safe for invalid formats
+            pass
 
+    github_score = min(gh_repo_score + gh_stars_score + gh_activity_score, float(w["github_cap"]))
 
     # --- Final Calculation ---
-    overall_score = skills_score + resume_score + github_score
-    overall_score = min(overall_score, 100.0)
-    
+    overall_score = min(skills_score + resume_score + github_score, float(w["total_cap"]))
+
     return {
         "overall_score": int(round(overall_score)),
         "breakdown": {
@@ -111,3 +157,99 @@ def calculate_score(self_ratings: dict, resume_data: dict, github_data: dict) ->
             "github": int(round(github_score))
         }
     }
+
+
+def calculate_score(self_ratings: dict, resume_data: dict, github_data: dict, weights: dict = None) -> dict:
+    """
+    Calculates the candidate score based on:
+    1. Skill Self-Ratings (Max 40 points)
+    2. Resume Analysis (Max 30 points)
+    3. GitHub Analysis (Max 30 points)
+
+    Total Score is capped at 100. `weights` overrides DEFAULT_WEIGHTS (see scoring_config).
+    """
+    return score_features(extract_features(self_ratings, resume_data, github_data), weights)
+
+
+def to_activity_dates(values) -> np.ndarray:
+    """YYYY-MM-DD strings (or None) -> datetime64[D] array with NaT for missing/invalid values."""
+    dates = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[D]")
+    for index, value in enumerate(values):
+        if value and _DATE_RE.match(value):
+            try:
+                dates[index] = np.datetime64(value[:10], "D")
+            except ValueError:
+                pass
+    return dates
+
+
+def score_feature_arrays(features: dict, weights: dict = None, now: datetime = None) -> dict:
+    """
+    Vectorized score_features: `features` maps each FEATURE_COLUMNS name to an
+    array with one entry per applicant. Returns arrays for overall_score and
+    the skills / resume / github breakdown, matching score_features exactly.
+    """
+    w = merge_weights(weights)
+    today = np.datetime64((now or datetime.now()).date(), "D")
+
+    def numeric(column):
+        return np.nan_to_num(np.asarray(features[column], dtype=float))
+
+    raw_skills = sum(numeric(column) * w["self_ratings"].get(key, 0) for key, column in RATING_COLUMNS.items())
+    skills = np.minimum(raw_skills, w["skills_cap"])
+
+    resume = (
+        np.minimum(numeric("skill_count"), w["resume_skill_count_cap"]) * w["resume_points_per_skill"]
+        + np.where(numeric("education_count") > 0, w["resume_education_points"], 0)
+        + np.where(numeric("experience_count") > 0, w["resume_experience_points"], 0)
+    )
+    resume = np.minimum(resume, w["resume_cap"])
+
+    dates = features["gh_last_activity"]
+    if not np.issubdtype(np.asarray(dates).dtype, np.datetime64):
+        dates = to_activity_dates(dates)
+    days_since = (today - dates).astype("timedelta64[D]")
+    active = ~np.isnat(days_since) & (days_since.astype(np.int64) <= w["github_activity_days"])
+
+    github = (
+        np.minimum(numeric("gh_repos"), w["github_repo_cap"]) * w["github_points_per_repo"]
+        + np.minimum(numeric("gh_stars"), w["github_star_cap"]) * w["github_points_per_star"]
+        + np.where(active, w["github_activity_points"], 0)
+    )
+    github = np.minimum(github, w["github_cap"])
+
+    overall = np.minimum(skills + resume + github, w["total_cap"])
+
+    # np.rint rounds half to even, like Python's round()
+    return {
+        "overall_score": np.rint(overall).astype(int),
+        "skills": np.rint(skills).astype(int),
+        "resume": np.rint(resume).astype(int),
+        "github": np.rint(github).astype(int),
+    }
+
+
+def get_active_scoring_config(conn):
+    """Returns (version, weights) of the active scoring configuration."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT version, weights_json FROM scoring_config WHERE is_active = 1 ORDER BY version DESC LIMIT 1")
+    row = cursor.fetchone()
+    if not row:
+        return 1, merge_weights()
+    return row[0], merge_weights(json.loads(row[1]))
+
+
+def publish_scoring_config(conn, weights: dict) -> int:
+    """Stores weights as a new scoring_config version, makes it active and returns the version."""
+    validate_weights(weights)
+    merged = merge_weights(weights)
+    cursor = conn.cursor()
+    cursor.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM scoring_config")
+    version = cursor.fetchone()[0]
+    cursor.execute("UPDATE scoring_config SET is_active = 0")
+    cursor.execute(
+        "INSERT INTO scoring_config (version, weights_json, is_active) VALUES (?, ?, 1)",
+        (version, json.dumps(merged))
+    )
+    conn.commit()
+    return version
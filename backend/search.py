@@ -0,0 +1,98 @@
+import html
+import re
+
+# FTS5 columns of applicants_fts, in table order. The rowid is applicants.id.
+SEARCH_COLUMNS = ["full_name", "email", "college", "degree", "skills", "resume_text"]
+# bm25 weight per column: a hit in the name counts far more than one in the resume body
+SEARCH_COLUMN_WEIGHTS = [10.0, 5.0, 3.0, 3.0, 4.0, 1.0]
+
+# Private-use markers for snippet()/highlight(); swapped for <mark> after HTML-escaping
+_MARK_START = "\ue000"
+_MARK_END = "\ue001"
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+CREATE_SEARCH_TABLE_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS applicants_fts USING fts5(
+        {", ".join(SEARCH_COLUMNS)},
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+"""
+
+
+def index_applicant(conn, row_id: int, fields: dict):
+    """
+    Replaces the search index entry for one applicant. `fields` maps
+    SEARCH_COLUMNS names to text; "skills" may be a list. Does not commit.
+    """
+    values = []
+    for column in SEARCH_COLUMNS:
+        value = fields.get(column) or ""
+        if isinstance(value, (list, tuple)):
+            value = " ".join(str(item) for item in value)
+        values.append(str(value))
+
+    conn.execute("DELETE FROM applicants_fts WHERE rowid = ?", (row_id,))
+    conn.execute(
+        f"INSERT INTO applicants_fts (rowid, {', '.join(SEARCH_COLUMNS)}) VALUES (?, {', '.join('?' * len(SEARCH_COLUMNS))})",
+        (row_id, *values)
+    )
+
+
+def build_match_query(text: str) -> str:
+    """
+    Turns free text into an FTS5 MATCH expression: every word must match, and
+    each word also matches as a prefix ("pyth" finds "Python"). User input
+    never reaches the FTS5 query syntax unquoted.
+    """
+    terms = _TERM_RE.findall(text)
+    return " AND ".join(f'"{term}"*' for term in terms)
+
+
+def _marked_html(text: str) -> str:
+    escaped = html.escape(text or "")
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def search_applicants(conn, text: str, limit: int = 20, offset: int = 0):
+    """
+    Ranked (bm25) full-text search over applicant fields and resume text.
+    Returns dicts with the list-view fields plus HTML-safe highlighted
+    name and resume snippet.
+    """
+    match = build_match_query(text)
+    if not match:
+        return []
+
+    weights = ", ".join(str(weight) for weight in SEARCH_COLUMN_WEIGHTS)
+    resume_column = SEARCH_COLUMNS.index("resume_text")
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT a.application_id, a.full_name, a.college, a.degree, a.overall_score, a.enrichment_status,
+               highlight(applicants_fts, 0, ?, ?) AS name_marked,
+               snippet(applicants_fts, -1, ?, ?, '…', 16) AS best_snippet,
+               snippet(applicants_fts, {resume_column}, ?, ?, '…', 16) AS resume_snippet,
+               bm25(applicants_fts, {weights}) AS rank
+        FROM applicants_fts
+        JOIN applicants a ON a.id = applicants_fts.rowid
+        WHERE applicants_fts MATCH ?
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+    """, (_MARK_START, _MARK_END) * 3 + (match, limit, offset))
+
+    results = []
+    for row in cursor.fetchall():
+        # Prefer a resume excerpt when the resume matched; otherwise the best column
+        snippet_text = row["resume_snippet"] if _MARK_START in (row["resume_snippet"] or "") else row["best_snippet"]
+        results.append({
+            "application_id": row["application_id"],
+            "full_name": row["full_name"],
+            "college": row["college"],
+            "degree": row["degree"],
+            "overall_score": row["overall_score"],
+            "enrichment_status": row["enrichment_status"],
+            "name_html": _marked_html(row["name_marked"]),
+            "snippet_html": _marked_html(snippet_text),
+            "rank": round(row["rank"], 4),
+        })
+    return results
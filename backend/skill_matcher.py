@@ -0,0 +1,88 @@
+from typing import Dict, List, Optional
+from pathlib import Path
+import json
+import os
+import re
+
+DEFAULT_TAXONOMY_PATH = Path(__file__).resolve().parent / "data" / "skill_taxonomy.json"
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", str(DEFAULT_TAXONOMY_PATH))
+
+# A skill must not be glued to other word characters. The trailing check also
+# rejects '+' and '#', so "C" does not match inside "C++" or "C#".
+_LEFT_BOUNDARY = r"(?<!\w)"
+_RIGHT_BOUNDARY = r"(?![\w+#])"
+
+
+class SkillMatcher:
+    """
+    Finds every taxonomy skill in a text with a single compiled regex.
+    All names and aliases go into one alternation (longest first, so
+    "Node.js" wins over "Node"), and each hit is mapped back to its
+    canonical skill name.
+    """
+
+    def __init__(self, skills: List[dict], version: str = "unversioned"):
+        self.version = version
+        self.canonical_names = []
+        # Lowercased surface form -> canonical name (case-insensitive entries)
+        self._lookup = {}
+        # Exact surface form -> canonical name (case-sensitive entries)
+        self._exact_lookup = {}
+        alternatives = []
+
+        for entry in skills:
+            name = entry["name"]
+            case_sensitive = entry.get("case_sensitive", False)
+            self.canonical_names.append(name)
+
+            for term in [name] + entry.get("aliases", []):
+                term = term.strip()
+                if not term:
+                    continue
+                table = self._exact_lookup if case_sensitive else self._lookup
+                key = term if case_sensitive else term.lower()
+                if table.get(key, name) != name:
+                    raise ValueError(f"Skill term '{term}' maps to both '{table[key]}' and '{name}'")
+                table[key] = name
+                alternatives.append((term, case_sensitive))
+
+        # Longest terms first so the alternation prefers the most specific match
+        alternatives.sort(key=lambda item: len(item[0]), reverse=True)
+        parts = []
+        for term, case_sensitive in alternatives:
+            escaped = re.escape(term)
+            parts.append(f"(?-i:{escaped})" if case_sensitive else escaped)
+
+        if parts:
+            pattern = _LEFT_BOUNDARY + "(?:" + "|".join(parts) + ")" + _RIGHT_BOUNDARY
+        else:
+            pattern = r"(?!x)x"  # Empty taxonomy never matches
+        self._regex = re.compile(pattern, re.IGNORECASE)
+
+    def _canonical(self, surface: str) -> Optional[str]:
+        return self._exact_lookup.get(surface) or self._lookup.get(surface.lower())
+
+    def match(self, text: str) -> Dict[str, int]:
+        """
+        Returns {canonical skill: number of mentions}, ordered by mention count
+        (ties keep taxonomy order).
+        """
+        counts = {}
+        for hit in self._regex.finditer(text):
+            name = self._canonical(hit.group(0))
+            if name:
+                counts[name] = counts.get(name, 0) + 1
+
+        order = {name: index for index, name in enumerate(self.canonical_names)}
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], order[item[0]])))
+
+
+def load_skill_matcher(path: str = SKILL_TAXONOMY_PATH) -> SkillMatcher:
+    """Builds a SkillMatcher from a versioned taxonomy JSON file."""
+    with open(path, encoding="utf-8") as f:
+        taxonomy = json.load(f)
+    return SkillMatcher(taxonomy.get("skills", []), version=str(taxonomy.get("version", "unversioned")))
+
+
+# Compiled once per process (including each parser pool worker)
+skill_matcher = load_skill_matcher()
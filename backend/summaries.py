@@ -0,0 +1,39 @@
+import hashlib
+import json
+import os
+
+from backend.utils import load_json_field
+
+# GitHub languages listed in the dashboard hover summary
+SUMMARY_LANGUAGES = int(os.getenv("SUMMARY_LANGUAGES", "5"))
+
+
+def build_summary(applicant: dict) -> dict:
+    """
+    The compact hover summary for an applicants row (or the enrichment
+    column values merged over it): score breakdown, top skills, top
+    languages, GitHub counts and the resume preview.
+    """
+    github_data = load_json_field(applicant.get("github_json"))
+    languages = github_data.get("top_languages") if isinstance(github_data, dict) else None
+    top_skills = applicant.get("top_skills") or ""
+    return {
+        "overall_score": applicant.get("overall_score"),
+        "score_breakdown": load_json_field(applicant.get("score_breakdown_json")),
+        "top_skills": [skill for skill in top_skills.split(", ") if skill],
+        "top_languages": list(languages)[:SUMMARY_LANGUAGES] if isinstance(languages, dict) else [],
+        "gh_repos": applicant.get("gh_repos"),
+        "gh_stars": applicant.get("gh_stars"),
+        "gh_followers": applicant.get("gh_followers"),
+        "resume_preview": applicant.get("resume_preview") or "",
+    }
+
+
+def summary_json(summary: dict) -> str:
+    """Serialized summary as stored in applicants.summary_json and sent as-is."""
+    return json.dumps(summary, separators=(",", ":"), default=str)
+
+
+def summary_etag(body: str) -> str:
+    """Strong ETag for a serialized summary."""
+    return '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
@@ -1,5 +1,13 @@
+import json
 import uuid
 
 def generate_application_id() -> str:
     """Generates a unique application ID."""
     return str(uuid.uuid4())
+
+def load_json_field(value):
+    """Parses a JSON column; empty or malformed values give {}."""
+    try:
+        return json.loads(value) if value else {}
+    except json.JSONDecodeError:
+        return {}
@@ -3,21 +3,20 @@ import pytest
 from fastapi.testclient import TestClient
 import sys
 import os
-import shutil
 from pathlib import Path
 
 # Add project root to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.main import app
-from backend.database import get_db, init_db
+from backend import database
+from backend.database import init_db
 
 # Mock dependencies
 from unittest.mock import MagicMock
 
 # Create a temporary test database
 TEST_DB_FILE = "test_internship.db"
-TEST_APP_DIR = "test_applications"
 
 @pytest.fixture(scope="session", autouse=True)
 def cleanup_test_artifacts():
@@ -26,31 +25,26 @@ def cleanup_test_artifacts():
     # Force garbage collection to release file handles
     import gc
     gc.collect()
+    database.close_pool()
     
     try:
-        if os.path.exists(TEST_DB_FILE):
-             os.remove(TEST_DB_FILE)
-        if os.path.exists(TEST_APP_DIR):
-            shutil.rmtree(TEST_APP_DIR, ignore_errors=True)
+        # WAL mode leaves -wal / -shm files next to the database
+        for path in (TEST_DB_FILE, f"{TEST_DB_FILE}-wal", f"{TEST_DB_FILE}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
     except PermissionError:
         print(f"Warning: Could not delete {TEST_DB_FILE} - it fails on Windows sometimes.")
     except Exception as e:
         print(f"Cleanup error: {e}")
 
 @pytest.fixture(scope="module")
-def client():
-    # Override database dependency
+def client(tmp_path_factory):
     import sqlite3
-    
-    def override_get_db():
-        conn = sqlite3.connect(TEST_DB_FILE, check_same_thread=False)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-        finally:
-            conn.close()
+    from backend import resume_store, profiles
+    from backend.blob_store import BlobStore
 
-    app.dependency_overrides[get_db] = override_get_db
+    # The app's connection pool (routes, enrichment workers, exports) follows DB_NAME
+    database.DB_NAME = TEST_DB_FILE
     
     # Initialize Test DB
     with sqlite3.connect(TEST_DB_FILE) as conn:
@@ -74,16 +68,22 @@ def client():
             );
         ''')
 
-    # Override Directory creation logic in main.py is hardcoded to "applications/"
-    # For now we will just let it write to applications/ and rely on cleanup or 
-    # we would need to patch Path in main.py. 
-    # To be safe and simple, we will just patch the external services.
+    # Uploaded resumes and stored profiles go to a temporary directory, not applications/
+    app_dir = tmp_path_factory.mktemp("applications")
+    patches = pytest.MonkeyPatch()
+    patches.setattr(resume_store, "RESUME_STORE_DIR", app_dir / "resumes")
+    patches.setattr(resume_store, "resume_blobs", BlobStore(app_dir / "resumes", hashed_keys=True))
+    patches.setattr(profiles, "profile_blobs", BlobStore(app_dir / "profiles"))
 
-    # Patch Email Service
-    app.dependency_overrides["backend.email_service.send_confirmation_email"] = lambda *args: True
+    # Email Service: without SMTP_EMAIL the delivery worker stays off and mail stays
+    # queued in email_outbox (test_email_outbox_* deliver it to a local SMTP sink)
+    os.environ.pop("SMTP_EMAIL", None)
+    # Recruiter digests are queued by calling backend.digest directly in tests
+    os.environ.pop("RECRUITER_EMAIL", None)
     
     with TestClient(app) as test_client:
         yield test_client
+    patches.undo()
     
     app.dependency_overrides.clear()
 
@@ -96,12 +96,253 @@ def mock_external_services(monkeypatch):
     
     async def mock_analyze_github(*args):
         return {"total_stars": 100, "public_repos": 5}
-        
-    def mock_send_email(*args):
-        print("MOCK EMAIL SENT")
-        return True
 
-    monkeypatch.setattr("backend.main.parse_resume", mock_parse_resume)
-    monkeypatch.setattr("backend.main.analyze_github", mock_analyze_github)
-    monkeypatch.setattr("backend.main.send_confirmation_email", mock_send_email)
+    monkeypatch.setattr("backend.enrichment.parse_resume", mock_parse_resume)
+    monkeypatch.setattr("backend.enrichment.analyze_github", mock_analyze_github)
+
+
+def wait_for_enrichment(application_id, timeout=10):
+    """Blocks until the background enrichment job for application_id has finished."""
+    import sqlite3
+    import time
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with sqlite3.connect(TEST_DB_FILE) as conn:
+            row = conn.execute(
+                "SELECT enrichment_status FROM applicants WHERE application_id = ?", (application_id,)
+            ).fetchone()
+        if row and row[0] in ("done", "failed"):
+            return row[0]
+        time.sleep(0.05)
+    raise TimeoutError(f"Enrichment for {application_id} did not finish in {timeout}s")
+
+
+@pytest.fixture
+def admin_client(client, monkeypatch):
+    """The test client with an admin session for the duration of one test."""
+    monkeypatch.setenv("ADMIN_USERNAME", "admin")
+    monkeypatch.setenv("ADMIN_PASSWORD", "secret")
+    client.post("/admin/login", data={"username": "admin", "password": "secret"}, follow_redirects=False)
+    yield client
+    client.get("/admin/logout", follow_redirects=False)
+
+
+@pytest.fixture(autouse=True)
+def drain_enrichment_queue(monkeypatch):
+    """
+    Waits for queued enrichment jobs after each test. Depending on monkeypatch
+    makes this run before the test's service mocks are undone, so a background
+    job never reaches the real GitHub API.
+    """
+    yield
+    import sqlite3
+    import time
+
+    if not os.path.exists(TEST_DB_FILE):
+        return
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        with sqlite3.connect(TEST_DB_FILE) as conn:
+            try:
+                busy = conn.execute(
+                    "SELECT COUNT(*) FROM enrichment_jobs WHERE status IN ('pending', 'running')"
+                ).fetchone()[0]
+            except sqlite3.OperationalError:
+                return
+        if not busy:
+            return
+        time.sleep(0.05)
+
+
+
+class GitHubStub:
+    """
+    In-process stand-in for api.github.com. Serves /users/{u} and
+    /users/{u}/repos from the dicts below and records every request and
+    every TCP connection, so tests can check connection reuse offline.
+    Responses carry ETags (If-None-Match gets a 304) and, when
+    rate_limit_remaining is set, X-RateLimit-* headers.
+    """
+
+    def __init__(self):
+        self.users = {}
+        self.repos = {}
+        self.languages = {}
+        self.requests = []
+        self.statuses = []
+        self.connections = 0
+        self.rate_limit_remaining = None
+        self.rate_limit_reset = 0
+        self.url = None
+
+    def add_user(self, username, repos=(), **fields):
+        self.users[username] = {"login": username, "public_repos": len(repos), "followers": 0, **fields}
+        self.repos[username] = list(repos)
+
+    def respond(self, path):
+        """Returns (status, headers, body) for a request path."""
+        from urllib.parse import urlsplit, parse_qs
+
+        parts = urlsplit(path)
+        query = parse_qs(parts.query)
+        route = parts.path.strip("/").split("/")
+        if len(route) >= 2 and route[0] == "users" and route[1] in self.users:
+            if len(route) == 2:
+                return 200, {}, self.users[route[1]]
+            if len(route) == 3 and route[2] == "repos":
+                # Paginated like GitHub, with a Link header pointing at the last page
+                repos = self.repos[route[1]]
+                per_page = int(query.get("per_page", ["30"])[0])
+                page = int(query.get("page", ["1"])[0])
+                last = max(1, -(-len(repos) // per_page))
+                headers = {}
+                if page < last:
+                    base = f"{self.url}{parts.path}?per_page={per_page}&page="
+                    headers["Link"] = f'<{base}{page + 1}>; rel="next", <{base}{last}>; rel="last"'
+                return 200, headers, repos[(page - 1) * per_page:page * per_page]
+        if len(route) == 4 and route[0] == "repos" and route[3] == "languages":
+            full_name = f"{route[1]}/{route[2]}"
+            if full_name in self.languages:
+                return 200, {}, self.languages[full_name]
+        return 404, {}, {"message": "Not Found"}
+
+
+@pytest.fixture
+def github_stub(client, monkeypatch):
+    """Runs a GitHubStub on localhost and points github_service at it (cache lives in the test DB)."""
+    import hashlib
+    import json as _json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    stub = GitHubStub()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, so connection reuse is observable
+
+        def setup(self):
+            super().setup()
+            stub.connections += 1
+
+        def do_GET(self):
+            stub.requests.append({"path": self.path, "headers": dict(self.headers)})
+            status, headers, body = stub.respond(self.path)
+            payload = _json.dumps(body).encode() if body is not None else b""
+            headers = dict(headers)
+            if status == 200:
+                headers["ETag"] = '"%s"' % hashlib.sha1(payload).hexdigest()
+                if self.headers.get("If-None-Match") == headers["ETag"]:
+                    status, payload = 304, b""
+            if stub.rate_limit_remaining is not None:
+                headers["X-RateLimit-Remaining"] = str(stub.rate_limit_remaining)
+                headers["X-RateLimit-Reset"] = str(int(stub.rate_limit_reset))
+            stub.statuses.append(status)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stub.url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr("backend.github_service.GITHUB_API_URL", stub.url)
+
+    yield stub
+
+    server.shutdown()
+    server.server_close()
+
+
+class SMTPSink:
+    """
+    aiosmtpd handler that keeps every accepted message and counts SMTP
+    sessions (one EHLO each). Recipients in `reject` get a temporary 451.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = 0
+        self.reject = set()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.reject:
+            return "451 Mailbox busy, try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 Message accepted for delivery"
+
+    def recipients(self):
+        return [address for envelope in self.messages for address in envelope.rcpt_tos]
+
+
+@pytest.fixture
+def smtp_sink(monkeypatch):
+    """A local SMTP server (no TLS, no auth) that the email worker is pointed at."""
+    import socket
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+    from backend import email_service
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    sink = SMTPSink()
+    controller = controller_module.Controller(sink, hostname="127.0.0.1", port=port)
+    controller.start()
+    monkeypatch.setattr(email_service, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(email_service, "SMTP_PORT", port)
+    monkeypatch.setattr(email_service, "SMTP_STARTTLS", False)
+    monkeypatch.setenv("SMTP_EMAIL", "noreply@eazeintern.test")
+    monkeypatch.delenv("SMTP_PASSWORD", raising=False)
+    yield sink
+    controller.stop()
+
+
+def run_email_worker(done, timeout=10):
+    """
+    Runs an email delivery worker until done() (checked against the DB
+    between polls) is true, then stops it. Returns the worker.
+    """
+    import asyncio
+    import time
+    from backend.email_service import EmailDeliveryWorker
+
+    async def scenario():
+        worker = EmailDeliveryWorker(poll_seconds=0.05)
+        assert worker.start()
+        deadline = time.time() + timeout
+        try:
+            while not done():
+                if time.time() > deadline:
+                    raise TimeoutError("Email outbox was not drained in time")
+                await asyncio.sleep(0.05)
+        finally:
+            await worker.stop()
+        return worker
+
+    return asyncio.run(scenario())
+
 
+def start_digest_window(conn):
+    """Marks every existing applicant as already digested (for recruiter digest tests)."""
+    conn.execute("""
+        INSERT INTO recruiter_digests (last_applicant_id, applicant_count)
+        SELECT COALESCE(MAX(id), 0), 0 FROM applicants
+    """)
+    conn.execute("UPDATE applicants SET digest_id = last_insert_rowid() WHERE digest_id IS NULL")
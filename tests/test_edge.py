@@ -2,6 +2,8 @@
 import json
 import pytest
 
+from conftest import wait_for_enrichment
+
 def test_resume_minimal_content(client, mock_external_services):
     """Test upload with a valid but very small/empty PDF (checking if backend crashes)."""
     
@@ -31,10 +33,9 @@ def test_github_zero_repos(client, monkeypatch):
     async def mock_zero_repos(*args):
         return {"total_stars": 0, "public_repos": 0}
         
-    monkeypatch.setattr("backend.main.analyze_github", mock_zero_repos)
+    monkeypatch.setattr("backend.enrichment.analyze_github", mock_zero_repos)
     # Also need to mock other services or use the fixture
-    monkeypatch.setattr("backend.main.parse_resume", lambda *args: {})
-    monkeypatch.setattr("backend.main.send_confirmation_email", lambda *args: True)
+    monkeypatch.setattr("backend.enrichment.parse_resume", lambda *args: {})
 
     with open("tests/test_data/sample_payload.json") as f:
         payload = json.load(f)
@@ -49,6 +50,7 @@ def test_github_zero_repos(client, monkeypatch):
 
     assert response.status_code == 303
     app_id = response.headers["location"].split("/")[-1]
+    wait_for_enrichment(app_id)
     
     # Check dashboard to see if data reflects 0 repos
     response = client.get(f"/dashboard/{app_id}")
@@ -75,3 +77,676 @@ def test_long_candidate_name(client, mock_external_services):
     response = client.get(f"/dashboard/{app_id}")
     assert response.status_code == 200
     # The name might be truncated in display or full length, just ensure page loads
+
+def test_interrupted_enrichment_job_is_requeued(client):
+    """A job left 'running' by a crashed worker goes back to the queue on restart."""
+    import sqlite3
+    from conftest import TEST_DB_FILE
+    from backend.enrichment import requeue_interrupted_jobs
+
+    with sqlite3.connect(TEST_DB_FILE) as conn:
+        # available_at far in the future keeps the live workers from claiming it
+        conn.execute(
+            "INSERT INTO enrichment_jobs (application_id, status, available_at) VALUES ('crashed-job', 'running', 1e18)"
+        )
+
+    assert requeue_interrupted_jobs() >= 1
+
+    with sqlite3.connect(TEST_DB_FILE) as conn:
+        status = conn.execute(
+            "SELECT status FROM enrichment_jobs WHERE application_id = 'crashed-job'"
+        ).fetchone()[0]
+        conn.execute("DELETE FROM enrichment_jobs WHERE application_id = 'crashed-job'")
+    assert status == "pending"
+
+def test_skill_matcher_word_boundaries():
+    """Short skills only match as whole tokens ("C" is not found inside "C++" or "Docker")."""
+    from backend.skill_matcher import SkillMatcher
+
+    matcher = SkillMatcher([
+        {"name": "C"},
+        {"name": "C++", "aliases": ["CPP"]},
+        {"name": "Go", "case_sensitive": True},
+    ])
+
+    assert matcher.match("Fluent in C++ and Docker; we go far.") == {"C++": 1}
+    assert matcher.match("C, cpp and Go.") == {"C": 1, "C++": 1, "Go": 1}
+
+def test_github_rate_limiter_waits_for_reset():
+    """An exhausted rate limit delays the next call until the window resets."""
+    import asyncio
+    import time
+    from backend.github_service import GitHubRateLimiter, GitHubRateLimited
+
+    limiter = GitHubRateLimiter(max_wait=5)
+    limiter.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 0.3)})
+
+    started = time.time()
+    asyncio.run(limiter.acquire())
+    assert time.time() - started >= 0.25
+
+    # A reset too far away fails fast instead of stalling the worker
+    limiter.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 60)})
+    with pytest.raises(GitHubRateLimited):
+        asyncio.run(limiter.acquire())
+
+def test_slow_provider_stores_partial_results(client, monkeypatch):
+    """A provider that times out does not hold back (or discard) the other results."""
+    import asyncio
+    import sqlite3
+    from conftest import TEST_DB_FILE
+    from backend import enrichment
+
+    async def mock_parse_resume(*args):
+        return {"skills": ["Python"], "education": [], "experience": []}
+
+    async def slow_analyze_github(*args):
+        await asyncio.sleep(30)
+        return {"public_repos": 99}
+
+    github_provider = next(p for p in enrichment.ENRICHMENT_PROVIDERS if p.name == "github")
+    monkeypatch.setattr(github_provider, "timeout", 0.2)
+    monkeypatch.setattr("backend.enrichment.parse_resume", mock_parse_resume)
+    monkeypatch.setattr("backend.enrichment.analyze_github", slow_analyze_github)
+
+    with open("tests/test_data/sample_payload.json") as f:
+        form_data = {k: str(v) for k, v in json.load(f).items()}
+    with open("tests/test_data/valid_resume.pdf", "rb") as f:
+        files = {"resume": ("resume.pdf", f, "application/pdf")}
+        response = client.post("/apply", data=form_data, files=files, follow_redirects=False)
+    app_id = response.headers["location"].split("/")[-1]
+
+    assert wait_for_enrichment(app_id, timeout=5) == "done"
+
+    with sqlite3.connect(TEST_DB_FILE) as conn:
+        resume_json, github_json, provider_json = conn.execute(
+            "SELECT parsed_resume_json, github_json, provider_data_json FROM applicants WHERE application_id = ?",
+            (app_id,)
+        ).fetchone()
+    assert "Python" in json.loads(resume_json)["skills"]
+    assert json.loads(github_json)["error"] == "GitHub analysis failed"
+    assert json.loads(provider_json)["kaggle"]["username"] == "testuser"
+
+def test_rescore_only_touches_stale_rows(client):
+    """Publishing new weights rescores rows on older versions and leaves current ones alone."""
+    import sqlite3
+    from conftest import TEST_DB_FILE
+    from backend.backfill_scores import rescore_stale
+    from backend.scoring import get_active_scoring_config, publish_scoring_config
+
+    conn = sqlite3.connect(TEST_DB_FILE)
+    conn.row_factory = sqlite3.Row
+    try:
+        active_version, _ = get_active_scoring_config(conn)
+        conn.executemany(
+            """INSERT INTO applicants (full_name, email, application_id, enrichment_status, rating_programming,
+                   skill_count, education_count, experience_count, gh_repos, gh_stars, overall_score, score_version)
+               VALUES ('Rescore', 'r@example.com', ?, 'done', 5, 0, 0, 0, 0, 0, ?, ?)""",
+            [("rescore-stale", 10, active_version), ("rescore-pending", 10, None)]
+        )
+        conn.execute("UPDATE applicants SET enrichment_status = 'pending' WHERE application_id = 'rescore-pending'")
+        conn.execute("""UPDATE applicants SET summary_json = '{"overall_score":10,"score_breakdown":{"skills":10},"top_skills":["Go"]}'
+                        WHERE application_id = 'rescore-stale'""")
+        conn.commit()
+
+        # Doubling the Programming weight: 5 * 4 = 20
+        new_version = publish_scoring_config(conn, {"self_ratings": {"Programming": 4}})
+        assert rescore_stale(conn, chunk_size=1) >= 1
+        # Already current: nothing left to do
+        assert rescore_stale(conn) == 0
+
+        rows = {
+            row["application_id"]: row for row in conn.execute(
+                "SELECT application_id, overall_score, score_version, summary_json FROM applicants WHERE application_id LIKE 'rescore-%'"
+            )
+        }
+        assert rows["rescore-stale"]["overall_score"] == 20
+        assert rows["rescore-stale"]["score_version"] == new_version
+        # The stored hover summary follows the new score
+        summary = json.loads(rows["rescore-stale"]["summary_json"])
+        assert summary["overall_score"] == 20 and summary["score_breakdown"]["skills"] == 20
+        assert summary["top_skills"] == ["Go"]
+        # Rows still being enriched are scored by their worker, not the rescore
+        assert rows["rescore-pending"]["score_version"] is None
+    finally:
+        conn.execute("DELETE FROM applicants WHERE application_id LIKE 'rescore-%'")
+        conn.execute("UPDATE scoring_config SET is_active = (version = 1)")
+        conn.commit()
+        conn.close()
+
+def test_admin_listing_orders_missing_stats_last():
+    """Applicants without GitHub stats sort after everyone else and still page correctly."""
+    from backend.listing import ListingFilters, fetch_page
+    from test_positive import _listing_db
+
+    conn = _listing_db([None, 4, None, 2])
+    rows, next_cursor, _ = fetch_page(conn, ListingFilters(sort="stars"), limit=3)
+    assert [row["gh_stars"] for row in rows] == [4, 2, None]
+
+    rows, next_cursor, _ = fetch_page(conn, ListingFilters(sort="stars"), after=next_cursor, limit=3)
+    assert [row["id"] for row in rows] == [1]
+    assert next_cursor is None
+
+def test_search_query_without_words_matches_nothing():
+    """Punctuation-only input builds no MATCH expression instead of an FTS5 syntax error."""
+    from backend.search import build_match_query
+
+    assert build_match_query("  *:()\"  ") == ""
+    assert build_match_query("c++ dev") == '"c"* AND "dev"*'
+
+def test_list_columns_backfilled_for_legacy_rows(client):
+    """Rows enriched before the list view columns existed get them from their JSON, batch by batch."""
+    import sqlite3
+    from conftest import TEST_DB_FILE
+    from backend.migrations import backfill_list_columns
+
+    conn = sqlite3.connect(TEST_DB_FILE)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.executemany(
+            """INSERT INTO applicants (full_name, application_id, enrichment_status, self_rating_json,
+                   parsed_resume_json, github_json) VALUES ('Legacy', ?, 'done', '{}', ?, ?)""",
+            [
+                ("legacy-1", json.dumps({"skills": ["Go", "SQL", "Docker", "AWS", "Linux", "Git"]}),
+                 json.dumps({"public_repos": 12, "total_stars": 30, "followers": 7, "last_activity": "2025-03-01"})),
+                ("legacy-2", json.dumps({"skills": []}), "not json"),
+            ]
+        )
+        conn.commit()
+
+        backfill_list_columns(conn, batch_size=1)
+
+        rows = {
+            row["application_id"]: row for row in conn.execute(
+                "SELECT * FROM applicants WHERE application_id LIKE 'legacy-%'"
+            )
+        }
+        assert rows["legacy-1"]["top_skills"] == "Go, SQL, Docker, AWS, Linux"
+        assert rows["legacy-1"]["skill_count"] == 6
+        assert (rows["legacy-1"]["gh_repos"], rows["legacy-1"]["gh_stars"], rows["legacy-1"]["gh_followers"]) == (12, 30, 7)
+        assert rows["legacy-1"]["gh_last_activity"] == "2025-03-01"
+        assert rows["legacy-2"]["top_skills"] == ""
+        assert rows["legacy-2"]["gh_followers"] is None
+    finally:
+        conn.execute("DELETE FROM applicants WHERE application_id LIKE 'legacy-%'")
+        conn.commit()
+        conn.close()
+
+LEGACY_APPLICANTS_SQL = """
+    CREATE TABLE applicants (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, full_name TEXT, email TEXT, college TEXT, degree TEXT,
+        github TEXT, kaggle_url TEXT, resume_path TEXT, parsed_resume_json TEXT, github_json TEXT,
+        self_rating_json TEXT, application_id TEXT
+    )
+"""
+
+def test_migrations_upgrade_legacy_database(tmp_path):
+    """A database from the first release is migrated step by step, exactly once."""
+    import sqlite3
+    from backend.migrations import MIGRATIONS, get_schema_version, run_migrations
+
+    conn = sqlite3.connect(tmp_path / "legacy.db")
+    conn.row_factory = sqlite3.Row
+    conn.execute(LEGACY_APPLICANTS_SQL)
+    conn.execute("INSERT INTO applicants (full_name, email, application_id) VALUES ('Old', 'old@example.com', 'OLD-1')")
+    conn.commit()
+
+    assert run_migrations(conn) == [version for version, _, _ in MIGRATIONS]
+    assert run_migrations(conn) == []
+    assert get_schema_version(conn) == MIGRATIONS[-1][0]
+
+    columns = {info[1] for info in conn.execute("PRAGMA table_info(applicants)")}
+    assert {"created_at", "enrichment_status", "top_skills"} <= columns
+    # Pre-queue rows count as enriched
+    assert conn.execute("SELECT enrichment_status FROM applicants").fetchone()[0] == "done"
+
+    plan = " ".join(row[3] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM applicants WHERE application_id = 'OLD-1'"
+    ))
+    assert "idx_applicants_application_id" in plan
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO applicants (application_id) VALUES ('OLD-1')")
+    conn.close()
+
+def test_json_export_reads_one_snapshot(client):
+    """Rows committed while an export is streaming neither block nor appear in it."""
+    import sqlite3
+    from conftest import TEST_DB_FILE
+    from backend.exports import stream_json_export
+
+    with sqlite3.connect(TEST_DB_FILE) as conn:
+        conn.executemany(
+            "INSERT INTO applicants (full_name, application_id, enrichment_status) VALUES ('Snap', ?, 'done')",
+            [("snapshot-1",), ("snapshot-2",)]
+        )
+
+    try:
+        stream = stream_json_export(ndjson=True, chunk_size=1)
+        first_chunk = next(stream)
+
+        # A submission during the export commits immediately (WAL)
+        conn = sqlite3.connect(TEST_DB_FILE, timeout=1)
+        conn.execute("INSERT INTO applicants (full_name, application_id) VALUES ('Late', 'snapshot-late')")
+        conn.commit()
+        conn.close()
+
+        body = first_chunk + b"".join(stream)
+        ids = {json.loads(line)["application_id"] for line in body.decode().splitlines()}
+        assert {"snapshot-1", "snapshot-2"} <= ids
+        assert "snapshot-late" not in ids
+    finally:
+        with sqlite3.connect(TEST_DB_FILE) as conn:
+            conn.execute("DELETE FROM applicants WHERE application_id LIKE 'snapshot-%'")
+
+def test_csv_export_neutralizes_formulas():
+    """Applicant text that looks like a spreadsheet formula is exported as plain text."""
+    from backend.exports import _csv_cell
+
+    assert _csv_cell("=HYPERLINK(\"http://x\")") == "'=HYPERLINK(\"http://x\")"
+    assert _csv_cell("Ada Lovelace") == "Ada Lovelace"
+    assert _csv_cell(-3) == -3
+
+def test_columnar_export_spans_record_batches(client, tmp_path):
+    """The CLI writes one record batch per chunk and the file reads back whole."""
+    import sqlite3
+    pq = pytest.importorskip("pyarrow.parquet")
+    from conftest import TEST_DB_FILE
+    from backend.export_columnar import export_columnar
+
+    with sqlite3.connect(TEST_DB_FILE) as conn:
+        total = conn.execute("SELECT COUNT(*) FROM applicants").fetchone()[0]
+        conn.execute(
+            "INSERT INTO applicants (application_id, score_breakdown_json, parsed_resume_json, created_at)"
+            " VALUES ('columnar-odd', 'not json', '{\"skills\": \"oops\"}', 'yesterday')"
+        )
+        conn.execute(
+            "INSERT INTO applicants (application_id, github_json)"
+            " VALUES ('columnar-langs', '{\"top_languages\": {\"Python\": 4, \"Go\": 2, \"Rust\": 1}}')"
+        )
+    try:
+        output = tmp_path / "applicants.parquet"
+        export_columnar(output=str(output), batch_size=2)
+
+        parquet = pq.ParquetFile(output)
+        assert parquet.metadata.num_rows == total + 2
+        assert parquet.metadata.num_row_groups == (total + 3) // 2
+        rows = {r["application_id"]: r for r in parquet.read().to_pylist()}
+        odd = rows["columnar-odd"]
+        assert odd["skills"] == [] and odd["created_at"] is None and odd["score_skills"] is None
+        assert rows["columnar-langs"]["gh_top_languages"] == ["Python", "Go", "Rust"]
+    finally:
+        with sqlite3.connect(TEST_DB_FILE) as conn:
+            conn.execute("DELETE FROM applicants WHERE application_id IN ('columnar-odd', 'columnar-langs')")
+
+def test_pool_writer_waits_out_another_process(tmp_path, monkeypatch):
+    """
+    SQLITE_BUSY from another connection's write lock is retried with backoff,
+    and readers keep reading the last committed snapshot meanwhile.
+    """
+    import sqlite3
+    import threading
+    from backend import database
+
+    monkeypatch.setattr(database, "DB_BUSY_TIMEOUT_MS", 20)
+    monkeypatch.setattr(database, "DB_WRITE_RETRY_SECONDS", 0.05)
+    path = str(tmp_path / "busy.db")
+    pool = database.ConnectionPool(path)
+    try:
+        with pool.writer() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.execute("INSERT INTO t VALUES (1)")
+
+        other = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        other.execute("BEGIN IMMEDIATE")
+        other.execute("INSERT INTO t VALUES (2)")
+        release = threading.Timer(0.2, lambda: (other.execute("COMMIT"), other.close()))
+        release.start()
+
+        with pool.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO t VALUES (3)")
+        release.join()
+
+        with pool.reader() as conn:
+            assert [row[0] for row in conn.execute("SELECT x FROM t ORDER BY x")] == [1, 2, 3]
+    finally:
+        pool.close()
+
+def test_db_calls_run_off_the_event_loop():
+    """A slow DB call leaves the event loop free for other requests."""
+    import asyncio
+    import time
+    from backend import repository
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await repository.run_in_db_thread(time.sleep, 0.2)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) >= 5
+
+def test_recruiter_digest_carries_unsettled_applicants_over(client):
+    """
+    A time-based digest goes out once the oldest waiting applicant is older
+    than the window; an applicant still being enriched does not hold it back
+    and is listed in the next digest once settled.
+    """
+    import sqlite3
+    from datetime import datetime, timedelta, timezone
+    from conftest import TEST_DB_FILE, start_digest_window
+    from backend.digest import queue_digest_if_due
+
+    with sqlite3.connect(TEST_DB_FILE) as conn:
+        start_digest_window(conn)
+        for name, status in [("Early", "done"), ("Slow", "pending"), ("Later", "done")]:
+            conn.execute(
+                "INSERT INTO applicants (application_id, full_name, overall_score, enrichment_status, created_at)"
+                " VALUES (?, ?, 50, ?, CURRENT_TIMESTAMP)",
+                (f"window-{name}", name, status)
+            )
+    now = datetime.now(timezone.utc)
+    try:
+        assert queue_digest_if_due("hr@example.com", window_minutes=15, every=0, now=now) is None
+
+        first = queue_digest_if_due("hr@example.com", window_minutes=15, every=0, now=now + timedelta(minutes=20))
+        assert queue_digest_if_due("hr@example.com", window_minutes=15, every=0, now=now + timedelta(minutes=20)) is None
+
+        with sqlite3.connect(TEST_DB_FILE) as conn:
+            conn.execute("UPDATE applicants SET enrichment_status = 'done' WHERE application_id = 'window-Slow'")
+        second = queue_digest_if_due("hr@example.com", window_minutes=15, every=0, now=now + timedelta(minutes=40))
+
+        with sqlite3.connect(TEST_DB_FILE) as conn:
+            bodies = [conn.execute("SELECT body FROM email_outbox WHERE id = ?", (outbox_id,)).fetchone()[0]
+                      for outbox_id in (first, second)]
+        assert "Early" in bodies[0] and "Later" in bodies[0] and "Slow" not in bodies[0]
+        assert "Slow" in bodies[1] and "Later" not in bodies[1] and "Early" not in bodies[1]
+    finally:
+        with sqlite3.connect(TEST_DB_FILE) as conn:
+            conn.execute("DELETE FROM applicants WHERE application_id LIKE 'window-%'")
+
+def test_profile_blobs_are_sharded_and_compressed(tmp_path, monkeypatch):
+    """Eager profiles are written compressed under hash-prefix shards and read back transparently."""
+    import asyncio
+    import gzip
+    import hashlib
+    from backend import profiles
+    from backend.blob_store import BlobStore, ZSTD_AVAILABLE
+
+    monkeypatch.setattr(profiles, "profile_blobs", BlobStore(tmp_path))
+    monkeypatch.setattr(profiles, "PROFILE_MODE", "eager")
+    applicant = {
+        "application_id": "blob-1", "full_name": "Blob", "email": "b@example.com", "college": "C",
+        "degree": "D", "github": "", "kaggle_url": "", "self_rating_json": '{"DSA": 4}',
+        "parsed_resume_json": '{"skills": ["Go"]}', "github_json": "not json", "resume_path": "x.pdf",
+    }
+
+    compressions = [("gzip", ".json.gz")] + ([("zstd", ".json.zst")] if ZSTD_AVAILABLE else [])
+    for compression, suffix in compressions:
+        monkeypatch.setattr(profiles, "PROFILE_COMPRESSION", compression)
+        path = asyncio.run(profiles.save_profile(applicant))
+
+        digest = hashlib.sha256(b"blob-1").hexdigest()
+        assert path == tmp_path / digest[:2] / digest[2:4] / f"blob-1{suffix}"
+        if compression == "gzip":
+            assert b'"skills":["Go"]' in gzip.decompress(path.read_bytes())
+        loaded = asyncio.run(profiles.load_profile("blob-1"))
+        assert loaded["parsed_resume"] == {"skills": ["Go"]} and loaded["github_analysis"] == {}
+        path.unlink()
+
+def test_resume_preview_is_first_page_excerpt(monkeypatch):
+    """The parser keeps a short, whitespace-collapsed excerpt of page one, cut between words."""
+    from types import SimpleNamespace
+    from backend import resume_parser
+    from backend.resume_parser import extract_resume_data, text_preview, RESUME_PREVIEW_CHARS
+
+    assert text_preview("  Jane   Doe\n\nPython  developer ") == "Jane Doe Python developer"
+    assert text_preview("alpha beta gamma", max_chars=12) == "alpha beta…"
+
+    first_page = "Jane Doe\njane@example.com\n" + "Built Python services. " * 60
+    pages = [SimpleNamespace(extract_text=lambda text=text: text) for text in (first_page, "Second page only")]
+    monkeypatch.setattr(resume_parser.pypdf, "PdfReader", lambda path: SimpleNamespace(pages=pages))
+
+    data = extract_resume_data("resume.pdf")
+    assert data["preview"].startswith("Jane Doe jane@example.com Built Python")
+    assert data["preview"].endswith("…") and len(data["preview"]) <= RESUME_PREVIEW_CHARS + 1
+    assert "Second page" not in data["preview"] and "Second page" in data["text"]
+
+def test_summary_built_on_request_without_stored_copy(client, admin_client, mock_external_services):
+    """Rows without summary_json (older or not yet enriched) get one built from the row, with a status."""
+    import sqlite3
+    from conftest import TEST_DB_FILE
+    from test_positive import _create_test_application
+
+    app_id, _ = _create_test_application(client)
+    wait_for_enrichment(app_id)
+    with sqlite3.connect(TEST_DB_FILE) as conn:
+        stored = conn.execute("SELECT summary_json FROM applicants WHERE application_id = ?", (app_id,)).fetchone()[0]
+        conn.execute("UPDATE applicants SET summary_json = NULL WHERE application_id = ?", (app_id,))
+
+    response = admin_client.get(f"/admin/api/applicant/{app_id}/summary")
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary.pop("status") == "done"
+    assert summary == json.loads(stored)
+
+def test_github_rate_limit_defers_job_until_reset(client, mock_external_services, monkeypatch):
+    """A rate limit resetting far ahead re-queues the job for the reset instead of scoring GitHub as 0."""
+    import sqlite3
+    import time
+    from conftest import TEST_DB_FILE
+    from backend.github_service import GitHubRateLimited
+    from test_positive import _create_test_application
+
+    reset_at = time.time() + 3600
+
+    async def rate_limited(*args):
+        raise GitHubRateLimited("GitHub rate limit resets in 3600s", reset_at)
+    monkeypatch.setattr("backend.enrichment.analyze_github", rate_limited)
+
+    app_id, _ = _create_test_application(client)
+    deadline = time.time() + 10
+    with sqlite3.connect(TEST_DB_FILE) as conn:
+        conn.row_factory = sqlite3.Row
+        while time.time() < deadline:
+            job = conn.execute("SELECT * FROM enrichment_jobs WHERE application_id = ?", (app_id,)).fetchone()
+            if job["last_error"]:
+                break
+            time.sleep(0.05)
+        applicant = conn.execute(
+            "SELECT enrichment_status, summary_json FROM applicants WHERE application_id = ?", (app_id,)
+        ).fetchone()
+        # Stop the deferred job from holding up the next test's queue drain
+        conn.execute("UPDATE enrichment_jobs SET status = 'failed' WHERE application_id = ?", (app_id,))
+
+    assert job["status"] == "pending" and "rate limit" in job["last_error"]
+    assert job["available_at"] == pytest.approx(reset_at)
+    assert job["attempts"] == 0
+    assert applicant["enrichment_status"] == "pending"
+    # No enrichment results were written
+    assert applicant["summary_json"] is None
+
+def test_email_worker_stop_waits_for_send_in_flight(client, smtp_sink, monkeypatch):
+    """Stopping mid-send lets the send finish and be recorded before the session closes."""
+    import asyncio
+    import sqlite3
+    import time
+    from conftest import TEST_DB_FILE
+    from backend.email_service import EmailDeliveryWorker, SMTPSession
+
+    real_send = SMTPSession.send
+
+    def slow_send(self, message):
+        time.sleep(0.3)
+        return real_send(self, message)
+    monkeypatch.setattr(SMTPSession, "send", slow_send)
+
+    with sqlite3.connect(TEST_DB_FILE) as conn:
+        conn.execute("UPDATE email_outbox SET status = 'sent' WHERE status = 'pending'")
+        conn.execute("INSERT INTO email_outbox (kind, to_email, subject, body) VALUES ('test', 'slow@example.com', 'Hi', 'Hello')")
+
+    def status():
+        with sqlite3.connect(TEST_DB_FILE) as conn:
+            return conn.execute("SELECT status FROM email_outbox WHERE to_email = 'slow@example.com'").fetchone()[0]
+
+    async def scenario():
+        worker = EmailDeliveryWorker(poll_seconds=0.05)
+        assert worker.start()
+        for _ in range(100):
+            if status() == "sending":
+                break
+            await asyncio.sleep(0.02)
+        await worker.stop()
+        return worker
+
+    worker = asyncio.run(scenario())
+    assert status() == "sent"
+    assert smtp_sink.recipients() == ["slow@example.com"]
+    assert not worker.session.is_open
+
+def test_search_rebuild_extracts_outside_the_write_lock(tmp_path, monkeypatch):
+    """Resumes are re-extracted in the parser pool while other writers can still commit."""
+    import sqlite3
+    from backend import database, rebuild_search_index
+    from backend.resume_parser import PARSER_VERSION
+
+    db_path = str(tmp_path / "rebuild.db")
+    monkeypatch.setattr(database, "DB_NAME", db_path)
+    database.init_db()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO applicants (full_name, email, application_id, resume_path, resume_hash)"
+            " VALUES ('Rebuild', 'rb@example.com', 'rebuild-1', 'tests/test_data/valid_resume.pdf', 'rebuild-hash')"
+        )
+
+    writes_during_parse = []
+
+    async def fake_run(fn, path):
+        # Another process must be able to take the write lock right now
+        other = sqlite3.connect(db_path, timeout=0)
+        try:
+            other.execute("BEGIN IMMEDIATE")
+            other.rollback()
+            writes_during_parse.append(path)
+        finally:
+            other.close()
+        return {"skills": [], "text": "kubernetes wizard"}
+
+    monkeypatch.setattr(rebuild_search_index.parse_pool, "run", fake_run)
+    try:
+        assert rebuild_search_index.rebuild_search_index(chunk_size=10) == 1
+    finally:
+        database.close_pool()
+
+    assert writes_during_parse == ["tests/test_data/valid_resume.pdf"]
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM applicants_fts WHERE applicants_fts MATCH 'kubernetes'").fetchone()[0] == 1
+        cached = conn.execute(
+            "SELECT result_json FROM parse_cache WHERE pdf_hash = 'rebuild-hash' AND parser_version = ?", (PARSER_VERSION,)
+        ).fetchone()
+    assert json.loads(cached[0])["text"] == "kubernetes wizard"
+
+def test_search_rebuild_keeps_index_entries_enrichment_wrote_meanwhile(tmp_path, monkeypatch):
+    """Rows enriched during the extraction keep their fresh index entry; other fields are re-read."""
+    import sqlite3
+    from backend import database, rebuild_search_index
+    from backend.search import index_applicant
+
+    db_path = str(tmp_path / "rebuild.db")
+    monkeypatch.setattr(database, "DB_NAME", db_path)
+    database.init_db()
+    with sqlite3.connect(db_path) as conn:
+        for name in ("Steady", "Busy"):
+            conn.execute(
+                "INSERT INTO applicants (full_name, application_id, resume_path, resume_hash, enrichment_status)"
+                " VALUES (?, ?, 'tests/test_data/valid_resume.pdf', ?, 'done')",
+                (name, f"rebuild-{name}", f"hash-{name}")
+            )
+
+    async def fake_run(fn, path):
+        # Enrichment finishes for Busy and an admin renames Steady mid-extraction
+        with sqlite3.connect(db_path) as other:
+            busy_id = other.execute("SELECT id FROM applicants WHERE full_name = 'Busy'").fetchone()[0]
+            other.execute("UPDATE applicants SET parsed_resume_json = '{\"skills\": [\"Elixir\"]}' WHERE id = ?", (busy_id,))
+            index_applicant(other, busy_id, {"full_name": "Busy", "skills": ["Elixir"], "resume_text": "fresh"})
+            other.execute("UPDATE applicants SET full_name = 'Renamed' WHERE full_name = 'Steady'")
+        return {"skills": [], "text": "stale"}
+
+    monkeypatch.setattr(rebuild_search_index.parse_pool, "run", fake_run)
+    try:
+        assert rebuild_search_index.rebuild_search_index(chunk_size=10) == 1
+    finally:
+        database.close_pool()
+
+    with sqlite3.connect(db_path) as conn:
+        def matches(query):
+            return [row[0] for row in conn.execute(
+                "SELECT full_name FROM applicants_fts WHERE applicants_fts MATCH ? ORDER BY rowid", (query,)
+            )]
+        assert matches("fresh") == ["Busy"] and matches("Elixir") == ["Busy"]
+        assert matches("stale") == ["Renamed"]
+
+def test_streamed_exports_do_not_hold_pooled_readers(client, monkeypatch):
+    """Open export downloads leave every pooled reader free for the app."""
+    from backend import database
+    from backend.exports import snapshot_chunks
+
+    monkeypatch.setattr(database, "DB_READ_WAIT_SECONDS", 0.5)
+    pool = database.get_pool()
+    downloads = [snapshot_chunks("SELECT 1 UNION ALL SELECT 2", chunk_size=1) for _ in range(pool._read_size + 1)]
+    try:
+        for download in downloads:
+            assert next(download)[0][0] == 1
+        readers = []
+        for _ in range(pool._read_size):
+            readers.append(pool._acquire_reader())
+        for conn in readers:
+            pool._idle_readers.put(conn)
+    finally:
+        for download in downloads:
+            download.close()
+
+def test_parse_limits_without_sigalrm(monkeypatch):
+    """Where there is no SIGALRM or rlimits (Windows), workers start and run jobs without them."""
+    from backend import parse_pool
+
+    def no_timers(*args):
+        raise AssertionError("setitimer must not be used without SIGALRM")
+
+    monkeypatch.setattr(parse_pool, "HAS_ALARM", False)
+    monkeypatch.setattr(parse_pool, "resource", None)
+    monkeypatch.setattr(parse_pool.signal, "setitimer", no_timers, raising=False)
+    monkeypatch.setattr(parse_pool.signal, "signal", no_timers)
+
+    parse_pool._init_worker(1024)
+    assert parse_pool._run_limited(sum, ([1, 2, 3],), cpu_seconds=5, wall_seconds=1) == 6
+
+def test_unreadable_resume_parse_is_not_cached(client, monkeypatch):
+    """The fallback for an unreadable PDF is marked as an error and never enters the parse cache."""
+    import asyncio
+    import sqlite3
+    from conftest import TEST_DB_FILE
+    from backend import enrichment
+    from backend.resume_parser import extract_resume_data
+
+    def broken_reader(path):
+        raise ValueError("not a PDF")
+    monkeypatch.setattr("backend.resume_parser.pypdf.PdfReader", broken_reader)
+
+    async def parse_in_process(path):
+        return extract_resume_data(path)
+    monkeypatch.setattr(enrichment, "parse_resume", parse_in_process)
+
+    result = asyncio.run(enrichment._parse_resume_cached("broken.pdf", "unreadable-hash"))
+    assert result["error"].startswith("Could not read PDF") and result["skills"] == []
+    with sqlite3.connect(TEST_DB_FILE) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM parse_cache WHERE pdf_hash = 'unreadable-hash'").fetchone()[0] == 0
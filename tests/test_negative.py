@@ -43,3 +43,281 @@ def test_admin_login_wrong_credentials(client):
     # Should stay on the page and show error
     assert response.status_code == 200
     assert "Invalid credentials" in response.text
+
+def test_parse_job_wall_clock_limit():
+    """A parse job that runs past its wall-clock budget is aborted, not left hanging."""
+    import asyncio
+    import time
+    from backend.parse_pool import ParsePool, ParseLimitExceeded
+
+    pool = ParsePool(workers=1, wall_seconds=0.5)
+    try:
+        with pytest.raises(ParseLimitExceeded):
+            asyncio.run(pool.run(time.sleep, 10))
+        # The same worker is still usable afterwards
+        assert asyncio.run(pool.run(sum, [1, 2, 3])) == 6
+    finally:
+        pool.shutdown()
+
+    assert pool.stats()["limit_exceeded"] == 1
+
+def test_admin_metrics_requires_login(client):
+    """Pool metrics are only available to a logged-in admin."""
+    response = client.get("/admin/metrics")
+    assert response.status_code == 401
+
+def test_skill_taxonomy_rejects_conflicting_alias():
+    """An alias claimed by two different skills is a taxonomy error."""
+    from backend.skill_matcher import SkillMatcher
+
+    with pytest.raises(ValueError):
+        SkillMatcher([
+            {"name": "JavaScript", "aliases": ["JS"]},
+            {"name": "JSON", "aliases": ["js"]},
+        ])
+
+def test_what_if_rejects_unknown_weights(client, admin_client):
+    """What-if only accepts known scoring weights."""
+    response = admin_client.post("/admin/api/what-if", json={"weights": {"github_bonus": 40}})
+    assert response.status_code == 400
+
+    response = admin_client.post("/admin/api/what-if", json={"weights": {"github_cap": 40}, "top_k": 5})
+    assert response.status_code == 200
+    assert len(response.json()["top"]) <= 5
+
+def test_admin_dashboard_rejects_bad_listing_params(admin_client):
+    """Unknown sort keys, statuses and tampered cursors are client errors."""
+    assert admin_client.get("/admin?sort=email").status_code == 422
+    assert admin_client.get("/admin?status=archived").status_code == 400
+    assert admin_client.get("/admin?after=not-a-cursor").status_code == 400
+
+def test_admin_search_requires_login_and_escapes_query(client, admin_client):
+    """Search is admin-only, and FTS5 operators in the query are treated as plain words."""
+    admin_client.get("/admin/logout", follow_redirects=False)
+    assert client.get("/admin/search", params={"q": "python"}).status_code == 401
+
+    admin_client.post("/admin/login", data={"username": "admin", "password": "secret"}, follow_redirects=False)
+    response = admin_client.get("/admin/search", params={"q": '"python" OR NEAR( col:*'})
+    assert response.status_code == 200
+
+def test_migration_stops_on_duplicate_application_ids(tmp_path):
+    """The unique index migration refuses to run over duplicated ids and is not recorded."""
+    import sqlite3
+    from backend.migrations import get_schema_version, run_migrations
+    from test_edge import LEGACY_APPLICANTS_SQL
+
+    conn = sqlite3.connect(tmp_path / "dupes.db")
+    conn.execute(LEGACY_APPLICANTS_SQL)
+    conn.executemany("INSERT INTO applicants (application_id) VALUES (?)", [("DUP-1",), ("DUP-1",)])
+    conn.commit()
+
+    with pytest.raises(RuntimeError, match="DUP-1"):
+        run_migrations(conn)
+    assert get_schema_version(conn) == 2
+    conn.close()
+
+def test_export_csv_rejects_unknown_columns(admin_client):
+    """Only whitelisted applicant columns can be exported."""
+    response = admin_client.get("/admin/export/csv", params={"columns": "full_name,parsed_resume_json"})
+    assert response.status_code == 400
+    assert "parsed_resume_json" in response.json()["detail"]
+
+def test_pool_writer_rolls_back_and_gives_up_when_locked(tmp_path, monkeypatch):
+    """A failed block leaves nothing behind; a lock held past every retry raises SQLITE_BUSY."""
+    import sqlite3
+    from backend import database
+
+    monkeypatch.setattr(database, "DB_BUSY_TIMEOUT_MS", 20)
+    monkeypatch.setattr(database, "DB_WRITE_RETRIES", 2)
+    monkeypatch.setattr(database, "DB_WRITE_RETRY_SECONDS", 0.01)
+    path = str(tmp_path / "locked.db")
+    pool = database.ConnectionPool(path)
+    try:
+        with pool.writer() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+        with pytest.raises(ValueError):
+            with pool.writer() as conn:
+                conn.execute("INSERT INTO t VALUES (1)")
+                raise ValueError("boom")
+        with pool.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+        other = sqlite3.connect(path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        try:
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                with pool.writer():
+                    pass
+        finally:
+            other.execute("ROLLBACK")
+            other.close()
+    finally:
+        pool.close()
+
+def test_email_outbox_retries_then_marks_failed(client, smtp_sink, monkeypatch):
+    """A refused recipient is retried with backoff and ends 'failed'; other mail still goes out."""
+    import sqlite3
+    from conftest import TEST_DB_FILE, run_email_worker
+    from backend import outbox
+
+    monkeypatch.setattr(outbox, "EMAIL_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(outbox, "EMAIL_RETRY_SECONDS", 0.1)
+    smtp_sink.reject.add("busy@example.com")
+    with sqlite3.connect(TEST_DB_FILE) as conn:
+        conn.execute("UPDATE email_outbox SET status = 'sent' WHERE status = 'pending'")
+        for address in ("busy@example.com", "ok@example.com"):
+            conn.execute(
+                "INSERT INTO email_outbox (kind, to_email, subject, body) VALUES ('test', ?, 'Hi', 'Hello')",
+                (address,)
+            )
+
+    def settled():
+        with sqlite3.connect(TEST_DB_FILE) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM email_outbox WHERE status IN ('pending', 'sending')"
+            ).fetchone()[0] == 0
+
+    run_email_worker(settled)
+
+    with sqlite3.connect(TEST_DB_FILE) as conn:
+        rows = dict((row[0], row[1:]) for row in conn.execute(
+            "SELECT to_email, status, attempts, last_error FROM email_outbox WHERE to_email IN (?, ?)",
+            ("busy@example.com", "ok@example.com")
+        ))
+    assert rows["busy@example.com"][:2] == ("failed", 2) and "451" in rows["busy@example.com"][2]
+    assert rows["ok@example.com"][:2] == ("sent", 1)
+    assert smtp_sink.recipients() == ["ok@example.com"]
+
+def test_resumes_are_not_public(client, mock_external_services):
+    """The old static /applications mount is gone and the resume route needs a login."""
+    from test_positive import _create_test_application
+
+    app_id, _ = _create_test_application(client)
+    response = client.get(f"/admin/applicant/{app_id}/resume", follow_redirects=False)
+    assert response.status_code == 303 and response.headers["location"] == "/admin/login"
+    assert client.get("/applications/resumes/").status_code == 404
+
+def test_summary_api_requires_login_and_known_applicant(client, admin_client, mock_external_services):
+    """The hover summary API answers 401 without a session and 404 for unknown ids."""
+    from test_positive import _create_test_application
+
+    app_id, _ = _create_test_application(client)
+    assert admin_client.get("/admin/api/applicant/NO-SUCH-ID/summary").status_code == 404
+    client.get("/admin/logout", follow_redirects=False)
+    assert client.get(f"/admin/api/applicant/{app_id}/summary").status_code == 401
+
+def test_enrichment_worker_survives_db_errors(monkeypatch):
+    """A failed claim (e.g. "database is locked") pauses the worker instead of ending it."""
+    import asyncio
+    import sqlite3
+    from backend import enrichment
+
+    claims, enriched, completed = [], [], []
+
+    def flaky_claim():
+        claims.append(1)
+        if len(claims) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        if len(claims) == 2:
+            return {"id": 1, "application_id": "after-lock", "attempts": 1}
+        return None
+
+    async def fake_enrich(application_id):
+        enriched.append(application_id)
+
+    monkeypatch.setattr(enrichment, "claim_next_job", flaky_claim)
+    monkeypatch.setattr(enrichment, "enrich_applicant", fake_enrich)
+    monkeypatch.setattr(enrichment, "complete_job", completed.append)
+    monkeypatch.setattr(enrichment, "ENRICHMENT_ERROR_SECONDS", 0.01)
+
+    async def run():
+        queue = enrichment.EnrichmentQueue(workers=1, poll_seconds=0.01)
+        queue._wakeup = asyncio.Event()
+        worker = asyncio.create_task(queue._worker(0))
+        for _ in range(200):
+            if completed:
+                break
+            await asyncio.sleep(0.01)
+        assert not worker.done()
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+
+    asyncio.run(run())
+    assert enriched == ["after-lock"]
+    assert completed and completed[0]["application_id"] == "after-lock"
+
+def test_email_worker_survives_db_errors(client, smtp_sink, monkeypatch):
+    """A failed outbox claim pauses the delivery worker instead of ending it."""
+    import sqlite3
+    from conftest import TEST_DB_FILE, run_email_worker
+    from backend import email_service
+
+    real_claim, claims = email_service.claim_due_emails, []
+
+    def flaky_claim(limit):
+        claims.append(limit)
+        if len(claims) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return real_claim(limit)
+
+    monkeypatch.setattr(email_service, "claim_due_emails", flaky_claim)
+    monkeypatch.setattr(email_service, "EMAIL_ERROR_SECONDS", 0.01)
+    with sqlite3.connect(TEST_DB_FILE) as conn:
+        conn.execute("UPDATE email_outbox SET status = 'sent' WHERE status = 'pending'")
+        conn.execute("INSERT INTO email_outbox (kind, to_email, subject, body) VALUES ('test', 'later@example.com', 'Hi', 'Hello')")
+
+    def sent():
+        with sqlite3.connect(TEST_DB_FILE) as conn:
+            return conn.execute(
+                "SELECT status FROM email_outbox WHERE to_email = 'later@example.com'"
+            ).fetchone()[0] == "sent"
+
+    run_email_worker(sent)
+    assert len(claims) > 1 and smtp_sink.recipients() == ["later@example.com"]
+
+def test_pool_reader_wait_is_bounded(tmp_path, monkeypatch):
+    """With every reader borrowed, the next borrower gets an error instead of hanging."""
+    import sqlite3
+    from backend import database
+
+    monkeypatch.setattr(database, "DB_READ_WAIT_SECONDS", 0.05)
+    pool = database.ConnectionPool(str(tmp_path / "readers.db"), read_size=1)
+    try:
+        with pool.reader():
+            with pytest.raises(sqlite3.OperationalError, match="read connection"):
+                with pool.reader():
+                    pass
+        with pool.reader() as conn:
+            assert conn.execute("SELECT 1").fetchone()[0] == 1
+    finally:
+        pool.close()
+
+def test_parse_limit_is_not_swallowed_by_the_parser(monkeypatch):
+    """A limit hit inside pypdf fails the job instead of returning the "Unknown" fallback."""
+    import signal
+    import time
+    from backend import parse_pool, resume_parser
+
+    if not parse_pool.HAS_ALARM:
+        pytest.skip("needs SIGALRM")
+
+    def slow_reader(path):
+        time.sleep(5)
+
+    def swallowing(path):
+        try:
+            time.sleep(5)
+        except Exception:
+            return "swallowed"
+
+    monkeypatch.setattr(resume_parser.pypdf, "PdfReader", slow_reader)
+    previous = signal.signal(signal.SIGALRM, parse_pool._raise_limit)
+    try:
+        with pytest.raises(parse_pool.ParseLimitExceeded):
+            parse_pool._run_limited(resume_parser.extract_resume_data, ("resume.pdf",), 0, 0.2)
+        # Library code catching Exception cannot hide the limit either
+        with pytest.raises(parse_pool.ParseLimitExceeded):
+            parse_pool._run_limited(swallowing, ("resume.pdf",), 0, 0.2)
+        assert parse_pool._run_limited(sum, ([1, 2],), 0, 0.2) == 3
+    finally:
+        signal.signal(signal.SIGALRM, previous)